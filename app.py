@@ -148,9 +148,9 @@ SML tags available:
         '--ebook', '--ebooks_dir', '--language', '--voice', '--device', '--tts_engine', 
         '--custom_model', '--fine_tuned', '--output_format', '--output_channel',
         '--temperature', '--length_penalty', '--num_beams', '--repetition_penalty', 
-        '--top_k', '--top_p', '--speed', '--enable_text_splitting',
+        '--top_k', '--top_p', '--speed', '--enable_text_splitting', '--batch_size',
         '--text_temp', '--waveform_temp',
-        '--output_dir', '--version', '--workflow', '--help'
+        '--output_dir', '--workers', '--export_workers', '--version', '--workflow', '--help'
     ]
     tts_engine_list_keys = [k for k in TTS_ENGINES.keys()]
     tts_engine_list_values = [k for k in TTS_ENGINES.values()]
@@ -196,13 +196,19 @@ SML tags available:
     Default to config.json model.""")
     headless_optional_group.add_argument(options[22], action='store_true', help=f"""(xtts only, optional) Enable TTS text splitting. This option is known to not be very efficient. 
     Default to config.json model.""")
-    headless_optional_group.add_argument(options[23], type=float, default=default_engine_settings[TTS_ENGINES['BARK']]['text_temp'], help=f"""(bark only, optional) Text Temperature for the model. 
+    headless_optional_group.add_argument(options[23], type=int, default=default_engine_settings[TTS_ENGINES['XTTSv2']]['batch_size'], help=f"""(xtts only, optional) Number of sentences synthesized together in one padded batch.
+    Default to 1 (no batching). Higher values speed up the conversion on multi-core CPU and GPU with enough memory.""")
+    headless_optional_group.add_argument(options[24], type=float, default=default_engine_settings[TTS_ENGINES['BARK']]['text_temp'], help=f"""(bark only, optional) Text Temperature for the model. 
     Default to config.json model.""")
-    headless_optional_group.add_argument(options[24], type=float, default=default_engine_settings[TTS_ENGINES['BARK']]['waveform_temp'], help=f"""(bark only, optional) Waveform Temperature for the model. 
+    headless_optional_group.add_argument(options[25], type=float, default=default_engine_settings[TTS_ENGINES['BARK']]['waveform_temp'], help=f"""(bark only, optional) Waveform Temperature for the model. 
     Default to config.json model.""")
-    headless_optional_group.add_argument(options[25], type=str, help=f'''(Optional) Path to the output directory. Default is set in ./lib/conf.py''')
-    headless_optional_group.add_argument(options[26], action='version', version=f'ebook2audiobook version {prog_version}', help='''Show the version of the script and exit''')
-    headless_optional_group.add_argument(options[27], action='store_true', help=argparse.SUPPRESS)
+    headless_optional_group.add_argument(options[26], type=str, help=f'''(Optional) Path to the output directory. Default is set in ./lib/conf.py''')
+    headless_optional_group.add_argument(options[27], type=int, default=default_workers, help=f'''(Optional, CPU only) Number of processes sharing the sentences of one ebook, each loading its own model.
+    Default to {default_workers}. The CPU threads are split evenly between the workers.''')
+    headless_optional_group.add_argument(options[28], type=int, default=default_export_workers, help=f'''(Optional) Number of split parts exported at the same time when --output_split is enabled.
+    Default to {default_export_workers}.''')
+    headless_optional_group.add_argument(options[29], action='version', version=f'ebook2audiobook version {prog_version}', help='''Show the version of the script and exit''')
+    headless_optional_group.add_argument(options[30], action='store_true', help=argparse.SUPPRESS)
     
     for arg in sys.argv:
         if arg.startswith('--') and arg not in options:
@@ -261,6 +267,7 @@ SML tags available:
             args['xtts_top_p'] = args['top_p']
             args['xtts_speed'] = args['speed']
             args['xtts_enable_text_splitting'] = False
+            args['xtts_batch_size'] = args['batch_size']
             args['bark_text_temp'] = args['text_temp']
             args['bark_waveform_temp'] = args['waveform_temp']
             engine_setting_keys = {engine: list(settings.keys()) for engine, settings in default_engine_settings.items()}
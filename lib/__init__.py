@@ -2,13 +2,14 @@ from .conf import (
     DEVICE_SYSTEM, FULL_DOCKER, NATIVE, BUILD_DOCKER, workflow_id, audiobooks_cli_dir, audiobooks_gradio_dir,
     audiobooks_host_dir, debug_mode, default_audio_proc_samplerate, max_upload_size,
     default_audio_proc_format, default_device, default_gpu_wiki, 
-    default_blocks_preview, default_output_format, default_output_channel, systems, devices, ebook_formats,
+    default_blocks_preview, default_output_format, default_output_channel, systems, devices, ebook_formats, native_ebook_formats,
     ebooks_dir, interface_component_options, interface_concurrency_limit,
     interface_host, interface_port, interface_shared_tmp_expire,
     max_python_version, min_python_version, models_dir, os,
     output_formats, prog_version, python_env_dir,
     requirements_file, components_dir, root_dir, tmp_dir, run_dir, gradio_cache_dir, tmp_expire, tts_dir, voice_formats,
-    voices_dir, default_output_split, default_output_split_hours
+    voices_dir, default_output_split, default_output_split_hours, default_output_stream, default_workers, default_export_workers,
+    cache_dir, audio_cache_max_gb, ocr_cache_max_mb, voice_cache_max_mb, latents_dir
 )
 
 from .conf_lang import (
@@ -33,13 +34,14 @@ __all__ = [
     "DEVICE_SYSTEM", "FULL_DOCKER", "NATIVE", "BUILD_DOCKER", "workflow_id", "audiobooks_cli_dir", "audiobooks_gradio_dir",
     "audiobooks_host_dir", "debug_mode", "default_audio_proc_samplerate", "max_upload_size",
     "default_audio_proc_format", "default_device", "default_gpu_wiki",
-    "default_blocks_preview", "default_output_format", "default_output_channel", "systems", "devices", "ebook_formats",
+    "default_blocks_preview", "default_output_format", "default_output_channel", "systems", "devices", "ebook_formats", "native_ebook_formats",
     "ebooks_dir", "interface_component_options", "interface_concurrency_limit",
     "interface_host", "interface_port", "interface_shared_tmp_expire",
     "max_python_version", "min_python_version", "models_dir", "os",
     "output_formats", "prog_version", "python_env_dir",
     "requirements_file", "components_dir", "root_dir", "tmp_dir", "run_dir", "gradio_cache_dir", "tmp_expire", "tts_dir",
-    "voice_formats", "voices_dir", "default_output_split", "default_output_split_hours",
+    "voice_formats", "voices_dir", "default_output_split", "default_output_split_hours", "default_output_stream", "default_workers", "default_export_workers",
+    "cache_dir", "audio_cache_max_gb", "ocr_cache_max_mb", "voice_cache_max_mb", "latents_dir",
 
     # from conf_lang
     "abbreviations_mapping", "chapter_word_mapping", "default_language_code",
@@ -0,0 +1,166 @@
+import os, threading, hashlib
+
+from lib.classes.tts_engines.common.audio import get_audio_samples, get_file_loudness_stats
+
+# written in the session process_dir
+audio_manifest_file = 'audio_manifest.tsv'
+
+class AudioManifest:
+
+    # one line per event, appended with a single write so several processes can share the file:
+    #   s <sentence index> <sample count> <samplerate> <text hash>
+    #   l <sentence index> <gated K-weighted energy> <gated block count> <true peak>
+    #   c <chapter index> <first sentence> <last sentence>
+    # later lines override earlier ones for the same index
+    # a sentence line is only written once its audio file is complete, so the manifest is also the resume journal
+
+    # lines are flushed to disk every sync_every appends and at each sync()
+    sync_every = 64
+
+    def __init__(self, manifest_file:str)->None:
+        self.manifest_file = manifest_file
+        self.lock = threading.Lock()
+        self.sentences = {}
+        self.chapters = {}
+        self.loudness = {}
+        self.offset = 0
+        self.unsynced = 0
+
+    @staticmethod
+    def text_hash(text:str)->str:
+        return hashlib.sha1(str(text).strip().encode('utf-8')).hexdigest()[:16]
+
+    def _append(self, line:str)->bool:
+        try:
+            with self.lock:
+                fd = os.open(self.manifest_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line.encode('utf-8'))
+                    self.unsynced += 1
+                    if self.unsynced >= self.sync_every:
+                        os.fsync(fd)
+                        self.unsynced = 0
+                finally:
+                    os.close(fd)
+            return True
+        except OSError as e:
+            error = f'AudioManifest._append() error: {e}'
+            print(error)
+            return False
+
+    def add_sentence(self, index:int, sample_count:int, samplerate:int, text:str, loudness:tuple[float, int, float]|None=None)->bool:
+        text_hash = self.text_hash(text)
+        self.sentences[int(index)] = (int(sample_count), int(samplerate), text_hash)
+        line = f's\t{int(index)}\t{int(sample_count)}\t{int(samplerate)}\t{text_hash}\n'
+        if loudness is None:
+            self.loudness.pop(int(index), None)
+        else:
+            self.loudness[int(index)] = (float(loudness[0]), int(loudness[1]), float(loudness[2]))
+            line += f'l\t{int(index)}\t{float(loudness[0])!r}\t{int(loudness[1])}\t{float(loudness[2])!r}\n'
+        return self._append(line)
+
+    def add_sentence_file(self, index:int, filepath:str, text:str)->bool:
+        # for audio not produced by an engine in this run, e.g. restored from the cache
+        samples = get_audio_samples(filepath)
+        if samples is None:
+            return False
+        return self.add_sentence(index, samples[0], samples[1], text, get_file_loudness_stats(filepath))
+
+    def add_chapter(self, chapter:int, start:int, end:int)->bool:
+        self.chapters[int(chapter)] = (int(start), int(end))
+        return self._append(f'c\t{int(chapter)}\t{int(start)}\t{int(end)}\n')
+
+    def sync(self)->bool:
+        # fsync applies to the file, so it also covers the lines appended by other processes
+        try:
+            with self.lock:
+                if not os.path.exists(self.manifest_file):
+                    return True
+                fd = os.open(self.manifest_file, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self.unsynced = 0
+            return True
+        except OSError as e:
+            error = f'AudioManifest.sync() error: {e}'
+            print(error)
+            return False
+
+    def load(self)->'AudioManifest':
+        # reads only what was appended since the previous load
+        if not os.path.exists(self.manifest_file):
+            return self
+        with open(self.manifest_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < self.offset:
+                self.offset = 0
+                self.sentences = {}
+                self.chapters = {}
+                self.loudness = {}
+            f.seek(self.offset)
+            for raw in f:
+                if not raw.endswith(b'\n'):
+                    # a line still being written or cut short by an interrupted run
+                    break
+                self.offset += len(raw)
+                fields = raw.decode('utf-8', errors='replace').rstrip('\n').split('\t')
+                try:
+                    if fields[0] == 's' and len(fields) == 5:
+                        self.sentences[int(fields[1])] = (int(fields[2]), int(fields[3]), fields[4])
+                        # an s line without its l line means the stats of the previous audio no longer apply
+                        self.loudness.pop(int(fields[1]), None)
+                    elif fields[0] == 'l' and len(fields) == 5:
+                        self.loudness[int(fields[1])] = (float(fields[2]), int(fields[3]), float(fields[4]))
+                    elif fields[0] == 'c' and len(fields) == 4:
+                        self.chapters[int(fields[1])] = (int(fields[2]), int(fields[3]))
+                except ValueError:
+                    continue
+        return self
+
+    def has_sentence(self, index:int, text:str)->bool:
+        entry = self.sentences.get(index)
+        return entry is not None and entry[2] == self.text_hash(text)
+
+    def get_sentence_duration(self, index:int, text:str|None=None)->float|None:
+        entry = self.sentences.get(index)
+        if entry is None or entry[1] <= 0:
+            return None
+        if text is not None and entry[2] != self.text_hash(text):
+            return None
+        return entry[0] / entry[1]
+
+    def get_range_duration(self, start:int, end:int)->float|None:
+        total = 0.0
+        for index in range(start, end + 1):
+            duration = self.get_sentence_duration(index)
+            if duration is None:
+                return None
+            total += duration
+        return total
+
+    def get_range_digest(self, start:int, end:int)->str|None:
+        # changes as soon as one sentence of the range is synthesized again from another text
+        text_hashes = []
+        for index in range(start, end + 1):
+            entry = self.sentences.get(index)
+            if entry is None:
+                return None
+            text_hashes.append(entry[2])
+        return hashlib.sha1('\n'.join(text_hashes).encode('utf-8')).hexdigest()[:16]
+
+    def get_range_loudness(self, start:int, end:int)->list[tuple[float, int, float]]|None:
+        stats = []
+        for index in range(start, end + 1):
+            entry = self.loudness.get(index)
+            if entry is None:
+                return None
+            stats.append(entry)
+        return stats
+
+    def get_chapter_duration(self, chapter:int)->float|None:
+        sentence_range = self.chapters.get(chapter)
+        if sentence_range is None:
+            return None
+        return self.get_range_duration(*sentence_range)
@@ -0,0 +1,106 @@
+import os, json, math, threading
+
+# written in the session process_dir
+chapter_stream_dir = 'stream'
+chapter_stream_playlist = 'playlist.m3u8'
+chapter_stream_index = 'segments.json'
+
+class ChapterStream:
+
+    # one AAC (ADTS) segment per finished block, listed in an HLS event playlist
+    # as soon as all the blocks before it are done, so playback can start while converting
+
+    def __init__(self, stream_dir:str)->None:
+        self.stream_dir = stream_dir
+        self.playlist_file = os.path.join(stream_dir, chapter_stream_playlist)
+        self.index_file = os.path.join(stream_dir, chapter_stream_index)
+        self.lock = threading.Lock()
+        self.segments = {}
+        self.finished = False
+
+    def segment_path(self, chapter:int)->str:
+        return os.path.join(self.stream_dir, f'{int(chapter):05d}.aac')
+
+    def load(self)->'ChapterStream':
+        if not os.path.exists(self.index_file):
+            return self
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.segments = {int(k): v for k, v in data.get('segments', {}).items()}
+            self.finished = bool(data.get('finished', False))
+        except (OSError, ValueError) as e:
+            error = f'ChapterStream.load() error: {e}'
+            print(error)
+        return self
+
+    def get_segment(self, chapter:int, start:int, end:int, channels:str, digest:str|None)->str|None:
+        # the segment is only reusable if it was encoded from the same sentences and layout
+        entry = self.segments.get(int(chapter))
+        if entry is None or digest is None or entry.get('digest') != digest:
+            return None
+        if entry['start'] != start or entry['end'] != end or entry['channels'] != channels:
+            return None
+        path = self.segment_path(chapter)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        return path
+
+    def get_ready_segments(self)->list[tuple[int, str]]:
+        # blocks are played in order, a missing block holds back the ones after it
+        ready = []
+        chapter = 0
+        while chapter in self.segments:
+            ready.append((chapter, self.segment_path(chapter)))
+            chapter += 1
+        return ready
+
+    def add_segment(self, chapter:int, start:int, end:int, channels:str, digest:str|None, duration:float, title:str)->bool:
+        self.segments[int(chapter)] = {
+            "start": int(start),
+            "end": int(end),
+            "channels": channels,
+            "digest": digest,
+            "duration": float(duration),
+            "title": title
+        }
+        return self._write()
+
+    def finish(self)->bool:
+        self.finished = True
+        return self._write()
+
+    def _write(self)->bool:
+        try:
+            with self.lock:
+                os.makedirs(self.stream_dir, exist_ok=True)
+                ready = self.get_ready_segments()
+                target = max([math.ceil(self.segments[c]['duration']) for c, _ in ready] or [1])
+                lines = [
+                    '#EXTM3U',
+                    '#EXT-X-VERSION:3',
+                    '#EXT-X-PLAYLIST-TYPE:EVENT',
+                    f'#EXT-X-TARGETDURATION:{target}',
+                    '#EXT-X-MEDIA-SEQUENCE:0'
+                ]
+                for chapter, path in ready:
+                    entry = self.segments[chapter]
+                    title = entry['title'].replace(',', ' ').replace('\n', ' ')
+                    lines.append(f"#EXTINF:{entry['duration']:.3f},{title}")
+                    lines.append(os.path.basename(path))
+                if self.finished and len(ready) == len(self.segments):
+                    lines.append('#EXT-X-ENDLIST')
+                # readers only ever see a complete playlist or index
+                for file, content in (
+                    (self.index_file, json.dumps({"segments": self.segments, "finished": self.finished}, ensure_ascii=False)),
+                    (self.playlist_file, '\n'.join(lines) + '\n')
+                ):
+                    tmp_file = f'{file}.tmp'
+                    with open(tmp_file, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                    os.replace(tmp_file, file)
+            return True
+        except OSError as e:
+            error = f'ChapterStream._write() error: {e}'
+            print(error)
+            return False
@@ -0,0 +1,296 @@
+import os, re, posixpath, threading, zipfile, mimetypes, uuid
+
+from collections import namedtuple
+from urllib.parse import unquote, quote
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+container_file = 'META-INF/container.xml'
+
+xml_ns = {
+    "container": 'urn:oasis:names:tc:opendocument:xmlns:container',
+    "opf": 'http://www.idpf.org/2007/opf',
+    "dc": 'http://purl.org/dc/elements/1.1/',
+    "ncx": 'http://www.daisy.org/z3986/2005/ncx/',
+    "xhtml": 'http://www.w3.org/1999/xhtml',
+    "epub": 'http://www.idpf.org/2007/ops'
+}
+
+document_media_types = ('application/xhtml+xml', 'text/html')
+
+# the <body> element with its attributes, up to the end of the file if it is never closed
+body_re = re.compile(rb'<body\b[^>]*>.*?(?:</body\s*>|\Z)', re.S | re.I)
+
+EpubTocEntry = namedtuple('EpubTocEntry', ['title', 'href'])
+
+class EpubDocument:
+
+    # a spine document, its bytes are read from the archive each time they are asked for
+
+    def __init__(self, reader:'EpubReader', item_id:str, name:str, media_type:str)->None:
+        self.reader = reader
+        self.id = item_id
+        self.name = name
+        self.media_type = media_type
+
+    def get_id(self)->str:
+        return self.id
+
+    def get_name(self)->str:
+        return self.name
+
+    def get_content(self)->bytes:
+        return self.reader.read(self.name)
+
+    def get_body_content(self)->bytes:
+        return self.reader.read_body(self.name)
+
+class EpubReader:
+
+    # reads the OPF package (metadata, manifest, spine) and the table of contents only,
+    # documents and images stay in the archive until they are read, so memory follows
+    # the largest document rather than the whole book
+
+    def __init__(self, epub_path:str)->None:
+        self.epub_path = epub_path
+        self.lock = threading.Lock()
+        self._zf = zipfile.ZipFile(epub_path, 'r')
+        self._names = None
+        self._basenames = None
+        try:
+            container = ElementTree.fromstring(self._zf.read(container_file))
+            rootfile = container.find('.//container:rootfile', xml_ns)
+            if rootfile is None or not rootfile.get('full-path'):
+                raise ValueError(f'{container_file} has no rootfile')
+            self.opf_path = rootfile.get('full-path')
+            self.opf_dir = posixpath.dirname(self.opf_path)
+            opf = ElementTree.fromstring(self._zf.read(self.opf_path))
+            self.metadata = self._parse_metadata(opf)
+            self.manifest = {}
+            for item in opf.iterfind('opf:manifest/opf:item', xml_ns):
+                item_id = item.get('id')
+                href = item.get('href')
+                if item_id and href:
+                    self.manifest[item_id] = {
+                        "name": self.get_path(self.opf_dir, href),
+                        "media_type": item.get('media-type', ''),
+                        "properties": item.get('properties', '').split()
+                    }
+            spine = opf.find('opf:spine', xml_ns)
+            self.spine = [] if spine is None else [
+                (itemref.get('idref'), itemref.get('linear', 'yes'))
+                for itemref in spine.iterfind('opf:itemref', xml_ns)
+                if itemref.get('idref') in self.manifest
+            ]
+            self.toc = self._parse_toc(spine)
+        except Exception:
+            self._zf.close()
+            raise
+
+    @classmethod
+    def open(cls, epub_path:str)->'EpubReader|None':
+        try:
+            return cls(epub_path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+            error = f'EpubReader.open() error: {epub_path}: {e}'
+            print(error)
+            return None
+
+    @classmethod
+    def write(cls, epub_path:str, metadata:dict, documents:list[tuple[str, bytes]], resources:list[tuple[str, bytes]]|None=None)->'EpubReader':
+        # a minimal EPUB 3 holding the documents in spine order, only what this reader needs,
+        # metadata is {dc name: value}, document and resource names are relative to the package
+        items = []
+        spine = []
+        for idx, (name, content) in enumerate(documents):
+            items.append((f'doc{idx}', name, 'application/xhtml+xml', content))
+            spine.append(f'doc{idx}')
+        for idx, (name, content) in enumerate(resources or []):
+            items.append((f'res{idx}', name, mimetypes.guess_type(name)[0] or 'application/octet-stream', content))
+        identifier = metadata.get('identifier') or f'urn:uuid:{uuid.uuid4()}'
+        dc = ''.join(
+            f'<dc:{key}>{escape(str(value))}</dc:{key}>\n'
+            for key, value in metadata.items() if value and key != 'identifier'
+        )
+        opf = (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<package xmlns="{xml_ns["opf"]}" version="3.0" unique-identifier="id">\n'
+            f'<metadata xmlns:dc="{xml_ns["dc"]}">\n'
+            f'<dc:identifier id="id">{escape(identifier)}</dc:identifier>\n'
+            f'{dc}'
+            '</metadata>\n<manifest>\n'
+            + ''.join(f'<item id="{item_id}" href="{escape(quote(name))}" media-type="{media_type}"/>\n' for item_id, name, media_type, _ in items)
+            + '</manifest>\n<spine>\n'
+            + ''.join(f'<itemref idref="{item_id}"/>\n' for item_id in spine)
+            + '</spine>\n</package>\n'
+        )
+        container = (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            f'<container version="1.0" xmlns="{xml_ns["container"]}">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>'
+            '</container>\n'
+        )
+        tmp_file = f'{epub_path}.tmp'
+        with zipfile.ZipFile(tmp_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+            zf.writestr(container_file, container)
+            zf.writestr('OEBPS/content.opf', opf)
+            for _, name, _, content in items:
+                zf.writestr(f'OEBPS/{name}', content)
+        os.replace(tmp_file, epub_path)
+        return cls(epub_path)
+
+    def rewrite(self, epub_path:str, documents:dict[str, list[bytes]])->'EpubReader':
+        # a copy of the archive where each listed document is replaced by its parts: the first part keeps
+        # the document name so the toc and links still lead to it, the next ones follow it in the manifest
+        # and the spine, the rest of the archive and of the package is copied as it is
+        opf = self.read(self.opf_path).decode('utf-8')
+        names = set(self._zf.namelist())
+        extras = []
+        for item_id, item in self.manifest.items():
+            parts = documents.get(item['name'])
+            if not parts or len(parts) < 2:
+                continue
+            stem, ext = posixpath.splitext(item['name'])
+            added = []
+            for k, content in enumerate(parts[1:], start=1):
+                name = f'{stem}_{k:04d}{ext}'
+                if name in names:
+                    name = f'{stem}_{uuid.uuid4().hex[:8]}_{k:04d}{ext}'
+                names.add(name)
+                added.append((f'{item_id}_{k:04d}', name, content))
+            spine_re = re.compile(r'<((?:[\w-]+:)?)itemref\b[^>]*\bidref\s*=\s*["\']' + re.escape(item_id) + r'["\'][^>]*>(\s*</(?:[\w-]+:)?itemref\s*>)?')
+            m = spine_re.search(opf)
+            if m is None:
+                continue
+            opf = opf[:m.end()] + ''.join(f'\n<{m.group(1)}itemref idref="{extra_id}"/>' for extra_id, _, _ in added) + opf[m.end():]
+            m = re.search(r'</((?:[\w-]+:)?)manifest\s*>', opf)
+            opf = opf[:m.start()] + ''.join(
+                f'<{m.group(1)}item id="{extra_id}" href="{escape(quote(posixpath.relpath(name, self.opf_dir or ".")))}" media-type="{item["media_type"]}"/>\n'
+                for extra_id, name, _ in added
+            ) + opf[m.start():]
+            extras.extend((name, content) for _, name, content in added)
+        tmp_file = f'{epub_path}.tmp'
+        with zipfile.ZipFile(tmp_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+            for info in self._zf.infolist():
+                if info.filename == 'mimetype' or info.is_dir():
+                    continue
+                if info.filename == self.opf_path:
+                    zf.writestr(info.filename, opf.encode('utf-8'))
+                elif info.filename in documents:
+                    zf.writestr(info.filename, documents[info.filename][0])
+                else:
+                    zf.writestr(info, self.read(info.filename))
+            for name, content in extras:
+                zf.writestr(name, content)
+        os.replace(tmp_file, epub_path)
+        return EpubReader(epub_path)
+
+    @staticmethod
+    def get_path(base_dir:str, href:str)->str:
+        path = unquote(href.split('#', 1)[0])
+        return posixpath.normpath(posixpath.join(base_dir, path)).lstrip('/')
+
+    def _parse_metadata(self, opf:ElementTree.Element)->dict:
+        # same layout as ebooklib: {namespace: {name: [(value, attributes)]}}
+        metadata = {"DC": {}, "OPF": {}}
+        node = opf.find('opf:metadata', xml_ns)
+        if node is None:
+            return metadata
+        dc_prefix = '{' + xml_ns['dc'] + '}'
+        for child in node:
+            if not isinstance(child.tag, str):
+                continue
+            if child.tag.startswith(dc_prefix):
+                name = child.tag[len(dc_prefix):]
+                metadata['DC'].setdefault(name, []).append(((child.text or '').strip(), dict(child.attrib)))
+            elif child.tag.endswith('}meta') or child.tag == 'meta':
+                metadata['OPF'].setdefault(child.get('name') or child.get('property') or '', []).append(((child.text or '').strip(), dict(child.attrib)))
+        return metadata
+
+    def _parse_toc(self, spine:ElementTree.Element|None)->list[EpubTocEntry]:
+        # EPUB 3 navigation document first, the NCX of EPUB 2 otherwise
+        try:
+            for item in self.manifest.values():
+                if 'nav' in item['properties']:
+                    nav_doc = ElementTree.fromstring(self._zf.read(item['name']))
+                    base_dir = posixpath.dirname(item['name'])
+                    toc_type = '{' + xml_ns['epub'] + '}type'
+                    for nav in nav_doc.iter('{' + xml_ns['xhtml'] + '}nav'):
+                        if nav.get(toc_type) == 'toc':
+                            return [
+                                EpubTocEntry(''.join(a.itertext()).strip(), self.get_path(base_dir, a.get('href', '')))
+                                for a in nav.iter('{' + xml_ns['xhtml'] + '}a')
+                            ]
+            ncx_id = spine.get('toc') if spine is not None else None
+            if ncx_id in self.manifest:
+                ncx_name = self.manifest[ncx_id]['name']
+                ncx = ElementTree.fromstring(self._zf.read(ncx_name))
+                base_dir = posixpath.dirname(ncx_name)
+                return [
+                    EpubTocEntry(
+                        ''.join(point.find('ncx:navLabel', xml_ns).itertext()).strip(),
+                        self.get_path(base_dir, point.find('ncx:content', xml_ns).get('src', ''))
+                    )
+                    for point in ncx.iter('{' + xml_ns['ncx'] + '}navPoint')
+                    if point.find('ncx:navLabel', xml_ns) is not None and point.find('ncx:content', xml_ns) is not None
+                ]
+        except (KeyError, ElementTree.ParseError) as e:
+            error = f'EpubReader._parse_toc() error: {e}'
+            print(error)
+        return []
+
+    def get_metadata(self, namespace:str, name:str)->list[tuple[str, dict]]:
+        return self.metadata.get(namespace, {}).get(name, [])
+
+    def get_documents(self)->list[EpubDocument]:
+        docs = []
+        for item_id, _ in self.spine:
+            item = self.manifest[item_id]
+            if item['media_type'] in document_media_types:
+                docs.append(EpubDocument(self, item_id, item['name'], item['media_type']))
+        return docs
+
+    def get_cover_name(self)->str|None:
+        for item in self.manifest.values():
+            if 'cover-image' in item['properties']:
+                return item['name']
+        for value, attributes in self.get_metadata('OPF', 'cover'):
+            item = self.manifest.get(attributes.get('content'))
+            if item and item['media_type'].startswith('image/'):
+                return item['name']
+        for item_id, item in self.manifest.items():
+            if item['media_type'].startswith('image/') and ('cover' in item['name'].lower() or 'cover' in item_id.lower()):
+                return item['name']
+        return None
+
+    def read(self, name:str)->bytes:
+        # ZipFile reads are serialized, the parsing thread and the caller may share the reader
+        with self.lock:
+            return self._zf.read(name)
+
+    def read_body(self, name:str)->bytes:
+        # the head is never needed by the block parsing, documents without a body are returned whole
+        content = self.read(name)
+        m = body_re.search(content)
+        return m.group(0) if m else content
+
+    def resolve(self, doc_name:str, href:str)->str|None:
+        # archive path of a resource referenced from a document, by file name if the link is broken
+        if self._names is None:
+            self._names = set(self._zf.namelist())
+            self._basenames = {posixpath.basename(n): n for n in self._names}
+        path = self.get_path(posixpath.dirname(doc_name), href.replace('\\', '/'))
+        if path in self._names:
+            return path
+        return self._basenames.get(posixpath.basename(path))
+
+    def close(self)->None:
+        self._zf.close()
+
+    def __enter__(self)->'EpubReader':
+        return self
+
+    def __exit__(self, *args)->None:
+        self.close()
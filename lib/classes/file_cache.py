@@ -0,0 +1,217 @@
+import os, shutil, threading, hashlib, uuid, json, time
+
+class FileCache:
+
+    # the last full scan of the folder, shared by every instance and process using it
+    scan_file = 'scan.json'
+    # the folder is scanned again at least this often while storing, so files added by other processes are counted
+    scan_interval = 60
+
+    # file digests already computed in this process, by path, size and mtime
+    digests = {}
+    digests_lock = threading.Lock()
+
+    def __init__(self, cache_dir:str, max_size_bytes:int, ext:str)->None:
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.ext = ext
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # no walk here, the size comes from the last scan and is corrected at the next one
+        self.size_bytes, self.scanned_at = self._load_scan()
+
+    @staticmethod
+    def make_key(*parts:object)->str:
+        h = hashlib.sha256()
+        for part in parts:
+            h.update(repr(part).encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    @classmethod
+    def file_digest(cls, path:str)->str|None:
+        if not path or not os.path.isfile(path):
+            return None
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        with cls.digests_lock:
+            digest = cls.digests.get(memo_key)
+        if digest is not None:
+            return digest
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with cls.digests_lock:
+            cls.digests[memo_key] = digest
+        return digest
+
+    def path(self, key:str)->str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.{self.ext}')
+
+    def meta_path(self, key:str)->str:
+        # small json kept beside its entry and evicted with it, not counted in the cache size
+        return f'{self.path(key)}.json'
+
+    def _scan(self)->list[tuple[float, str, int]]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(f'.{self.ext}'):
+                    p = os.path.join(root, name)
+                    try:
+                        st = os.stat(p)
+                        entries.append((st.st_mtime, p, st.st_size))
+                    except OSError:
+                        pass
+        return entries
+
+    def _load_scan(self)->tuple[int, float]:
+        try:
+            with open(os.path.join(self.cache_dir, self.scan_file), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return int(data['size_bytes']), float(data['scanned_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0.0
+
+    def _save_scan(self)->None:
+        scan_path = os.path.join(self.cache_dir, self.scan_file)
+        tmp = f'{scan_path}.{uuid.uuid4().hex}.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"size_bytes": self.size_bytes, "scanned_at": self.scanned_at}, f)
+            os.replace(tmp, scan_path)
+        except OSError as e:
+            error = f'FileCache._save_scan() error: {e}'
+            print(error)
+
+    def _link(self, src:str, dest:str)->None:
+        if os.path.exists(dest):
+            os.remove(dest)
+        try:
+            os.link(src, dest)
+        except OSError:
+            shutil.copy2(src, dest)
+
+    def fetch(self, key:str, dest:str)->bool:
+        src = self.path(key)
+        try:
+            if os.path.exists(src) and os.path.getsize(src) > 0:
+                self._link(src, dest)
+                # mtime is the recency used for eviction
+                os.utime(src, None)
+                with self.lock:
+                    self.hits += 1
+                return True
+        except OSError:
+            pass
+        with self.lock:
+            self.misses += 1
+        return False
+
+    def fetch_bytes(self, key:str)->bytes|None:
+        src = self.path(key)
+        try:
+            with open(src, 'rb') as f:
+                data = f.read()
+            if data:
+                os.utime(src, None)
+                with self.lock:
+                    self.hits += 1
+                return data
+        except OSError:
+            pass
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def _add(self, tmp:str, dest:str)->None:
+        os.replace(tmp, dest)
+        with self.lock:
+            self.size_bytes += os.path.getsize(dest)
+            if self.size_bytes > self.max_size_bytes or time.time() - self.scanned_at >= self.scan_interval:
+                self._evict()
+
+    def store(self, key:str, src:str)->bool:
+        dest = self.path(key)
+        if os.path.exists(dest):
+            return True
+        try:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            # copy rather than link so rewriting the source never alters the cache
+            tmp = f'{dest}.{uuid.uuid4().hex}.tmp'
+            shutil.copyfile(src, tmp)
+            self._add(tmp, dest)
+            return True
+        except OSError as e:
+            error = f'FileCache.store() error: {e}'
+            print(error)
+            return False
+
+    def store_bytes(self, key:str, data:bytes)->bool:
+        dest = self.path(key)
+        if os.path.exists(dest):
+            return True
+        try:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            tmp = f'{dest}.{uuid.uuid4().hex}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            self._add(tmp, dest)
+            return True
+        except OSError as e:
+            error = f'FileCache.store_bytes() error: {e}'
+            print(error)
+            return False
+
+    def fetch_meta(self, key:str)->dict|None:
+        try:
+            with open(self.meta_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store_meta(self, key:str, meta:dict)->bool:
+        dest = self.meta_path(key)
+        try:
+            tmp = f'{dest}.{uuid.uuid4().hex}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp, dest)
+            return True
+        except OSError as e:
+            error = f'FileCache.store_meta() error: {e}'
+            print(error)
+            return False
+
+    def _evict(self)->None:
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size in entries)
+        if total > self.max_size_bytes:
+            # evict down to 90% so eviction does not run on every store
+            target = int(self.max_size_bytes * 0.9)
+            for _, p, size in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(p)
+                    total -= size
+                    if os.path.exists(f'{p}.json'):
+                        os.remove(f'{p}.json')
+                except OSError:
+                    pass
+        self.size_bytes = total
+        self.scanned_at = time.time()
+        self._save_scan()
+
+    def get_stats(self)->dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size_bytes": self.size_bytes
+        }
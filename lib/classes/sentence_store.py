@@ -0,0 +1,103 @@
+import os, mmap, struct
+
+from array import array
+
+# written in the session process_dir
+sentence_store_file = 'sentences.bin'
+
+class SentenceStore:
+
+    # the sentences of all the blocks in one read-only memory-mapped file:
+    #   header   magic, sentence count, block count
+    #   offsets  sentence count + 1 byte offsets of each sentence in the text
+    #   bounds   block count + 1 index of the first sentence of each block
+    #   text     the sentences encoded in UTF-8, back to back
+    # a block reads like the list of its sentences, so the store can replace the former list of lists
+
+    magic = b'E2ASENT1'
+    header = struct.Struct('=8sQQ')
+
+    def __init__(self, store_file:str)->None:
+        self.store_file = store_file
+        self._file = open(store_file, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, sentence_count, chapter_count = self.header.unpack_from(self._mmap, 0)
+            if magic != self.magic:
+                raise ValueError(f'{store_file} is not a sentence store')
+            self._view = memoryview(self._mmap)
+            pos = self.header.size
+            end = pos + 8 * (sentence_count + 1)
+            self.offsets = self._view[pos:end].cast('Q')
+            pos, end = end, end + 8 * (chapter_count + 1)
+            self.bounds = self._view[pos:end].cast('Q')
+            self.text_start = end
+        except Exception:
+            self._file.close()
+            raise
+
+    @classmethod
+    def write(cls, store_file:str, chapters:list[list[str]])->'SentenceStore':
+        offsets = array('Q', [0])
+        bounds = array('Q', [0])
+        tmp_file = f'{store_file}.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(b'\0' * cls.header.size)
+            chunks = []
+            total = 0
+            for sentences in chapters:
+                for sentence in sentences:
+                    data = str(sentence).encode('utf-8')
+                    chunks.append(data)
+                    total += len(data)
+                    offsets.append(total)
+                bounds.append(len(offsets) - 1)
+            f.write(offsets.tobytes())
+            f.write(bounds.tobytes())
+            f.write(b''.join(chunks))
+            f.seek(0)
+            f.write(cls.header.pack(cls.magic, len(offsets) - 1, len(bounds) - 1))
+        os.replace(tmp_file, store_file)
+        return cls(store_file)
+
+    @property
+    def sentence_count(self)->int:
+        return len(self.offsets) - 1
+
+    def __len__(self)->int:
+        return len(self.bounds) - 1
+
+    def get_sentence(self, index:int)->str:
+        start = self.text_start + self.offsets[index]
+        end = self.text_start + self.offsets[index + 1]
+        return str(self._mmap[start:end], 'utf-8')
+
+    def chapter_length(self, chapter:int)->int:
+        return self.bounds[chapter + 1] - self.bounds[chapter]
+
+    def first_sentence(self, chapter:int)->str:
+        return self.get_sentence(self.bounds[chapter]) if self.chapter_length(chapter) > 0 else ''
+
+    def __getitem__(self, chapter:int)->list[str]:
+        if chapter < 0:
+            chapter += len(self)
+        if chapter < 0 or chapter >= len(self):
+            raise IndexError('block index out of range')
+        return [self.get_sentence(i) for i in range(self.bounds[chapter], self.bounds[chapter + 1])]
+
+    def __iter__(self):
+        for chapter in range(len(self)):
+            yield self[chapter]
+
+    def close(self)->None:
+        # the views must be released before the mapping can be closed
+        for view in (self.offsets, self.bounds, self._view):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self)->'SentenceStore':
+        return self
+
+    def __exit__(self, *args)->None:
+        self.close()
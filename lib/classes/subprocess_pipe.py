@@ -4,7 +4,7 @@ from collections.abc import Callable
 
 class SubprocessPipe:
 
-    def __init__(self, cmd:list[str], is_gui_process:bool, total_duration:float, msg:str='Processing', on_progress:Callable[[float], None]|None=None)->None:
+    def __init__(self, cmd:list[str], is_gui_process:bool, total_duration:float, msg:str='Processing', on_progress:Callable[[float], None]|None=None, print_progress:bool=True)->None:
         self.cmd = cmd
         self.is_gui_process = is_gui_process
         self.total_duration = total_duration
@@ -12,6 +12,7 @@ class SubprocessPipe:
         self.process = None
         self._stop_requested = False
         self.on_progress = on_progress
+        self.print_progress = print_progress
         self.progress_bar = False
         if self.is_gui_process:
             self.progress_bar = gr.Progress(track_tqdm=False)
@@ -22,8 +23,9 @@ class SubprocessPipe:
             self.on_progress(percent)
         elif self.progress_bar:
             self.progress_bar(percent / 100.0, desc=self.msg)
-        sys.stdout.write(f"\r{self.msg} - {percent:.1f}%")
-        sys.stdout.flush()
+        if self.print_progress:
+            sys.stdout.write(f"\r{self.msg} - {percent:.1f}%")
+            sys.stdout.flush()
 
     def _on_complete(self)->None:
         msg = f"\n{self.msg} completed!"
@@ -1,4 +1,4 @@
-import os, subprocess, shutil, json
+import os, subprocess, shutil, json, math
 
 from typing import Any, Union, TYPE_CHECKING
 from lib.classes.subprocess_pipe import SubprocessPipe
@@ -78,6 +78,134 @@ def get_audio_duration(filepath: str) -> float:
         print(f"get_audio_duration: {filepath}: {e}")
         return 0.0
 
+def get_audio_samples(filepath:str)->tuple[int, int]|None:
+    # (sample count, samplerate) from the stream header, exact for flac/wav
+    try:
+        audio = MutagenFile(filepath)
+        if audio is None or audio.info is None:
+            return None
+        samplerate = int(audio.info.sample_rate)
+        total_samples = getattr(audio.info, 'total_samples', None)
+        if not total_samples:
+            total_samples = round(audio.info.length * samplerate)
+        return int(total_samples), samplerate
+    except Exception as e:
+        print(f"get_audio_samples: {filepath}: {e}")
+        return None
+
+adts_samplerates = (96000, 88200, 64000, 48000, 44100, 32000, 24000, 22050, 16000, 12000, 11025, 8000, 7350)
+
+def get_adts_duration(filepath:str)->float|None:
+    # exact duration of an AAC (ADTS) stream from its frame headers, 1024 samples per raw data block,
+    # encoder priming included since ADTS has no edit list to drop it
+    try:
+        with open(filepath, 'rb') as f:
+            data = f.read()
+        pos = 0
+        samples = 0
+        samplerate = None
+        while pos + 7 <= len(data):
+            if data[pos] != 0xFF or (data[pos + 1] & 0xF6) != 0xF0:
+                error = f'get_adts_duration() error: {filepath}: no ADTS sync at byte {pos}'
+                print(error)
+                return None
+            samplerate = adts_samplerates[(data[pos + 2] >> 2) & 0x0F]
+            frame_length = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+            if frame_length < 7:
+                error = f'get_adts_duration() error: {filepath}: bad frame length at byte {pos}'
+                print(error)
+                return None
+            samples += 1024 * ((data[pos + 6] & 0x03) + 1)
+            pos += frame_length
+        if samplerate is None:
+            return None
+        return samples / samplerate
+    except (OSError, IndexError) as e:
+        error = f'get_adts_duration() error: {filepath}: {e}'
+        print(error)
+        return None
+
+def _biquad_coefs(kind:str, fc:float, q:float, gain_db:float, samplerate:int)->tuple[float, ...]:
+    w0 = 2.0 * math.pi * fc / samplerate
+    alpha = math.sin(w0) / (2.0 * q)
+    cos_w0 = math.cos(w0)
+    if kind == 'high_shelf':
+        a = 10 ** (gain_db / 40.0)
+        sqrt_a = 2.0 * math.sqrt(a) * alpha
+        return (
+            a * ((a + 1) + (a - 1) * cos_w0 + sqrt_a),
+            -2 * a * ((a - 1) + (a + 1) * cos_w0),
+            a * ((a + 1) + (a - 1) * cos_w0 - sqrt_a),
+            (a + 1) - (a - 1) * cos_w0 + sqrt_a,
+            2 * ((a - 1) - (a + 1) * cos_w0),
+            (a + 1) - (a - 1) * cos_w0 - sqrt_a
+        )
+    return (
+        (1 + cos_w0) / 2,
+        -(1 + cos_w0),
+        (1 + cos_w0) / 2,
+        1 + alpha,
+        -2 * cos_w0,
+        1 - alpha
+    )
+
+def get_loudness_stats(audio_data:'Tensor', samplerate:int)->tuple[float, int, float]|None:
+    # ITU-R BS.1770 K-weighted energy of the 400ms blocks above the -70 LUFS absolute gate,
+    # kept as sums so any range of sentences can be combined without reading the audio again
+    try:
+        import torch
+        import torchaudio.functional as F
+        audio = audio_data.detach().to('cpu', torch.float32)
+        if audio.ndim == 1:
+            audio = audio.unsqueeze(0)
+        if audio.numel() == 0:
+            return 0.0, 0, 0.0
+        weighted = audio
+        for coefs in (_biquad_coefs('high_shelf', 1500.0, 1 / math.sqrt(2), 4.0, samplerate), _biquad_coefs('high_pass', 38.0, 0.5, 0.0, samplerate)):
+            b_coeffs = torch.tensor([c / coefs[3] for c in coefs[:3]], dtype=torch.float32)
+            a_coeffs = torch.tensor([c / coefs[3] for c in coefs[3:]], dtype=torch.float32)
+            weighted = F.lfilter(weighted, a_coeffs, b_coeffs, clamp=False)
+        block_size = int(0.4 * samplerate)
+        step = int(0.1 * samplerate)
+        power = weighted.pow(2).sum(dim=0)
+        if power.shape[0] < block_size:
+            block_power = power.mean().unsqueeze(0)
+        else:
+            block_power = power.unfold(0, block_size, step).mean(dim=1)
+        gated = block_power[block_power > 10 ** ((-70.0 + 0.691) / 10)]
+        # true peak from 4x oversampling
+        oversampled = F.resample(audio, samplerate, samplerate * 4)
+        peak = max(audio.abs().max().item(), oversampled.abs().max().item())
+        return float(gated.sum().item()), int(gated.numel()), float(peak)
+    except Exception as e:
+        error = f'get_loudness_stats() error: {e}'
+        print(error)
+        return None
+
+def get_file_loudness_stats(filepath:str)->tuple[float, int, float]|None:
+    try:
+        import torchaudio
+        audio, samplerate = torchaudio.load(filepath)
+        return get_loudness_stats(audio, samplerate)
+    except Exception as e:
+        error = f'get_file_loudness_stats() error: {filepath}: {e}'
+        print(error)
+        return None
+
+def get_integrated_loudness(stats:list[tuple[float, int, float]])->tuple[float, float]|None:
+    # (integrated LUFS, true peak dBTP) of the concatenated sentences,
+    # the -10 LU relative gate is applied per sentence rather than per block
+    gated = [(energy, blocks) for energy, blocks, _ in stats if blocks > 0 and energy > 0]
+    if not gated:
+        return None
+    loudness = -0.691 + 10 * math.log10(sum(e for e, _ in gated) / sum(b for _, b in gated))
+    relative = [(e, b) for e, b in gated if -0.691 + 10 * math.log10(e / b) > loudness - 10.0]
+    if relative:
+        loudness = -0.691 + 10 * math.log10(sum(e for e, _ in relative) / sum(b for _, b in relative))
+    peak = max(p for _, _, p in stats)
+    peak_db = 20 * math.log10(peak) if peak > 0 else -120.0
+    return loudness, peak_db
+
 def get_audiolist_duration(filepaths: list[str]) -> dict[str, float]:
     durations = {}
     for p in filepaths:
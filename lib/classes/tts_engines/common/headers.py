@@ -6,7 +6,8 @@ from multiprocessing.managers import DictProxy
 
 from lib.classes.tts_registry import TTSRegistry
 from lib.classes.tts_engines.common.utils import TTSUtils
-from lib.conf import tts_dir, devices, default_audio_proc_format
+from lib.classes.audio_manifest import AudioManifest, audio_manifest_file
+from lib.conf import tts_dir, latents_dir, devices, default_audio_proc_format
 from lib.conf_models import TTS_ENGINES, TTS_VOICE_CONVERSION, TTS_SML, SML_TAG_PATTERN, loaded_tts, default_vc_model, default_engine_settings
 
 __all__ = [
@@ -21,7 +22,10 @@ __all__ = [
     "DictProxy",
     "TTSRegistry",
     "TTSUtils",
+    "AudioManifest",
+    "audio_manifest_file",
     "tts_dir",
+    "latents_dir",
     "devices",
     "default_audio_proc_format",
     "TTS_ENGINES",
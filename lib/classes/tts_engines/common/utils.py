@@ -1,14 +1,25 @@
-import os, threading, gc, shutil, tempfile, regex as re
+import os, threading, gc, time, shutil, tempfile, weakref, regex as re
 
 from typing import Any, Union, Dict, TYPE_CHECKING
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from lib.classes.vram_detector import VRAMDetector
-from lib.classes.tts_engines.common.audio import normalize_audio, get_audiolist_duration, is_audio_data_valid
+from lib.classes.tts_engines.common.audio import normalize_audio, get_audiolist_duration, is_audio_data_valid, get_loudness_stats
+from lib.classes.audio_manifest import AudioManifest, audio_manifest_file
 from lib import *
 
 _lock = threading.Lock()
 
+# device each loaded model currently lives on (models not listed are on cpu)
+_models_device = weakref.WeakKeyDictionary()
+# models are sent back to cpu when free vram falls below this ratio
+models_min_free_vram_ratio = 0.1
+
+# memory maintenance runs every N sentences, above the allocated vram watermark or on model switch
+memory_cleanup_interval = 32
+memory_cleanup_watermark = 0.8
+
 if TYPE_CHECKING:
     import torch
     from torch import Tensor
@@ -19,11 +30,130 @@ class TTSUtils:
 
     def _cleanup_memory(self)->None:
         import torch
+        start = time.perf_counter()
         gc.collect()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
             torch.cuda.ipc_collect()
             torch.cuda.synchronize()
+        self.memory_schedule['sentences'] = 0
+        self.metrics['memory_cleanups'] += 1
+        self.metrics['memory_cleanup_time'] += time.perf_counter() - start
+
+    def _schedule_memory_cleanup(self)->None:
+        import torch
+        tts_key = getattr(self, 'tts_key', None)
+        self.memory_schedule['sentences'] += 1
+        if self.memory_schedule['tts_key'] != tts_key:
+            self.memory_schedule['tts_key'] = tts_key
+            self._cleanup_memory()
+            return
+        if self.memory_schedule['sentences'] >= memory_cleanup_interval:
+            self._cleanup_memory()
+            return
+        if torch.cuda.is_available():
+            try:
+                total = torch.cuda.get_device_properties(torch.cuda.current_device()).total_memory
+                if total > 0 and torch.cuda.memory_allocated() / total >= memory_cleanup_watermark:
+                    self._cleanup_memory()
+            except Exception:
+                pass
+
+    def _set_model_device(self, model:Any, device:str)->None:
+        if model is None:
+            return
+        cpu = devices['CPU']['proc']
+        try:
+            current = _models_device.get(model, cpu)
+        except TypeError:
+            current = None
+        if current == device:
+            return
+        if device != cpu:
+            self._relieve_memory_pressure(model)
+        model.to(device)
+        try:
+            if device == cpu:
+                _models_device.pop(model, None)
+            else:
+                _models_device[model] = device
+        except TypeError:
+            pass
+        self.metrics['device_transfers'] += 1
+
+    def _relieve_memory_pressure(self, keep:Any=None)->None:
+        import torch
+        if not torch.cuda.is_available():
+            return
+        try:
+            free, total = torch.cuda.mem_get_info()
+        except Exception:
+            return
+        if total <= 0 or free / total >= models_min_free_vram_ratio:
+            return
+        for model in list(_models_device.keys()):
+            if model is not keep:
+                self._set_model_device(model, devices['CPU']['proc'])
+        self._cleanup_memory()
+
+    def release_devices(self)->None:
+        for model in (getattr(self, 'engine', None), getattr(self, 'engine_zs', None)):
+            self._set_model_device(model, devices['CPU']['proc'])
+        self._cleanup_memory()
+
+    def start_audio_writer(self, max_workers:int=2)->None:
+        self.stop_audio_writer()
+        self._writer_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audio_writer')
+        self._writer_slots = threading.BoundedSemaphore(max_workers * 2)
+        self._writer_futures = []
+
+    def _write_sentence_audio(self, final_sentence_file:str, audio_tensor:'Tensor', samplerate:int, sentence_index:int, sentence:str)->bool:
+        import torchaudio
+        try:
+            # loudness stats are measured here, in the writer threads, so the export only applies a static gain
+            # written aside then renamed, so a killed run never leaves a truncated sentence file,
+            # the rename also replaces a previous file that may be a hardlink to the sentence cache
+            tmp_sentence_file = f'{final_sentence_file}.tmp'
+            torchaudio.save(tmp_sentence_file, audio_tensor, samplerate, format=default_audio_proc_format)
+            if not os.path.exists(tmp_sentence_file) or os.path.getsize(tmp_sentence_file) == 0:
+                error = f"Cannot create {final_sentence_file}"
+                print(error)
+                return False
+            os.replace(tmp_sentence_file, final_sentence_file)
+            self.audio_manifest.add_sentence(sentence_index, audio_tensor.shape[-1], samplerate, sentence, get_loudness_stats(audio_tensor, samplerate))
+            return True
+        except Exception as e:
+            error = f'_write_sentence_audio() error: {e}'
+            print(error)
+            return False
+
+    def _save_sentence_audio(self, final_sentence_file:str, audio_tensor:'Tensor', sentence_index:int, sentence:str)->bool:
+        pool = getattr(self, '_writer_pool', None)
+        if pool is None:
+            return self._write_sentence_audio(final_sentence_file, audio_tensor, self.params['samplerate'], sentence_index, sentence)
+        self._writer_slots.acquire()
+        try:
+            future = pool.submit(self._write_sentence_audio, final_sentence_file, audio_tensor, self.params['samplerate'], sentence_index, sentence)
+        except Exception:
+            self._writer_slots.release()
+            raise
+        future.add_done_callback(lambda f: self._writer_slots.release())
+        self._writer_futures.append(future)
+        return True
+
+    def flush_audio_writes(self)->bool:
+        futures = getattr(self, '_writer_futures', None)
+        if not futures:
+            return True
+        self._writer_futures = []
+        return all([f.result() for f in futures])
+
+    def stop_audio_writer(self)->None:
+        pool = getattr(self, '_writer_pool', None)
+        if pool is not None:
+            self.flush_audio_writes()
+            pool.shutdown(wait=True)
+            self._writer_pool = None
 
     def _model_size_bytes(self, model:Any)->int:
         total = 0
@@ -320,7 +450,7 @@ class TTSUtils:
                             if self.session.get(key) is not None
                         }
                         with torch.no_grad():
-                            engine.to(device)
+                            self._set_model_device(engine, device)
                             if device == devices['CPU']['proc']:
                                 result = engine.inference(
                                     text=default_text.strip(),
@@ -341,7 +471,7 @@ class TTSUtils:
                                         speaker_embedding=speaker_embedding,
                                         **fine_tuned_params,
                                     )
-                            engine.to(devices['CPU']['proc'])
+                            self._set_model_device(engine, devices['CPU']['proc'])
                         audio_sentence = result.get('wav')
                         if is_audio_data_valid(audio_sentence):
                             sourceTensor = self._tensor_type(audio_sentence)
@@ -496,71 +626,92 @@ class TTSUtils:
             return False, error
 
     def _format_timestamp(self, seconds:float)->str:
-        m, s = divmod(seconds, 60)
-        h, m = divmod(m, 60)
-        return f'{int(h):02}:{int(m):02}:{s:06.3f}'
+        return format_timestamp(seconds)
 
     def _build_vtt_file(self, all_sentences:list, audio_dir:str, vtt_path:str)->bool:
-        try:
-            import gradio as gr
-            from tqdm import tqdm
-            msg = 'VTT file creation started…'
-            print(msg)
-            audio_sentences_dir = Path(audio_dir)
-            audio_files = sorted(
-                audio_sentences_dir.glob(f'*.{default_audio_proc_format}'),
-                key=lambda p: int(p.stem)
-            )
-            all_sentences_length = len(all_sentences)
-            audio_files_length = len(audio_files)
-            expected_indices = list(range(audio_files_length))
-            actual_indices = [int(p.stem) for p in audio_files]
-            if actual_indices != expected_indices:
-                missing = sorted(set(expected_indices) - set(actual_indices))
-                error = f'Missing audio sentence files: {missing}'
-                print(error)
-                return False
-            if audio_files_length != all_sentences_length:
-                error = f'Audio/sentence mismatch: {audio_files_length} audio files vs {all_sentences_length} sentences'
-                print(error)
-                return False
-            sentences_total_time = 0.0
-            vtt_blocks = []
-            if self.session['is_gui_process']:
-                progress_bar = gr.Progress(track_tqdm=False)
-            msg = 'Get duration of each sentence…'
-            print(msg)
-            durations = get_audiolist_duration([str(p) for p in audio_files])
-            msg = 'Create VTT blocks…'
-            print(msg)
-            with tqdm(total=audio_files_length, unit='files') as t:
-                for idx, file in enumerate(audio_files):
-                    start_time = sentences_total_time
-                    duration = durations.get(os.path.realpath(file), 0.0)
-                    end_time = start_time + duration
-                    sentences_total_time = end_time
-                    start = self._format_timestamp(start_time)
-                    end = self._format_timestamp(end_time)
-                    text = re.sub(
-                        r'\s+',
-                        ' ',
-                        SML_TAG_PATTERN.sub('', str(all_sentences[idx]))
-                    ).strip()
-                    vtt_blocks.append(f'{start} --> {end}\n{text}\n')
-                    if self.session['is_gui_process']:
-                        total_progress = (t.n + 1) / audio_files_length
-                        progress_bar(
-                            progress=total_progress,
-                            desc=f'Writing vtt idx {idx}'
-                        )
-                    t.update(1)
-            msg = 'Write VTT blocks into file…'
-            print(msg)
-            with open(vtt_path, 'w', encoding='utf-8') as f:
-                f.write('WEBVTT\n\n')
-                f.write('\n'.join(vtt_blocks))
-            return True
-        except Exception as e:
-            error = f'_build_vtt_file(): {e}'
+        return build_vtt_file(self.session, all_sentences, audio_dir, vtt_path, self.audio_manifest)
+
+def format_timestamp(seconds:float)->str:
+    m, s = divmod(seconds, 60)
+    h, m = divmod(m, 60)
+    return f'{int(h):02}:{int(m):02}:{s:06.3f}'
+
+def build_vtt_file(session:Any, all_sentences:list, audio_dir:str, vtt_path:str, manifest:AudioManifest|None=None)->bool:
+    # needs the sentence files and the audio manifest only, not a loaded engine
+    try:
+        import gradio as gr
+        from tqdm import tqdm
+        msg = 'VTT file creation started…'
+        print(msg)
+        audio_sentences_dir = Path(audio_dir)
+        audio_files = sorted(
+            audio_sentences_dir.glob(f'*.{default_audio_proc_format}'),
+            key=lambda p: int(p.stem)
+        )
+        all_sentences_length = len(all_sentences)
+        audio_files_length = len(audio_files)
+        expected_indices = list(range(audio_files_length))
+        actual_indices = [int(p.stem) for p in audio_files]
+        if actual_indices != expected_indices:
+            missing = sorted(set(expected_indices) - set(actual_indices))
+            error = f'Missing audio sentence files: {missing}'
+            print(error)
+            return False
+        if audio_files_length != all_sentences_length:
+            error = f'Audio/sentence mismatch: {audio_files_length} audio files vs {all_sentences_length} sentences'
             print(error)
-            return False
\ No newline at end of file
+            return False
+        sentences_total_time = 0.0
+        vtt_blocks = []
+        if session['is_gui_process']:
+            progress_bar = gr.Progress(track_tqdm=False)
+        msg = 'Get duration of each sentence…'
+        print(msg)
+        if manifest is None:
+            manifest = AudioManifest(os.path.join(session['process_dir'], audio_manifest_file))
+        manifest = manifest.load()
+        durations = {}
+        unknown_files = []
+        for idx, file in enumerate(audio_files):
+            duration = manifest.get_sentence_duration(idx, all_sentences[idx])
+            if duration is None:
+                unknown_files.append(str(file))
+            else:
+                durations[os.path.realpath(file)] = duration
+        if unknown_files:
+            msg = f'{len(unknown_files)} sentences not found in the audio manifest, reading their duration from file…'
+            print(msg)
+            durations.update(get_audiolist_duration(unknown_files))
+        msg = 'Create VTT blocks…'
+        print(msg)
+        with tqdm(total=audio_files_length, unit='files') as t:
+            for idx, file in enumerate(audio_files):
+                start_time = sentences_total_time
+                duration = durations.get(os.path.realpath(file), 0.0)
+                end_time = start_time + duration
+                sentences_total_time = end_time
+                start = format_timestamp(start_time)
+                end = format_timestamp(end_time)
+                text = re.sub(
+                    r'\s+',
+                    ' ',
+                    SML_TAG_PATTERN.sub('', str(all_sentences[idx]))
+                ).strip()
+                vtt_blocks.append(f'{start} --> {end}\n{text}\n')
+                if session['is_gui_process']:
+                    total_progress = (t.n + 1) / audio_files_length
+                    progress_bar(
+                        progress=total_progress,
+                        desc=f'Writing vtt idx {idx}'
+                    )
+                t.update(1)
+        msg = 'Write VTT blocks into file…'
+        print(msg)
+        with open(vtt_path, 'w', encoding='utf-8') as f:
+            f.write('WEBVTT\n\n')
+            f.write('\n'.join(vtt_blocks))
+        return True
+    except Exception as e:
+        error = f'build_vtt_file(): {e}'
+        print(error)
+        return False
\ No newline at end of file
@@ -12,6 +12,9 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
             self.tts_zs_key = default_vc_model.rsplit('/',1)[-1]
             self.pth_voice_file = None
             self.resampler_cache = {}
+            self.memory_schedule = {"sentences": 0, "tts_key": None}
+            self.metrics = {"device_transfers": 0, "memory_cleanups": 0, "memory_cleanup_time": 0.0}
+            self.audio_manifest = AudioManifest(os.path.join(self.session['process_dir'], audio_manifest_file))
             self.audio_segments = []
             self.models = load_engine_presets(self.session['tts_engine'])
             self.params = {"semitones": {}, "samplerate": None}
@@ -77,7 +80,6 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
     def convert(self, sentence_index:int, sentence:str)->bool:
         try:
             import torch
-            import torchaudio
             import numpy as np
             from lib.classes.tts_engines.common.audio import trim_audio, is_audio_data_valid, detect_gender
             if self.engine:
@@ -119,7 +121,7 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                             tmp_in_wav = os.path.join(proc_dir, f"{uuid.uuid4()}.wav")
                             tmp_out_wav = os.path.join(proc_dir, f"{uuid.uuid4()}.wav")
                             with torch.no_grad():
-                                self.engine.to(device)
+                                self._set_model_device(self.engine, device)
                                 if device == devices['CPU']['proc']:
                                     self.engine.tts_to_file(
                                         text=part_phonemized,
@@ -134,7 +136,6 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                                             text=part_phonemized,
                                             file_path=tmp_in_wav,
                                         )
-                                self.engine.to(devices['CPU']['proc'])
                             if self.params['current_voice'] in self.params['semitones'].keys():
                                 semitones = self.params['semitones'][self.params['current_voice']]
                             else:
@@ -173,12 +174,11 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                                 self.params['samplerate'] = TTS_VOICE_CONVERSION[self.tts_zs_key]['samplerate']
                                 source_wav = self._resample_wav(tmp_out_wav, self.params['samplerate'])
                                 target_wav = self._resample_wav(self.params['current_voice'], self.params['samplerate'])
-                                self.engine_zs.to(device)
+                                self._set_model_device(self.engine_zs, device)
                                 audio_part = self.engine_zs.voice_conversion(
                                     source_wav=source_wav,
                                     target_wav=target_wav
                                 )
-                                self.engine_zs.to(devices['CPU']['proc'])
                             else:
                                 error = f'Engine {self.tts_zs_key} is None'
                                 print(error)
@@ -191,7 +191,7 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                                 os.remove(source_wav)
                         else:
                             with torch.no_grad():
-                                self.engine.to(device)
+                                self._set_model_device(self.engine, device)
                                 if device == devices['CPU']['proc']:
                                     audio_part = self.engine.tts(
                                         text=part_phonemized,
@@ -204,7 +204,6 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                                         audio_part = self.engine.tts(
                                             text=part_phonemized,
                                         )
-                                self.engine.to(devices['CPU']['proc'])
                         if is_audio_data_valid(audio_part):
                             src_tensor = self._tensor_type(audio_part)
                             part_tensor = src_tensor.clone().detach().unsqueeze(0).cpu()
@@ -227,14 +226,11 @@ class GlowTTS(TTSUtils, TTSRegistry, name='glowtts'):
                             return False
                 if self.audio_segments:
                     segment_tensor = torch.cat(self.audio_segments, dim=-1)
-                    torchaudio.save(final_sentence_file, segment_tensor, self.params['samplerate'], format=default_audio_proc_format)
-                    del segment_tensor
-                    self._cleanup_memory()
                     self.audio_segments = []
-                    if not os.path.exists(final_sentence_file):
-                        error = f"Cannot create {final_sentence_file}"
-                        print(error)
+                    if not self._save_sentence_audio(final_sentence_file, segment_tensor, sentence_index, sentence):
                         return False
+                    del segment_tensor
+                    self._schedule_memory_cleanup()
                 return True
             else:
                 error = f"TTS engine {self.session['tts_engine']} failed to load!"
@@ -1,5 +1,83 @@
 from lib.classes.tts_engines.common.headers import *
 from lib.classes.tts_engines.common.preset_loader import load_engine_presets
+from lib.classes.file_cache import FileCache
+
+def get_batch_chunks(lengths:list[int], batch_size:int)->list[list[int]]:
+    # indexes sorted by token length then cut every batch_size, so each chunk pads as little as possible
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+def inference_batch(engine:Any, text_tokens:list[Any], gpt_cond_latent:Any, speaker_embedding:Any, fine_tuned_params:dict)->list[Any]:
+    # Same steps as Xtts.inference() but the autoregressive GPT pass runs once for all parts.
+    # GPT.compute_embeddings() would number the text positions over the padded batch, so each
+    # prefix [conditioning, start, text, stop] is embedded on its own, then left padded and masked.
+    # The XTTS GPT has no absolute position embedding, the mel positions only count generated steps,
+    # so a masked left padding leaves every part with the inputs it would have alone.
+    import torch
+    import torch.nn.functional as F
+    gpt = engine.gpt
+    for tokens in text_tokens:
+        if tokens.shape[-1] >= engine.args.gpt_max_text_tokens:
+            error = f'XTTS can only generate text with a maximum of {engine.args.gpt_max_text_tokens} tokens.'
+            raise ValueError(error)
+    length_scale = 1.0 / max(fine_tuned_params.get('speed', 1.0), 0.05)
+    gpt_cond_latent = gpt_cond_latent.to(engine.device)
+    speaker_embedding = speaker_embedding.to(engine.device)
+    prefixes = []
+    for tokens in text_tokens:
+        text_input = F.pad(F.pad(tokens.to(engine.device).unsqueeze(0), (0, 1), value=gpt.stop_text_token), (1, 0), value=gpt.start_text_token)
+        text_emb = gpt.text_embedding(text_input) + gpt.text_pos_embedding(text_input)
+        prefixes.append(torch.cat([gpt_cond_latent, text_emb.to(gpt_cond_latent.dtype)], dim=1))
+    prefix_len = max(prefix.shape[1] for prefix in prefixes)
+    # one more position for the start audio token fed as the first generated input
+    attention_mask = torch.zeros((len(prefixes), prefix_len + 1), dtype=torch.long, device=engine.device)
+    for i, prefix in enumerate(prefixes):
+        attention_mask[i, prefix_len - prefix.shape[1]:] = 1
+    prefix_emb = torch.cat([F.pad(prefix, (0, 0, prefix_len - prefix.shape[1], 0)) for prefix in prefixes], dim=0)
+    gpt.gpt_inference.store_prefix_emb(prefix_emb)
+    gpt_inputs = torch.full((len(prefixes), prefix_len + 1), fill_value=1, dtype=torch.long, device=engine.device)
+    gpt_inputs[:, -1] = gpt.start_audio_token
+    gpt_codes = gpt.gpt_inference.generate(
+        gpt_inputs,
+        attention_mask=attention_mask,
+        bos_token_id=gpt.start_audio_token,
+        pad_token_id=gpt.stop_audio_token,
+        eos_token_id=gpt.stop_audio_token,
+        max_length=gpt.max_gen_mel_tokens + gpt_inputs.shape[-1],
+        do_sample=True,
+        top_p=fine_tuned_params.get('top_p'),
+        top_k=fine_tuned_params.get('top_k'),
+        temperature=fine_tuned_params.get('temperature'),
+        num_return_sequences=1,
+        num_beams=fine_tuned_params.get('num_beams', 1),
+        length_penalty=fine_tuned_params.get('length_penalty'),
+        repetition_penalty=fine_tuned_params.get('repetition_penalty'),
+        output_attentions=False
+    )[:, gpt_inputs.shape[-1]:]
+    wavs = []
+    for i in range(len(text_tokens)):
+        # the parts finishing first are filled with the stop token up to the longest one
+        codes = gpt_codes[i]
+        stop_idx = (codes == gpt.stop_audio_token).nonzero()
+        if stop_idx.numel() > 0:
+            codes = codes[:stop_idx[0].item() + 1]
+        tokens = text_tokens[i].to(engine.device).unsqueeze(0)
+        codes = codes.unsqueeze(0)
+        expected_output_len = torch.tensor([codes.shape[-1] * gpt.code_stride_len], device=engine.device)
+        text_len = torch.tensor([tokens.shape[-1]], device=engine.device)
+        gpt_latents = gpt(
+            tokens,
+            text_len,
+            codes,
+            expected_output_len,
+            cond_latents=gpt_cond_latent,
+            return_attentions=False,
+            return_latent=True
+        )
+        if length_scale != 1.0:
+            gpt_latents = F.interpolate(gpt_latents.transpose(1, 2), scale_factor=length_scale, mode='linear').transpose(1, 2)
+        wavs.append(engine.hifigan_decoder(gpt_latents, g=speaker_embedding).cpu().squeeze())
+    return wavs
 
 class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
 
@@ -13,6 +91,9 @@ class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
             self.tts_zs_key = default_vc_model.rsplit('/',1)[-1]
             self.pth_voice_file = None
             self.resampler_cache = {}
+            self.memory_schedule = {"sentences": 0, "tts_key": None}
+            self.metrics = {"device_transfers": 0, "memory_cleanups": 0, "memory_cleanup_time": 0.0}
+            self.audio_manifest = AudioManifest(os.path.join(self.session['process_dir'], audio_manifest_file))
             self.audio_segments = []
             self.models = load_engine_presets(self.session['tts_engine'])
             self.params = {"latent_embedding":{}}
@@ -80,28 +161,145 @@ class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
             error = f'load_engine() error: {e}'
             raise RuntimeError(error) from e
 
+    def _get_fine_tuned_params(self)->dict:
+        return {
+            key.removeprefix("xtts_"): cast_type(self.session[key])
+            for key, cast_type in {
+                "xtts_temperature": float,
+                #"xtts_codec_temperature": float,
+                "xtts_length_penalty": float,
+                "xtts_num_beams": int,
+                "xtts_repetition_penalty": float,
+                #"xtts_cvvp_weight": float,
+                "xtts_top_k": int,
+                "xtts_top_p": float,
+                "xtts_speed": float,
+                #"xtts_gpt_cond_len": int,
+                #"xtts_gpt_batch_size": int,
+                "xtts_enable_text_splitting": bool
+            }.items()
+            if self.session.get(key) is not None
+        }
+
+    def _get_checkpoint_id(self)->str:
+        files = default_engine_settings[TTS_ENGINES['XTTSv2']]['files']
+        if self.session['custom_model'] is not None:
+            checkpoint_path = os.path.join(self.session['custom_model_dir'], self.session['tts_engine'], self.session['custom_model'], files[1])
+            # a custom model can be uploaded again under the same name, only its content identifies it
+            return f"custom:{FileCache.file_digest(checkpoint_path)}"
+        model_cfg = self.models[self.session['fine_tuned']]
+        return f"{model_cfg['repo']}/{model_cfg.get('sub', '')}{model_cfg['files'][1]}"
+
+    def _get_latents_file(self, voice_path:str)->str|None:
+        voice_digest = FileCache.file_digest(voice_path)
+        if voice_digest is None:
+            return None
+        key = FileCache.make_key(voice_digest, self._get_checkpoint_id())
+        return os.path.join(latents_dir, TTS_ENGINES['XTTSv2'], key[:2], f'{key}.pt')
+
+    def _load_latents(self, latents_file:str)->tuple|None:
+        import torch
+        if not os.path.exists(latents_file):
+            return None
+        try:
+            data = torch.load(latents_file, map_location='cpu', mmap=True, weights_only=True)
+            return data['gpt_cond_latent'], data['speaker_embedding']
+        except Exception as e:
+            error = f'_load_latents() error: {e}'
+            print(error)
+            return None
+
+    def _save_latents(self, latents_file:str, gpt_cond_latent:Any, speaker_embedding:Any)->None:
+        import torch
+        try:
+            os.makedirs(os.path.dirname(latents_file), exist_ok=True)
+            tmp_file = f'{latents_file}.{uuid.uuid4().hex}.tmp'
+            torch.save({"gpt_cond_latent": gpt_cond_latent.detach().cpu().contiguous(), "speaker_embedding": speaker_embedding.detach().cpu().contiguous()}, tmp_file)
+            os.replace(tmp_file, latents_file)
+        except Exception as e:
+            error = f'_save_latents() error: {e}'
+            print(error)
+
+    def _set_latents(self)->None:
+        if self.params['current_voice'] is not None and self.params['current_voice'] in self.params['latent_embedding'].keys():
+            self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.params['latent_embedding'][self.params['current_voice']]
+        else:
+            if self.speaker in default_engine_settings[TTS_ENGINES['XTTSv2']]['voices'].keys():
+                self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.xtts_speakers[default_engine_settings[TTS_ENGINES['XTTSv2']]['voices'][self.speaker]].values()
+            else:
+                latents_file = self._get_latents_file(self.params['current_voice'])
+                latents = self._load_latents(latents_file) if latents_file is not None else None
+                if latents is not None:
+                    self.params['gpt_cond_latent'], self.params['speaker_embedding'] = latents
+                else:
+                    msg = 'Computing speaker latents…'
+                    print(msg)
+                    self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.engine.get_conditioning_latents(audio_path=[self.params['current_voice']], librosa_trim_db=30, load_sr=24000, sound_norm_refs=True)
+                    if latents_file is not None:
+                        self._save_latents(latents_file, self.params['gpt_cond_latent'], self.params['speaker_embedding'])
+            self.params['latent_embedding'][self.params['current_voice']] = self.params['gpt_cond_latent'], self.params['speaker_embedding']
+
+    def _prepare_part(self, part:str)->str:
+        if part.endswith("'"):
+            part = part[:-1]
+        return part.replace('.', ' ;\n')
+
+    def _append_audio_part(self, audio_part:Any, part:str)->bool:
+        import torch
+        import numpy as np
+        from lib.classes.tts_engines.common.audio import trim_audio, is_audio_data_valid
+        trim_audio_buffer = 0.006
+        if is_audio_data_valid(audio_part):
+            src_tensor = self._tensor_type(audio_part)
+            part_tensor = src_tensor.clone().detach().unsqueeze(0).cpu()
+            if part_tensor is not None and part_tensor.numel() > 0:
+                if part[-1].isalnum() or part[-1] == '—':
+                    part_tensor = trim_audio(part_tensor.squeeze(), self.params['samplerate'], 0.001, trim_audio_buffer).unsqueeze(0)
+                self.audio_segments.append(part_tensor)
+                if not re.search(r'\w$', part, flags=re.UNICODE) and part[-1] != '—':
+                    #np.random.seed(seed)
+                    silence_time = int(np.random.uniform(0.3, 0.6) * 100) / 100
+                    break_tensor = torch.zeros(1, int(self.params['samplerate'] * silence_time))
+                    self.audio_segments.append(break_tensor.clone())
+                return True
+            else:
+                error = f"part_tensor not valid"
+                print(error)
+                return False
+        else:
+            error = f"audio_part not valid"
+            print(error)
+            return False
+
+    def _save_audio_segments(self, final_sentence_file:str, sentence_index:int, sentence:str)->bool:
+        import torch
+        if self.audio_segments:
+            segment_tensor = torch.cat(self.audio_segments, dim=-1)
+            self.audio_segments = []
+            if not self._save_sentence_audio(final_sentence_file, segment_tensor, sentence_index, sentence):
+                return False
+            del segment_tensor
+            self._schedule_memory_cleanup()
+        return True
+
+    def _encode_part(self, part:str)->Any:
+        import torch
+        language = self.session['language_iso1'].split('-')[0]
+        return torch.IntTensor(self.engine.tokenizer.encode(part.strip().lower(), lang=language))
+
+    def _inference_batch(self, text_tokens:list[Any], fine_tuned_params:dict)->list[Any]:
+        return inference_batch(self.engine, text_tokens, self.params['gpt_cond_latent'], self.params['speaker_embedding'], fine_tuned_params)
+
     def convert(self, sentence_index:int, sentence:str)->bool:
         try:
             import torch
-            import torchaudio
-            import numpy as np
-            from lib.classes.tts_engines.common.audio import trim_audio, is_audio_data_valid
             if self.engine:
                 final_sentence_file = os.path.join(self.session['sentences_dir'], f'{sentence_index}.{default_audio_proc_format}')
                 device = devices['CUDA']['proc'] if self.session['device'] in [devices['CUDA']['proc'], devices['JETSON']['proc']] else self.session['device']
                 sentence_parts = self._split_sentence_on_sml(sentence)
                 if not self._set_voice():
                     return False
-                if self.params['current_voice'] is not None and self.params['current_voice'] in self.params['latent_embedding'].keys():
-                    self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.params['latent_embedding'][self.params['current_voice']]
-                else:
-                    msg = 'Computing speaker latents…'
-                    print(msg)
-                    if self.speaker in default_engine_settings[TTS_ENGINES['XTTSv2']]['voices'].keys():
-                        self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.xtts_speakers[default_engine_settings[TTS_ENGINES['XTTSv2']]['voices'][self.speaker]].values()
-                    else:
-                        self.params['gpt_cond_latent'], self.params['speaker_embedding'] = self.engine.get_conditioning_latents(audio_path=[self.params['current_voice']], librosa_trim_db=30, load_sr=24000, sound_norm_refs=True)  
-                    self.params['latent_embedding'][self.params['current_voice']] = self.params['gpt_cond_latent'], self.params['speaker_embedding']
+                self._set_latents()
                 self.audio_segments = []
                 for part in sentence_parts:
                     part = part.strip()
@@ -116,30 +314,10 @@ class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
                     if not any(c.isalnum() for c in part):
                         continue
                     else:
-                        trim_audio_buffer = 0.006
-                        if part.endswith("'"):
-                            part = part[:-1]
-                        part = part.replace('.', ' ;\n')
-                        fine_tuned_params = {
-                            key.removeprefix("xtts_"): cast_type(self.session[key])
-                            for key, cast_type in {
-                                "xtts_temperature": float,
-                                #"xtts_codec_temperature": float,
-                                "xtts_length_penalty": float,
-                                "xtts_num_beams": int,
-                                "xtts_repetition_penalty": float,
-                                #"xtts_cvvp_weight": float,
-                                "xtts_top_k": int,
-                                "xtts_top_p": float,
-                                "xtts_speed": float,
-                                #"xtts_gpt_cond_len": int,
-                                #"xtts_gpt_batch_size": int,
-                                "xtts_enable_text_splitting": bool
-                            }.items()
-                            if self.session.get(key) is not None
-                        }
+                        part = self._prepare_part(part)
+                        fine_tuned_params = self._get_fine_tuned_params()
                         with torch.no_grad():
-                            self.engine.to(device)
+                            self._set_model_device(self.engine, device)
                             if device == devices['CPU']['proc']:
                                 result = self.engine.inference(
                                     text=part,
@@ -160,37 +338,90 @@ class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
                                         speaker_embedding=self.params['speaker_embedding'],
                                         **fine_tuned_params
                                     )
-                            self.engine.to(devices['CPU']['proc'])
-                        audio_part = result.get('wav')
-                        if is_audio_data_valid(audio_part):
-                            src_tensor = self._tensor_type(audio_part)
-                            part_tensor = src_tensor.clone().detach().unsqueeze(0).cpu()
-                            if part_tensor is not None and part_tensor.numel() > 0:
-                                if part[-1].isalnum() or part[-1] == '—':
-                                    part_tensor = trim_audio(part_tensor.squeeze(), self.params['samplerate'], 0.001, trim_audio_buffer).unsqueeze(0)
-                                self.audio_segments.append(part_tensor)
-                                if not re.search(r'\w$', part, flags=re.UNICODE) and part[-1] != '—':
-                                    #np.random.seed(seed)
-                                    silence_time = int(np.random.uniform(0.3, 0.6) * 100) / 100
-                                    break_tensor = torch.zeros(1, int(self.params['samplerate'] * silence_time))
-                                    self.audio_segments.append(break_tensor.clone())
-                            else:
-                                error = f"part_tensor not valid"
+                        if not self._append_audio_part(result.get('wav'), part):
+                            return False
+                return self._save_audio_segments(final_sentence_file, sentence_index, sentence)
+            else:
+                error = f"TTS engine {self.session['tts_engine']} failed to load!"
+                print(error)
+                return False
+        except Exception as e:
+            error = f'Xttsv2.convert(): {e}'
+            print(error)
+            return False
+
+    def convert_batch(self, sentences:list[tuple[int, str]])->bool:
+        try:
+            import torch
+            if self.engine:
+                fine_tuned_params = self._get_fine_tuned_params()
+                if fine_tuned_params.get('enable_text_splitting', False):
+                    return super().convert_batch(sentences)
+                device = devices['CUDA']['proc'] if self.session['device'] in [devices['CUDA']['proc'], devices['JETSON']['proc']] else self.session['device']
+                batch_size = max(int(self.session.get('xtts_batch_size') or 1), 1)
+                if not self._set_voice():
+                    return False
+                self._set_latents()
+                # plans keep, per sentence, the order of its SML tags and text parts.
+                # Sentences switching voice are not batchable and go through convert()
+                plans = []
+                batch_parts = []
+                for sentence_index, sentence in sentences:
+                    items = []
+                    for part in self._split_sentence_on_sml(sentence):
+                        part = part.strip()
+                        if not part:
+                            continue
+                        m = SML_TAG_PATTERN.fullmatch(part)
+                        if m:
+                            if m.group('tag') == 'voice':
+                                items = None
+                                break
+                            items.append(('sml', part))
+                            continue
+                        if not any(c.isalnum() for c in part):
+                            continue
+                        items.append(('text', len(batch_parts)))
+                        batch_parts.append(self._prepare_part(part))
+                    plans.append((sentence_index, sentence, items))
+                wavs = [None] * len(batch_parts)
+                if batch_parts:
+                    batch_tokens = [self._encode_part(part) for part in batch_parts]
+                    chunks = get_batch_chunks([tokens.shape[-1] for tokens in batch_tokens], batch_size)
+                    try:
+                        with torch.no_grad():
+                            self._set_model_device(self.engine, device)
+                            for chunk in chunks:
+                                if device == devices['CPU']['proc']:
+                                    chunk_wavs = self._inference_batch([batch_tokens[i] for i in chunk], fine_tuned_params)
+                                else:
+                                    with torch.autocast(
+                                        device_type=device,
+                                        dtype=self.amp_dtype
+                                    ):
+                                        chunk_wavs = self._inference_batch([batch_tokens[i] for i in chunk], fine_tuned_params)
+                                for i, wav in zip(chunk, chunk_wavs):
+                                    wavs[i] = wav
+                    except Exception as e:
+                        msg = f'Batched inference failed ({e}), converting sentences one by one…'
+                        print(msg)
+                        return super().convert_batch(sentences)
+                for sentence_index, sentence, items in plans:
+                    if items is None:
+                        if not self.convert(sentence_index, sentence):
+                            return False
+                        continue
+                    final_sentence_file = os.path.join(self.session['sentences_dir'], f'{sentence_index}.{default_audio_proc_format}')
+                    self.audio_segments = []
+                    for kind, value in items:
+                        if kind == 'sml':
+                            res, error = self._convert_sml(value)
+                            if not res:
                                 print(error)
                                 return False
-                        else:
-                            error = f"audio_part not valid"
-                            print(error)
+                        elif not self._append_audio_part(wavs[value], batch_parts[value]):
                             return False
-                if self.audio_segments:
-                    segment_tensor = torch.cat(self.audio_segments, dim=-1)
-                    torchaudio.save(final_sentence_file, segment_tensor, self.params['samplerate'], format=default_audio_proc_format)
-                    del segment_tensor
-                    self._cleanup_memory()
-                    self.audio_segments = []
-                    if not os.path.exists(final_sentence_file):
-                        error = f"Cannot create {final_sentence_file}"
-                        print(error)
+                    if not self._save_audio_segments(final_sentence_file, sentence_index, sentence):
                         return False
                 return True
             else:
@@ -198,7 +429,7 @@ class XTTSv2(TTSUtils, TTSRegistry, name='xtts'):
                 print(error)
                 return False
         except Exception as e:
-            error = f'Xttsv2.convert(): {e}'
+            error = f'Xttsv2.convert_batch(): {e}'
             print(error)
             return False
 
@@ -12,6 +12,9 @@ class YourTTS(TTSUtils, TTSRegistry, name='yourtts'):
             self.tts_key = self.session['model_cache']
             self.pth_voice_file = None
             self.resampler_cache = {}
+            self.memory_schedule = {"sentences": 0, "tts_key": None}
+            self.metrics = {"device_transfers": 0, "memory_cleanups": 0, "memory_cleanup_time": 0.0}
+            self.audio_manifest = AudioManifest(os.path.join(self.session['process_dir'], audio_manifest_file))
             self.audio_segments = []
             self.models = load_engine_presets(self.session['tts_engine'])
             self.params = {}
@@ -69,7 +72,6 @@ class YourTTS(TTSUtils, TTSRegistry, name='yourtts'):
     def convert(self, sentence_index:int, sentence:str)->bool:
         try:
             import torch
-            import torchaudio
             import numpy as np
             from lib.classes.tts_engines.common.audio import trim_audio, is_audio_data_valid
             if self.engine:
@@ -106,7 +108,7 @@ class YourTTS(TTSUtils, TTSRegistry, name='yourtts'):
                             part = part[:-1]
                         part = re.sub(not_supported_punc_pattern, ' ', part).strip()                        
                         with torch.no_grad():
-                            self.engine.to(device)
+                            self._set_model_device(self.engine, device)
                             if device == devices['CPU']['proc']:
                                 audio_part = self.engine.tts(
                                     text=part,
@@ -123,7 +125,6 @@ class YourTTS(TTSUtils, TTSRegistry, name='yourtts'):
                                         language=language,
                                         **speaker_argument
                                     )
-                            self.engine.to(devices['CPU']['proc'])
                         if is_audio_data_valid(audio_part):
                             src_tensor = self._tensor_type(audio_part)
                             part_tensor = src_tensor.clone().detach().unsqueeze(0).cpu()
@@ -147,14 +148,11 @@ class YourTTS(TTSUtils, TTSRegistry, name='yourtts'):
                             return False
                 if self.audio_segments:
                     segment_tensor = torch.cat(self.audio_segments, dim=-1)
-                    torchaudio.save(final_sentence_file, segment_tensor, self.params['samplerate'], format=default_audio_proc_format)
-                    del segment_tensor
-                    self._cleanup_memory()
                     self.audio_segments = []
-                    if not os.path.exists(final_sentence_file):
-                        error = f"Cannot create {final_sentence_file}"
-                        print(error)
+                    if not self._save_sentence_audio(final_sentence_file, segment_tensor, sentence_index, sentence):
                         return False
+                    del segment_tensor
+                    self._schedule_memory_cleanup()
                 return True
             else:
                 error = f"TTS engine {self.session['tts_engine']} failed to load!"
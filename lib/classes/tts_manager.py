@@ -1,5 +1,9 @@
+import os
+
 from typing import Any
+from pathlib import Path
 from lib.classes.tts_registry import TTSRegistry
+from lib.classes.tts_engines.common.utils import build_vtt_file
 
 class TTSManager:
 
@@ -9,16 +13,59 @@ class TTSManager:
         if engine_name is None:
             raise ValueError("session['tts_engine'] is missing")
         try:
-            engine_cls = TTSRegistry.ENGINES[engine_name]
+            self.engine_cls = TTSRegistry.ENGINES[engine_name]
         except KeyError:
             raise ValueError(
                 f"Invalid tts_engine '{engine_name}'. "
                 f"Expected one of: {', '.join(TTSRegistry.ENGINES)}"
             )
-        self.engine = engine_cls(session)
+        # the engine loads its model, so it is only created for the first sentence to synthesize
+        self.engine = None
+        self.audio_writer_workers = None
+
+    def _get_engine(self)->Any:
+        if self.engine is None:
+            self.engine = self.engine_cls(self.session)
+            if self.audio_writer_workers is not None:
+                self.engine.start_audio_writer(self.audio_writer_workers)
+        return self.engine
 
     def convert_sentence2audio(self, sentence_number:int, sentence:str)->bool:
-        return self.engine.convert(sentence_number, sentence)
+        return self._get_engine().convert(sentence_number, sentence)
+
+    def convert_sentences2audio(self, sentences:list[tuple[int, str]])->bool:
+        if not sentences:
+            return True
+        if len(sentences) == 1:
+            return self._get_engine().convert(*sentences[0])
+        return self._get_engine().convert_batch(sentences)
+
+    def start_audio_writer(self, max_workers:int=2)->None:
+        self.audio_writer_workers = max_workers
+        if self.engine is not None:
+            self.engine.start_audio_writer(max_workers)
+
+    def flush_audio_writes(self)->bool:
+        if self.engine is None:
+            return True
+        return self.engine.flush_audio_writes()
+
+    def stop_audio_writer(self)->None:
+        self.audio_writer_workers = None
+        if self.engine is not None:
+            self.engine.stop_audio_writer()
+
+    def release_devices(self)->None:
+        if self.engine is not None:
+            self.engine.release_devices()
+
+    def get_metrics(self)->dict:
+        if self.engine is None:
+            return {"device_transfers": 0, "memory_cleanups": 0, "memory_cleanup_time": 0.0}
+        return dict(self.engine.metrics)
         
     def create_sentences2vtt(self, all_sentences:list)->bool:
-        return self.engine.create_vtt(all_sentences)
\ No newline at end of file
+        if self.engine is not None:
+            return self.engine.create_vtt(all_sentences)
+        vtt_path = os.path.join(self.session['process_dir'], Path(self.session['final_name']).stem + '.vtt')
+        return build_vtt_file(self.session, all_sentences, self.session['sentences_dir'], vtt_path)
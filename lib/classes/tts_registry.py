@@ -14,4 +14,10 @@ class TTSRegistry:
         self.session = session
 
     def convert(self, sentence_number, sentence):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def convert_batch(self, sentences):
+        for sentence_number, sentence in sentences:
+            if not self.convert(sentence_number, sentence):
+                return False
+        return True
\ No newline at end of file
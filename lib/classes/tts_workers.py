@@ -0,0 +1,89 @@
+import os, queue, multiprocessing
+
+from typing import Any, Callable
+
+def _worker_main(session:dict, threads:int, tasks:Any, results:Any, stop:Any)->None:
+    # thread budget must be set before torch is imported in the spawned process
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    tts_manager = None
+    try:
+        import torch
+        torch.set_num_threads(threads)
+        from lib.classes.tts_manager import TTSManager
+        tts_manager = TTSManager(session)
+        tts_manager.start_audio_writer(1)
+        while not stop.is_set():
+            shard = tasks.get()
+            if shard is None:
+                break
+            success = tts_manager.convert_sentences2audio(shard) and tts_manager.flush_audio_writes()
+            error = None if success else f'Worker {os.getpid()} failed on sentences {shard[0][0]} to {shard[-1][0]}'
+            results.put((len(shard), success, error))
+    except Exception as e:
+        results.put((0, False, f'_worker_main() error: {e}'))
+    finally:
+        if tts_manager is not None:
+            tts_manager.stop_audio_writer()
+            tts_manager.release_devices()
+
+class TTSWorkers:
+
+    def __init__(self, session:dict, workers:int, shard_size:int=8)->None:
+        self.session = session
+        self.workers = workers
+        self.shard_size = max(shard_size, 1)
+        self.threads = max(1, (os.cpu_count() or 1) // workers)
+
+    def run(self, sentences:list[tuple[int, str]], is_cancelled:Callable[[], bool], on_progress:Callable[[int], None]|None=None)->bool:
+        if not sentences:
+            return True
+        ctx = multiprocessing.get_context('spawn')
+        tasks = ctx.Queue()
+        results = ctx.Queue()
+        stop = ctx.Event()
+        shards = [sentences[i:i + self.shard_size] for i in range(0, len(sentences), self.shard_size)]
+        for shard in shards:
+            tasks.put(shard)
+        workers = min(self.workers, len(shards))
+        for _ in range(workers):
+            tasks.put(None)
+        procs = [ctx.Process(target=_worker_main, args=(self.session, self.threads, tasks, results, stop), daemon=True) for _ in range(workers)]
+        msg = f'Starting {workers} TTS workers with {self.threads} threads each…'
+        print(msg)
+        for p in procs:
+            p.start()
+        success = True
+        done = 0
+        try:
+            while done < len(shards):
+                if is_cancelled():
+                    msg = 'Cancel requested'
+                    print(msg)
+                    success = False
+                    break
+                try:
+                    count, ok, error = results.get(timeout=1)
+                except queue.Empty:
+                    if not any(p.is_alive() for p in procs):
+                        error = 'TTS workers exited before all sentences were converted'
+                        print(error)
+                        success = False
+                        break
+                    continue
+                if not ok:
+                    print(error)
+                    success = False
+                    break
+                done += 1
+                if on_progress is not None:
+                    on_progress(count)
+        finally:
+            stop.set()
+            for p in procs:
+                if success:
+                    p.join()
+                else:
+                    p.terminate()
+                    p.join()
+        return success
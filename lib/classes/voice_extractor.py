@@ -7,11 +7,14 @@ from pathlib import Path
             
 from lib.classes.tts_engines.common.audio import get_audio_duration
 from lib.classes.subprocess_pipe import SubprocessPipe
-from lib.conf import systems, devices, voice_formats, default_audio_proc_samplerate
+from lib.classes.file_cache import FileCache
+from lib.conf import systems, devices, voice_formats, default_audio_proc_samplerate, cache_dir, voice_cache_max_mb
 from lib.conf_models import TTS_ENGINES
 
 class VoiceExtractor:
 
+    cache_version = 1 # to raise when the processing chain changes
+
     def __init__(self, session:Any, voice_file:str, voice_name:str, final_voice_file:str|None=None)->None:
         from lib.classes.tts_engines.common.preset_loader import load_engine_presets
         self.wav_file = None
@@ -300,14 +303,41 @@ class VoiceExtractor:
             error = f'normalize_audio() error: {e}'
         return False, error
 
+    def _get_cache_key(self)->str|None:
+        # same sample, same target: the processed voice does not depend on the session
+        digest = FileCache.file_digest(self.voice_file)
+        if digest is None:
+            return None
+        return FileCache.make_key(
+            'extract_voice',
+            self.cache_version,
+            digest,
+            self.session['tts_engine'],
+            self.samplerate,
+            default_audio_proc_samplerate,
+            self.silence_threshold
+        )
+
     def extract_voice(self)->tuple[bool,str|None]:
         result = 0
         msg = None
+        voice_cache = None
+        cache_key = None
         try:
             result, msg = self._validate_format()
             print(msg)
             if self.is_gui_process:
                 self.progress_bar(int(result), desc=msg)
+            if result and voice_cache_max_mb > 0:
+                voice_cache = FileCache(os.path.join(cache_dir, 'voices'), int(voice_cache_max_mb * 1024 ** 2), 'wav')
+                cache_key = self._get_cache_key()
+                if cache_key and voice_cache.fetch(cache_key, self.final_voice_file):
+                    msg = 'Processed voice found in cache'
+                    print(msg)
+                    if self.is_gui_process:
+                        self.progress_bar(1, desc=msg)
+                    shutil.rmtree(self.demucs_dir, ignore_errors = True)
+                    return True, msg
             if result:
                 result, msg = self._convert2wav()
                 print(msg)
@@ -336,6 +366,8 @@ class VoiceExtractor:
                                 print(msg)
                                 if self.is_gui_process:
                                     self.progress_bar(int(result), desc=msg)
+                                if result and cache_key:
+                                    voice_cache.store(cache_key, self.final_voice_file)
         except Exception as e:
             msg = f'extract_voice() error: {e}'
         shutil.rmtree(self.demucs_dir, ignore_errors = True)
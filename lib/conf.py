@@ -23,11 +23,17 @@ models_dir = os.path.abspath('models')
 ebooks_dir = os.path.abspath('ebooks')
 voices_dir = os.path.abspath('voices')
 tts_dir = os.path.join(models_dir, 'tts')
+latents_dir = os.path.join(models_dir, '__latents')
 components_dir = os.path.abspath('components')
 
 tempfile.tempdir = run_dir
 tmp_expire = 7 # days
 
+cache_dir = os.path.join(tmp_dir, '__cache')
+audio_cache_max_gb = 10 # size limit of the converted sentences cache, 0 to disable it
+ocr_cache_max_mb = 512 # size limit of the OCR results cache, 0 to disable it
+voice_cache_max_mb = 1024 # size limit of the processed voice samples cache, 0 to disable it
+
 # ---------------------------------------------------------------------
 # Environment setup
 # ---------------------------------------------------------------------
@@ -172,9 +178,12 @@ audiobooks_cli_dir = os.path.abspath(os.path.join('audiobooks','cli'))
 
 ebook_formats = [
     ".epub", ".mobi", ".azw3", ".fb2", ".lrf", ".rb", ".snb", ".tcr", ".pdf",
-    ".txt", ".rtf", ".doc", ".docx", ".html", ".odt", ".azw", ".tiff", ".tif",
+    ".txt", ".rtf", ".doc", ".docx", ".html", ".xhtml", ".odt", ".azw", ".tiff", ".tif",
     ".png", ".jpg", ".jpeg", ".bmp",
 ]
+native_ebook_formats = [
+    ".epub", ".html", ".xhtml", ".txt",
+] # read without calibre, which is only run for the other formats or if the native reading fails
 voice_formats = [
     ".mp4", ".m4b", ".m4a", ".mp3", ".wav", ".aac", ".flac", ".alac", ".ogg",
     ".aiff", ".aif", ".wma", ".dsd", ".opus", ".pcmu", ".pcma", ".gsm",
@@ -187,4 +196,7 @@ default_audio_proc_format = 'flac' # or 'mp3', 'aac', 'm4a', 'm4b', 'amr', '3gp'
 default_output_format = 'm4b'
 default_output_channel = 'mono' # mono or stereo
 default_output_split = False
+default_output_stream = False # web UI: encode each finished block as a playlist segment to listen while converting
+default_workers = 1 # number of processes sharing the sentences of one ebook (cpu only), each loading its own model
+default_export_workers = 2 # number of split parts exported at the same time
 default_output_split_hours = '6' # if the final ouput esceed outpout_split_hours * 2 hours the final file will be splitted by outpout_split_hours + the end if any.
\ No newline at end of file
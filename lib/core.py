@@ -7,20 +7,19 @@
 
 import argparse, asyncio, csv, fnmatch, hashlib, io, json, math, os, pytesseract, gc
 import random, shutil, subprocess, sys, tempfile, threading, time, uvicorn, copy
-import traceback, socket, unicodedata, urllib.request, uuid, zipfile, fitz, multiprocessing
-import ebooklib, psutil, requests, stanza, importlib, queue
+import traceback, socket, unicodedata, urllib.request, urllib.parse, uuid, zipfile, fitz, multiprocessing, html
+import psutil, requests, stanza, importlib, queue
 import regex as re, gradio as gr
 
 from typing import Any, Generator, Dict
-from PIL import Image, ImageSequence
+from PIL import Image
 from tqdm import tqdm
 from bs4 import BeautifulSoup, NavigableString, Tag
-from collections import Counter
-from collections.abc import Mapping, MutableMapping
+from collections import Counter, deque
+from collections.abc import Callable, Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
-from ebooklib import epub
-from ebooklib.epub import EpubBook
-from ebooklib.epub import EpubHtml
+from functools import partial
 from glob import glob
 from iso639 import Lang
 from markdown import markdown
@@ -43,9 +42,15 @@ from lib.classes.subprocess_pipe import SubprocessPipe
 from lib.classes.vram_detector import VRAMDetector
 from lib.classes.voice_extractor import VoiceExtractor
 from lib.classes.tts_manager import TTSManager
+from lib.classes.tts_workers import TTSWorkers
+from lib.classes.file_cache import FileCache
+from lib.classes.audio_manifest import AudioManifest, audio_manifest_file
+from lib.classes.chapter_stream import ChapterStream, chapter_stream_dir
+from lib.classes.sentence_store import SentenceStore, sentence_store_file
+from lib.classes.epub_reader import EpubReader, EpubDocument
 #from lib.classes.redirect_console import RedirectConsole
 #from lib.classes.argos_translator import ArgosTranslator
-from lib.classes.tts_engines.common.audio import get_audiolist_duration, get_audio_duration
+from lib.classes.tts_engines.common.audio import get_audiolist_duration, get_audio_duration, get_adts_duration, get_integrated_loudness
 
 from lib import *
 
@@ -69,6 +74,19 @@ status_tags = {
     "DISCONNECTED": "disconnected"
 }
 
+_filter_regexes = {}
+_blocks_worker = {}
+min_docs_parallel_filter = 8
+stream_chapters_ahead = 4
+# samples the ffmpeg aac encoder puts before the audio of each stream segment
+aac_priming_samples = 1024
+_ocr_worker = {}
+min_pages_parallel_ocr = 4
+_ocr_cache = {}
+ocr_cache_version = 1 # to raise when ocr2xhtml output changes
+_text_normalizers = {}
+_sentence_regexes = {}
+
 save_session_keys_except = [
     'blocks_orig',
     'blocks_edit'
@@ -107,18 +125,95 @@ class SessionTracker:
         with self.lock:
             context.sessions.pop(session_id, None)
 
+class SessionDict(dict):
+
+    # lives in the manager process: every write bumps the version and records the key,
+    # so the savers only fetch and serialize what changed since the version they last saw
+
+    def __init__(self, *args:Any, **kwargs:Any)->None:
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._changed = {}
+        self._deleted = {}
+
+    def __setitem__(self, key:Any, value:Any)->None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self._version += 1
+            self._changed[key] = self._version
+            self._deleted.pop(key, None)
+
+    def __delitem__(self, key:Any)->None:
+        with self._lock:
+            super().__delitem__(key)
+            self._version += 1
+            self._changed.pop(key, None)
+            self._deleted[key] = self._version
+
+    def update(self, *args:Any, **kwargs:Any)->None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key:Any, *default:Any)->Any:
+        if key in self:
+            value = super().__getitem__(key)
+            del self[key]
+            return value
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def popitem(self)->tuple:
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def setdefault(self, key:Any, default:Any=None)->Any:
+        if key not in self:
+            self[key] = default
+        return super().__getitem__(key)
+
+    def clear(self)->None:
+        for key in list(self.keys()):
+            del self[key]
+
+    def get_version(self)->int:
+        return self._version
+
+    def get_changes(self, since:int)->tuple[int, dict, list]:
+        with self._lock:
+            changed = {key: dict.__getitem__(self, key) for key, version in self._changed.items() if version > since}
+            deleted = [key for key, version in self._deleted.items() if version > since]
+            return self._version, changed, deleted
+
+class SessionDictProxy(DictProxy):
+
+    _exposed_ = DictProxy._exposed_ + ('get_version', 'get_changes')
+
+    def get_version(self)->int:
+        return self._callmethod('get_version')
+
+    def get_changes(self, since:int)->tuple[int, dict, list]:
+        return self._callmethod('get_changes', (since,))
+
+class SessionManager(SyncManager):
+    pass
+
+SessionManager.register('SessionDict', SessionDict, SessionDictProxy)
+
 class SessionContext:
 
     def __init__(self):
-        self.manager:Manager = Manager()
+        self.manager:SessionManager = SessionManager()
+        self.manager.start()
         self.sessions:DictProxy[str, DictProxy[str, Any]] = self.manager.dict()
         self.cancellation_events = {}
 
-    def _recursive_proxy(self, data:Any, manager:SyncManager|None)->Any:
+    def _recursive_proxy(self, data:Any, manager:SyncManager|None, proxy_type:str='dict')->Any:
         if manager is None:
             manager = self.manager
         if isinstance(data, dict):
-            proxy_dict = manager.dict()
+            proxy_dict = getattr(manager, proxy_type)()
             for key, value in data.items():
                 proxy_dict[key] = self._recursive_proxy(value, manager)
             return proxy_dict
@@ -168,6 +263,9 @@ class SessionContext:
             "output_channel": default_output_channel,
             "output_split": default_output_split,
             "output_split_hours": default_output_split_hours,
+            "output_stream": default_output_stream,
+            "workers": default_workers,
+            "export_workers": default_export_workers,
             ####### Xtts settings
             "xtts_temperature": default_engine_settings[TTS_ENGINES['XTTSv2']]['temperature'],
             #"xtts_codec_temperature": default_engine_settings[TTS_ENGINES['XTTSv2']]['codec_temperature'],
@@ -181,6 +279,7 @@ class SessionContext:
             #"xtts_gpt_cond_len": default_engine_settings[TTS_ENGINES['XTTSv2']]['gpt_cond_len'],
             #"xtts_gpt_batch_size": default_engine_settings[TTS_ENGINES['XTTSv2']]['gpt_batch_size'],
             "xtts_enable_text_splitting": default_engine_settings[TTS_ENGINES['XTTSv2']]['enable_text_splitting'],
+            "xtts_batch_size": default_engine_settings[TTS_ENGINES['XTTSv2']]['batch_size'],
             ####### Bark settings
             "bark_text_temp": default_engine_settings[TTS_ENGINES['BARK']]['text_temp'],
             "bark_waveform_temp": default_engine_settings[TTS_ENGINES['BARK']]['waveform_temp'],
@@ -199,7 +298,7 @@ class SessionContext:
             "cover": None,
             "blocks_orig": [],
             "blocks_edit": [],
-            "chapters": [],
+            "chapters_file": None,
             "duration": 0,
             "playback_time": 0,
             "playback_volume": 0,
@@ -221,7 +320,7 @@ class SessionContext:
                 "Source": None,
                 "Modified": None,
             }
-        }, manager=self.manager)
+        }, manager=self.manager, proxy_type='SessionDict')
         return self.sessions[session_id]
 
     def get_session(self, session_id:str)->Any:
@@ -229,6 +328,28 @@ class SessionContext:
             return self.sessions[session_id]
         return {}
 
+    def get_cancellation_event(self, session_id:str)->Any:
+        # shared memory flag, checked without a round-trip to the manager process
+        if session_id not in self.cancellation_events:
+            self.cancellation_events[session_id] = Event()
+        return self.cancellation_events[session_id]
+
+    def set_cancellation(self, session_id:str, requested:bool)->None:
+        event = self.get_cancellation_event(session_id)
+        if requested:
+            event.set()
+        else:
+            event.clear()
+        session = self.get_session(session_id)
+        if session:
+            session['cancellation_requested'] = requested
+
+    def get_local_session(self, session_id:str)->'LocalSession|dict':
+        session = self.get_session(session_id)
+        if not session:
+            return {}
+        return LocalSession(session, self.get_cancellation_event(session_id))
+
     def find_id_by_hash(self, socket_hash: str) -> str | None:
         for session_id, session in list(self.sessions.items()):
             if socket_hash in session:
@@ -244,6 +365,51 @@ class JSONDictProxyEncoder(json.JSONEncoder):
             return list(o)
         return super().default(o)
 
+def get_session_snapshot(session:Any)->dict:
+    # plain copy of the session for spawned processes, without the heavy text lists
+    skip = ('blocks_orig', 'blocks_edit')
+    return json.loads(json.dumps({key: value for key, value in session.items() if key not in skip}, cls=JSONDictProxyEncoder))
+
+class LocalSession(dict):
+
+    # in-process copy of a session for the conversion loops, where every proxy read is a round-trip
+    # to the manager process: reads are local, writes also go to the shared session,
+    # live_keys are the ones the UI changes meanwhile and are still read from the shared session
+
+    live_keys = ('status',)
+
+    def __init__(self, session:Any, cancellation_event:Any=None)->None:
+        super().__init__(get_session_snapshot(session))
+        self.proxy = session
+        self.cancellation_event = cancellation_event
+        self.local_reads = 0
+        self.proxy_calls = 0
+
+    def __getitem__(self, key:str)->Any:
+        if key == 'cancellation_requested' and self.cancellation_event is not None:
+            self.local_reads += 1
+            return self.cancellation_event.is_set()
+        if key in self.live_keys:
+            self.proxy_calls += 1
+            return self.proxy[key]
+        self.local_reads += 1
+        return super().__getitem__(key)
+
+    def get(self, key:str, default:Any=None)->Any:
+        return self[key] if key in self else default
+
+    def __setitem__(self, key:str, value:Any)->None:
+        super().__setitem__(key, value)
+        self.proxy_calls += 1
+        self.proxy[key] = value
+
+    def __reduce__(self)->tuple:
+        # spawned processes get a plain dict, they never share the proxy nor the counters
+        return (dict, (dict(self.items()),))
+
+    def get_stats(self)->dict:
+        return {"local_reads": self.local_reads, "proxy_calls": self.proxy_calls}
+
 def prepare_dirs(src:str, session_id:str)->bool:
     try:
         session = context.get_session(session_id)
@@ -382,14 +548,6 @@ def extract_custom_model(session_id)->str|None:
         session['custom_model'] = None
     return None
         
-def hash_proxy_dict(proxy_dict)->str:
-    try:
-        data = dict(proxy_dict)
-    except Exception:
-        data = {}
-    data_str = json.dumps(data, sort_keys=True, default=str)
-    return hashlib.md5(data_str.encode("utf-8")).hexdigest()
-
 def compare_checksums(session_id:str)->tuple[bool, str|None]:
     try:
         session = context.get_session(session_id)
@@ -477,19 +635,17 @@ def ocr2xhtml(img: Image.Image, lang: str)->str:
                 print(error)
                 return False
         data = data.dropna(subset=['text'])
-        lines = []
+        data = data.assign(text=data['text'].astype(str).str.strip())
+        data = data[data['text'] != '']
+        # words joined into the lines tesseract found, in reading order
+        ocr_lines = data.groupby(['block_num', 'par_num', 'line_num'], sort=False).agg(text=('text', ' '.join)).reset_index()
+        raw_lines = []
         last_block = None
-        for _, row in data.iterrows():
-            text = row['text'].strip()
-            if not text:
-                continue
-            block = row['block_num']
+        for block, text in zip(ocr_lines['block_num'].tolist(), ocr_lines['text'].tolist()):
             if last_block is not None and block != last_block:
-                lines.append('')  # blank line between blocks
-            lines.append(text)
+                raw_lines.append('')  # blank line between blocks
+            raw_lines.append(text)
             last_block = block
-        joined = '\n'.join(lines)
-        raw_lines = [l.strip() for l in joined.split('\n')]
         # Normalize line breaks
         merged_lines = []
         buffer = ''
@@ -536,6 +692,87 @@ def ocr2xhtml(img: Image.Image, lang: str)->str:
         print(error)
         return False
 
+def get_ocr_cache()->FileCache|None:
+    # one instance per process, pool workers share the cache folder
+    if ocr_cache_max_mb <= 0:
+        return None
+    if 'cache' not in _ocr_cache:
+        _ocr_cache['cache'] = FileCache(os.path.join(cache_dir, 'ocr'), int(ocr_cache_max_mb * 1024 ** 2), 'xhtml')
+        try:
+            _ocr_cache['tesseract'] = str(pytesseract.get_tesseract_version())
+        except Exception:
+            _ocr_cache['tesseract'] = None
+    return _ocr_cache['cache']
+
+def ocr2xhtml_cached(img:Image.Image, lang:str)->str|bool:
+    # keyed by the decoded pixels, so the same page gives the same key whatever the session or file
+    ocr_cache = get_ocr_cache()
+    if ocr_cache is None:
+        return ocr2xhtml(img, lang)
+    key = FileCache.make_key(
+        'ocr2xhtml',
+        ocr_cache_version,
+        _ocr_cache['tesseract'],
+        lang,
+        img.mode,
+        img.size,
+        hashlib.sha256(img.tobytes()).hexdigest()
+    )
+    data = ocr_cache.fetch_bytes(key)
+    if data is not None:
+        return data.decode('utf-8')
+    xhtml_content = ocr2xhtml(img, lang)
+    if xhtml_content:
+        ocr_cache.store_bytes(key, xhtml_content.encode('utf-8'))
+    return xhtml_content
+
+def get_ocr_page_image(source:str, page_idx:int, is_pdf:bool, doc:Any=None)->Image.Image:
+    # pdf pages are rendered straight to RGB samples, no PNG encoding in between
+    if is_pdf:
+        if doc is None:
+            if _ocr_worker.get('source') != source:
+                _ocr_worker.update({"source": source, "doc": fitz.open(source)})
+            doc = _ocr_worker['doc']
+        pix = doc[page_idx].get_pixmap(dpi=300, colorspace=fitz.csRGB, alpha=False)
+        return Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    with Image.open(source) as img:
+        img.seek(page_idx)
+        return img.convert('RGB')
+
+def _init_ocr_worker()->None:
+    # one tesseract thread per process, the pool already uses the cores
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+
+def _ocr_page_worker(page:tuple[str, int, bool, str])->str|bool:
+    source, page_idx, is_pdf, lang = page
+    return ocr2xhtml_cached(get_ocr_page_image(source, page_idx, is_pdf), lang)
+
+def ocr_pages(session_id:str, source:str, page_indexes:list[int], is_pdf:bool, doc:Any=None)->Generator[tuple[int, str|bool], None, None]:
+    session = context.get_session(session_id)
+    if not page_indexes:
+        return
+    lang = session['language']
+    # the first page runs here so a missing trained model is downloaded once, before the workers need it
+    yield page_indexes[0], ocr2xhtml_cached(get_ocr_page_image(source, page_indexes[0], is_pdf, doc), lang)
+    pending = page_indexes[1:]
+    workers = min(max(cpu_count() - 1, 1), len(pending))
+    if workers <= 1 or len(pending) < min_pages_parallel_ocr:
+        for page_idx in pending:
+            if session['cancellation_requested']:
+                return
+            yield page_idx, ocr2xhtml_cached(get_ocr_page_image(source, page_idx, is_pdf, doc), lang)
+        return
+    msg = f'OCR of {len(pending)} pages with {workers} processes…'
+    print(msg)
+    # only the page references cross the process boundary, each worker renders its own page
+    pages = [(source, page_idx, is_pdf, lang) for page_idx in pending]
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(workers, initializer=_init_ocr_worker) as pool:
+        for page_idx, xhtml_content in zip(pending, pool.imap(_ocr_page_worker, pages)):
+            if session['cancellation_requested']:
+                return
+            yield page_idx, xhtml_content
+
 def load_json_blocks(filepath:str)->list[dict]:
     try:
         with open(filepath, "r", encoding="utf-8") as f:
@@ -557,6 +794,176 @@ def save_json_blocks(session_id:str, file_path:str, key:str)->bool:
         print(f"save_json_blocks() error: {e}")
         return False
 
+def smarten_punctuation(text:str)->str:
+    # what calibre --smarten-punctuation did: dashes, ellipses and curly quotes
+    text = text.replace('---', '—').replace('--', '—').replace('...', '…')
+    text = re.sub(r'(^|[\s(\[{—-])"', r'\1“', text)
+    text = text.replace('"', '”')
+    text = re.sub(r"(^|[\s(\[{—-])'", r'\1‘', text)
+    return text.replace("'", '’')
+
+def is_txt_heading(paragraph:str)->bool:
+    # a short single line without final punctuation, numbered or in capitals
+    lines = paragraph.strip().split('\n')
+    if len(lines) != 1:
+        return False
+    line = lines[0].strip()
+    if not line or len(line.split()) > 10 or line[-1] in '.,;:!?…"\'”’':
+        return False
+    return bool(
+        re.match(r'^(chapter|part|book|section|prologue|epilogue|introduction|preface|foreword|afterword)\b', line, re.IGNORECASE)
+        or re.match(r'^[IVXLCDM]+\.?$|^\d+\.?$', line)
+        or (line.isupper() and any(c.isalpha() for c in line))
+    )
+
+def smarten_html_body(body:Tag)->bool:
+    # comments, CDATA and doctype are NavigableString subclasses and stay as they are
+    changed = False
+    for node in body.find_all(string=True):
+        if type(node) is NavigableString and not node.find_parent(['script', 'style', 'pre', 'code']):
+            text = smarten_punctuation(str(node))
+            if text != str(node):
+                node.replace_with(text)
+                changed = True
+    return changed
+
+def split_html_body(body:Tag)->list[str]:
+    # the body content cut before each h1 to h4, wrappers holding a heading are opened so the cut stays flat
+    heading_tags = ['h1', 'h2', 'h3', 'h4']
+    bodies = [[]]
+
+    def walk(node:Tag)->None:
+        for child in list(node.children):
+            if isinstance(child, Tag) and child.name in heading_tags:
+                if ''.join(bodies[-1]).strip():
+                    bodies.append([])
+                bodies[-1].append(str(child))
+            elif isinstance(child, Tag) and child.find(heading_tags):
+                walk(child)
+            else:
+                bodies[-1].append(str(child))
+
+    walk(body)
+    return [content for parts in bodies if (content := ''.join(parts)).strip()]
+
+def convert2epub_native(session_id:str, file_input:str, file_ext:str)->bool:
+    # epub, html and txt are read without calibre, doing what its page breaks before h1 to h4
+    # and its smarten punctuation did, an epub needing neither is used as it is
+    session = context.get_session(session_id)
+    if session and session.get('id', False):
+        try:
+            epub_path = session['epub_path']
+            filename_no_ext = os.path.splitext(os.path.basename(file_input))[0]
+            if file_ext == '.epub':
+                epub_reader = EpubReader.open(file_input)
+                if epub_reader is None:
+                    return False
+                with epub_reader:
+                    docs = epub_reader.get_documents()
+                    if not docs:
+                        error = f'No spine document found in {file_input}'
+                        print(error)
+                        return False
+                    replacements = {}
+                    for doc in docs:
+                        soup = BeautifulSoup(doc.get_content(), 'html.parser')
+                        if soup.body is None:
+                            continue
+                        changed = smarten_html_body(soup.body)
+                        bodies = split_html_body(soup.body)
+                        if not bodies or (len(bodies) == 1 and not changed):
+                            continue
+                        # each part keeps the head and the body attributes of its document
+                        parts = []
+                        for body in bodies:
+                            soup.body.clear()
+                            soup.body.append(BeautifulSoup(body, 'html.parser'))
+                            parts.append(str(soup).encode('utf-8'))
+                        replacements[doc.get_name()] = parts
+                    if os.path.exists(epub_path):
+                        os.remove(epub_path)
+                    if replacements:
+                        epub_reader.rewrite(epub_path, replacements).close()
+                if not replacements:
+                    try:
+                        os.link(file_input, epub_path)
+                    except OSError:
+                        shutil.copyfile(file_input, epub_path)
+            else:
+                with open(file_input, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+                metadata = {"title": filename_no_ext, "language": session['language']}
+                resources = []
+                if file_ext == '.txt':
+                    # one div per paragraph, as the former blank lines to pause conversion did,
+                    # a document starts at each paragraph that looks like a heading
+                    bodies = [[]]
+                    for p in re.split(r'\n\s*\n', text.replace('\r\n', '\n')):
+                        if not p.strip():
+                            continue
+                        is_heading = is_txt_heading(p)
+                        p = html.escape(smarten_punctuation(' '.join(p.split())))
+                        if is_heading:
+                            if bodies[-1]:
+                                bodies.append([])
+                            bodies[-1].append(f'<h2>{p}</h2>')
+                        else:
+                            bodies[-1].append(f'<div>{p}</div>')
+                    bodies = ['\n'.join(parts) for parts in bodies if parts]
+                else:
+                    soup = BeautifulSoup(text, 'html.parser')
+                    title_tag = soup.find('title')
+                    if title_tag and title_tag.get_text(strip=True):
+                        metadata['title'] = title_tag.get_text(strip=True)
+                    author_tag = soup.find('meta', attrs={"name": 'author'})
+                    if author_tag and author_tag.get('content', '').strip():
+                        metadata['creator'] = author_tag['content'].strip()
+                    # local images are packed along so image-only pages can still go through OCR
+                    src_dir = os.path.dirname(os.path.abspath(file_input))
+                    packed = set()
+                    for img_tag in soup.find_all('img'):
+                        img_ref = img_tag.get('src', '')
+                        if not img_ref or '://' in img_ref or img_ref.startswith('data:'):
+                            continue
+                        img_name = os.path.normpath(urllib.parse.unquote(img_ref)).replace('\\', '/')
+                        img_path = os.path.join(src_dir, img_name)
+                        if img_name.startswith('..') or os.path.isabs(img_name) or img_name in packed or not os.path.isfile(img_path):
+                            continue
+                        with open(img_path, 'rb') as img_file:
+                            resources.append((img_name, img_file.read()))
+                        packed.add(img_name)
+                    body = soup.body if soup.body else BeautifulSoup(f'<body>{text}</body>', 'html.parser').body
+                    smarten_html_body(body)
+                    bodies = split_html_body(body)
+                if not bodies:
+                    error = f'No text found in {file_input}'
+                    print(error)
+                    return False
+                # one document per heading, as calibre did with its page breaks before h1 to h4
+                documents = []
+                for doc_idx, body in enumerate(bodies):
+                    xhtml_text = (
+                        '<?xml version="1.0" encoding="utf-8"?>\n'
+                        '<html xmlns="http://www.w3.org/1999/xhtml">\n'
+                        '<head>\n'
+                        f'<meta charset="utf-8"/>\n<title>{html.escape(metadata["title"])}</title>\n'
+                        '</head>\n'
+                        '<body>\n'
+                        f'{body}\n'
+                        '</body>\n'
+                        '</html>\n'
+                    )
+                    documents.append((f'{filename_no_ext}_{doc_idx:04d}.xhtml', xhtml_text.encode('utf-8')))
+                EpubReader.write(epub_path, metadata, documents, resources).close()
+            msg = f'{file_ext} read natively, calibre not needed'
+            print(msg)
+            return True
+        except Exception as e:
+            error = f'convert2epub_native() error: {e}'
+            print(error)
+            return False
+    return False
+
 def convert2epub(session_id:str)-> bool:
     session = context.get_session(session_id)
     if session and session.get('id', False):
@@ -567,11 +974,6 @@ def convert2epub(session_id:str)-> bool:
         try:
             title = False
             author = False
-            calibre_cli = shutil.which('ebook-convert')
-            if not calibre_cli:
-                error = 'ebook-convert utility is not installed or not found.'
-                print(error)
-                return False
             file_input = session['ebook']
             if os.path.getsize(file_input) == 0:
                 error = f'Input file is empty: {file_input}'
@@ -582,6 +984,16 @@ def convert2epub(session_id:str)-> bool:
                 error = f'Unsupported file format: {file_ext}'
                 print(error)
                 return False
+            if file_ext in native_ebook_formats:
+                if convert2epub_native(session_id, file_input, file_ext):
+                    return True
+                msg = f'Native reading of {file_ext} failed, falling back to calibre…'
+                print(msg)
+            calibre_cli = shutil.which('ebook-convert')
+            if not calibre_cli:
+                error = 'ebook-convert utility is not installed or not found.'
+                print(error)
+                return False
             if file_ext == '.txt':
                 with open(file_input, 'r', encoding='utf-8') as f:
                     text = f.read()
@@ -597,25 +1009,29 @@ def convert2epub(session_id:str)-> bool:
                 filename_no_ext = os.path.splitext(os.path.basename(session['ebook']))[0]
                 title = file_meta.get('title') or filename_no_ext
                 author = file_meta.get('author') or False
-                xhtml_pages = []
+                page_contents = {}
+                ocr_indexes = []
                 for i, page in enumerate(doc):
                     try:
                         text = page.get_text('xhtml').strip()
                     except Exception as e:
                         print(f'Error extracting text from page {i+1}: {e}')
                         text = ''
-                    if not text:
-                        msg = f'The page {i+1} seems to be image-based. Using OCR…'
-                        print(msg)
-                        if session['is_gui_process']:
-                            show_alert({"type": "warning", "msg": msg})
-                        pix = page.get_pixmap(dpi=300)
-                        img = Image.open(io.BytesIO(pix.tobytes('png')))
-                        xhtml_content = ocr2xhtml(img, session['language'])
+                    if text:
+                        page_contents[i] = text
                     else:
-                        xhtml_content = text
-                    if xhtml_content:
-                        xhtml_pages.append(xhtml_content)
+                        ocr_indexes.append(i)
+                if ocr_indexes:
+                    msg = f'{len(ocr_indexes)} page(s) seem to be image-based. Using OCR…'
+                    print(msg)
+                    if session['is_gui_process']:
+                        show_alert({"type": "warning", "msg": msg})
+                    for i, xhtml_content in ocr_pages(session_id, file_input, ocr_indexes, True, doc):
+                        if xhtml_content:
+                            page_contents[i] = xhtml_content
+                    if session['cancellation_requested']:
+                        return False
+                xhtml_pages = [page_contents[i] for i in sorted(page_contents)]
                 if xhtml_pages:
                     xhtml_body = '\n'.join(xhtml_pages)
                     xhtml_text = (
@@ -638,14 +1054,14 @@ def convert2epub(session_id:str)-> bool:
                 filename_no_ext = os.path.splitext(os.path.basename(session['ebook']))[0]
                 msg = f'File input is an image ({file_ext}). Running OCR…'
                 print(msg)
-                img = Image.open(file_input)
-                xhtml_pages = []
-                page_count = 0
-                for i, frame in enumerate(ImageSequence.Iterator(img)):
-                    page_count += 1
-                    frame = frame.convert('RGB')
-                    xhtml_content = ocr2xhtml(frame, session['language'])
-                    xhtml_pages.append(xhtml_content)
+                with Image.open(file_input) as img:
+                    page_count = getattr(img, 'n_frames', 1)
+                xhtml_pages = [
+                    xhtml_content for _, xhtml_content in ocr_pages(session_id, file_input, list(range(page_count)), False)
+                    if xhtml_content
+                ]
+                if session['cancellation_requested']:
+                    return False
                 if xhtml_pages:
                     xhtml_body = '\n'.join(xhtml_pages)
                     xhtml_text = (
@@ -710,7 +1126,7 @@ def convert2epub(session_id:str)-> bool:
             print(error)
             return False
 
-def get_ebook_title(epubBook:EpubBook,all_docs:list[Any])->str|None:
+def get_ebook_title(epubBook:EpubReader,all_docs:list[EpubDocument])->str|None:
     # 1. Try metadata (official EPUB title)
     meta_title = epubBook.get_metadata('DC','title')
     if meta_title and meta_title[0][0].strip():
@@ -730,7 +1146,7 @@ def get_ebook_title(epubBook:EpubBook,all_docs:list[Any])->str|None:
                 return alt
     return None
 
-def get_cover(epubBook:EpubBook, session_id:str)->bool|str:
+def get_cover(epubBook:EpubReader, session_id:str)->bool|str:
     try:
         session = context.get_session(session_id)
         if session and session.get('id', False):
@@ -740,14 +1156,9 @@ def get_cover(epubBook:EpubBook, session_id:str)->bool|str:
                 return False
             cover_image = None
             cover_path = os.path.join(session['process_dir'], session['filename_noext'] + '.jpg')
-            for item in epubBook.get_items_of_type(ebooklib.ITEM_COVER):
-                cover_image = item.get_content()
-                break
-            if not cover_image:
-                for item in epubBook.get_items_of_type(ebooklib.ITEM_IMAGE):
-                    if 'cover' in item.file_name.lower() or 'cover' in item.get_id().lower():
-                        cover_image = item.get_content()
-                        break
+            cover_name = epubBook.get_cover_name()
+            if cover_name:
+                cover_image = epubBook.read(cover_name)
             if cover_image:
                 # Open the image from bytes
                 image = Image.open(io.BytesIO(cover_image))
@@ -761,7 +1172,7 @@ def get_cover(epubBook:EpubBook, session_id:str)->bool|str:
         DependencyError(e)
         return False
 
-def get_blocks(session_id:str, epubBook:EpubBook)->list:
+def iter_blocks(session_id:str, epubBook:EpubReader)->Generator[str, None, None]:
     try:
         msg = r'''
 *******************************************************************************
@@ -780,7 +1191,7 @@ INTO A NEW TRAINING MODEL. YOU CAN IMPROVE IT OR ASK TO A TRAINING MODEL EXPERT.
             if session['cancellation_requested']:
                 msg = 'Cancel requested'
                 print(msg)
-                return []
+                return
             # Step 1: Extract TOC (Table of Contents)
             try:
                 toc = epubBook.toc
@@ -791,19 +1202,12 @@ INTO A NEW TRAINING MODEL. YOU CAN IMPROVE IT OR ASK TO A TRAINING MODEL EXPERT.
             except Exception as toc_error:
                 error = f'Error extracting Table of Content: {toc_error}'
                 show_alert({"type": "warning", "msg": error})
-            # Get spine item IDs
-            spine_ids = [item[0] for item in epubBook.spine]
-            # Filter only spine documents (i.e., reading order)
-            all_docs = [
-                item for item in epubBook.get_items_of_type(ebooklib.ITEM_DOCUMENT)
-                if item.id in spine_ids
-            ]
+            # Spine documents only (i.e., reading order), their content is read when parsed
+            all_docs = epubBook.get_documents()
             if not all_docs:
                 error = 'No document body found!'
-                print(error)
-                return []
+                raise RuntimeError(error)
             title = get_ebook_title(epubBook, all_docs)
-            bloks = []
             stanza_nlp = False
             if session['language'] in year_to_decades_languages:
                 try:
@@ -827,34 +1231,214 @@ INTO A NEW TRAINING MODEL. YOU CAN IMPROVE IT OR ASK TO A TRAINING MODEL EXPERT.
                             print(msg)
                 except (ConnectionError, TimeoutError) as e:
                     error = f'Stanza model download connection error: {e}. Retry later'
-                    print(error)
-                    return []
+                    raise RuntimeError(error) from e
                 except Exception as e:
                     error = f'Stanza model initialization error: {e}'
-                    print(error)
-                    return []
+                    raise RuntimeError(error) from e
             is_num2words_compat = get_num2words_compat(session['language_iso1'])
-            with zipfile.ZipFile(session['epub_path'], 'r') as zf:
-                zip_names = set(zf.namelist())
-                zip_basenames = {os.path.basename(n): n for n in zip_names}
-                for doc_idx, doc in enumerate(all_docs):
-                    text = filter_blocks(session_id, doc_idx, doc, stanza_nlp, is_num2words_compat, zf, zip_names, zip_basenames)
-                    if text is None:
-                        break
-                    elif text:
-                        bloks.append(text)
-            if len(bloks) == 0:
-                error = 'No bloks found! possible reason: file corrupted or need to convert images to text with OCR'
-                print(error)
-                return []
-            return bloks
-        return []
+            workers = min(max(cpu_count() - 1, 1), len(all_docs))
+            if workers > 1 and len(all_docs) >= min_docs_parallel_filter:
+                yield from iter_blocks_parallel(session_id, all_docs, stanza_nlp, is_num2words_compat, workers)
+                return
+            for doc_idx, doc in enumerate(all_docs):
+                text = filter_blocks(session_id, doc_idx, doc, stanza_nlp, is_num2words_compat, epubBook)
+                if text is None:
+                    if session['cancellation_requested']:
+                        return
+                    error = f'Parsing doc {doc_idx} failed!'
+                    raise RuntimeError(error)
+                elif text:
+                    yield text
     except Exception as e:
+        # a book that failed halfway must not be converted as if it were complete
         error = f'Error extracting main content pages: {e}'
         DependencyError(error)
+        raise RuntimeError(error) from e
+
+def _init_blocks_worker(session:dict, epub_path:str)->None:
+    get_filter_regexes()
+    _blocks_worker.update({
+        "session": session,
+        "epub": EpubReader(epub_path)
+    })
+
+def _blocks_worker_markup(doc:tuple[int, str])->tuple[str, list[str]]|str|None:
+    # each worker reads its documents from its own reader, only names cross the process boundary
+    doc_idx, doc_name = doc
+    msg = f'----------\nParsing doc {doc_idx}'
+    print(msg)
+    w = _blocks_worker
+    return filter_blocks_markup(w['session'], doc_idx, doc_name, w['epub'].read_body(doc_name), w['epub'])
+
+def _blocks_worker_words(text:str, sml_blocks:list[str], is_num2words_compat:bool)->str|None:
+    return filter_blocks_words(_blocks_worker['session'], text, sml_blocks, is_num2words_compat)
+
+def _blocks_worker_filter(doc:tuple[int, str], is_num2words_compat:bool)->str|None:
+    result = _blocks_worker_markup(doc)
+    if not result:
+        return result
+    return _blocks_worker_words(*result, is_num2words_compat)
+
+def iter_blocks_parallel(session_id:str, all_docs:list[EpubDocument], stanza_nlp:Pipeline|bool, is_num2words_compat:bool, workers:int)->Generator[str, None, None]:
+    session = context.get_session(session_id)
+    msg = f'Parsing {len(all_docs)} docs with {workers} processes…'
+    print(msg)
+    docs = [(doc_idx, doc.get_name()) for doc_idx, doc in enumerate(all_docs)]
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(workers, initializer=_init_blocks_worker, initargs=(get_session_snapshot(session), session['epub_path'])) as pool:
+        if not stanza_nlp:
+            for doc_idx, text in enumerate(pool.imap(partial(_blocks_worker_filter, is_num2words_compat=is_num2words_compat), docs)):
+                if session['cancellation_requested']:
+                    return
+                if text is None:
+                    error = f'Parsing doc {doc_idx} failed!'
+                    raise RuntimeError(error)
+                if text:
+                    yield text
+            return
+        # Stanza stays in this process: markup and words passes run in the pool,
+        # dates are converted here between them, results are yielded in spine order
+        pending = deque()
+        for doc_idx, result in enumerate(pool.imap(_blocks_worker_markup, docs)):
+            if session['cancellation_requested']:
+                return
+            if result is None:
+                error = f'Parsing doc {doc_idx} failed!'
+                raise RuntimeError(error)
+            if result:
+                text, sml_blocks = result
+                text = filter_blocks_dates(session, text, stanza_nlp, is_num2words_compat)
+                pending.append((doc_idx, pool.apply_async(_blocks_worker_words, (text, sml_blocks, is_num2words_compat))))
+            while pending and pending[0][1].ready():
+                text = get_pending_block(*pending.popleft())
+                if text:
+                    yield text
+        while pending:
+            if session['cancellation_requested']:
+                return
+            text = get_pending_block(*pending.popleft())
+            if text:
+                yield text
+
+def get_pending_block(doc_idx:int, pending:Any)->str:
+    text = pending.get()
+    if text is None:
+        error = f'Parsing doc {doc_idx} failed!'
+        raise RuntimeError(error)
+    return text
+
+def get_blocks(session_id:str, epubBook:EpubReader)->list:
+    session = context.get_session(session_id)
+    try:
+        bloks = list(iter_blocks(session_id, epubBook))
+    except Exception as e:
+        error = f'get_blocks() error: {e}'
+        print(error)
+        return []
+    if session['cancellation_requested']:
+        msg = 'Cancel requested'
+        print(msg)
+        return []
+    if len(bloks) == 0:
+        error = 'No bloks found! possible reason: file corrupted or need to convert images to text with OCR'
+        print(error)
         return []
+    return bloks
+
+def stream_chapters(session_id:str, epubBook:EpubReader, json_blocks_orig_file:str, json_blocks_edit_file:str)->Generator[list[str], None, None]:
+    session = context.get_session(session_id)
+    # the parser stays a few blocks ahead of the conversion at most
+    chapters_queue = Queue(maxsize=stream_chapters_ahead)
+    stop_event = threading.Event()
+    errors = []
+
+    def put_chapter(item:list[str]|None)->bool:
+        while not stop_event.is_set():
+            try:
+                chapters_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def parse_blocks()->None:
+        bloks = []
+        try:
+            for text in iter_blocks(session_id, epubBook):
+                if stop_event.is_set():
+                    return
+                bloks.append(text)
+                sentences_list = get_sentences(text, session_id)
+                if sentences_list is None:
+                    errors.append('No sentences found!')
+                    return
+                if sentences_list and not put_chapter(sentences_list):
+                    return
+            if len(bloks) == 0:
+                errors.append('No bloks found! possible reason: file corrupted or need to convert images to text with OCR')
+                return
+            if stop_event.is_set() or session['cancellation_requested']:
+                # the conversion ended before the whole book was parsed, nothing to save
+                return
+            session['blocks_orig'] = [{"expand": False, "keep": True, "text": t} for t in bloks]
+            session['blocks_edit'] = copy.deepcopy(session['blocks_orig'])
+            save_json_blocks(session_id, json_blocks_orig_file, 'blocks_orig')
+            save_json_blocks(session_id, json_blocks_edit_file, 'blocks_edit')
+        except Exception as e:
+            errors.append(f'stream_chapters() error: {e}')
+        finally:
+            put_chapter(None)
+
+    parser = threading.Thread(target=parse_blocks, daemon=True)
+    parser.start()
+    try:
+        while True:
+            sentences_list = chapters_queue.get()
+            if sentences_list is None:
+                break
+            yield sentences_list
+        parser.join()
+    finally:
+        # also reached when the consumer stops early and the generator is closed
+        stop_event.set()
+    if errors:
+        raise RuntimeError(errors[0])
+
+def get_filter_regexes()->dict:
+    # compiled once per process, process pool workers warm it up in their initializer
+    if not _filter_regexes:
+        break_token = re.escape(sml_token('break'))
+        _filter_regexes.update({
+            "strip_break_spaces": re.compile(rf'\s*{break_token}\s*'),
+            "break_between_alnum": re.compile(rf'(?<=[\w]){break_token}(?=[\w])', flags=re.UNICODE),
+            "ordinal": re.compile(
+                r'(?<!\w)(0?[1-9]|[12][0-9]|3[01])(?:\s|\u00A0)*(?:st|nd|rd|th)(?!\w)',
+                re.IGNORECASE
+            ),
+            "num": re.compile(r'(?<!\w)[-+]?\d+(?:\.\d+)?(?!\w)')
+        })
+    return _filter_regexes
+
+def filter_blocks(session_id:str, idx:int, doc:EpubDocument, stanza_nlp:Pipeline, is_num2words_compat:bool, epub_reader:EpubReader|None=None)->str|None:
+    try:
+        msg = f'----------\nParsing doc {idx}'
+        print(msg)
+        session = context.get_session(session_id)
+        if session and session.get('id', False):
+            result = filter_blocks_markup(session, idx, doc.get_name(), doc.get_body_content(), epub_reader)
+            if not result:
+                return result
+            text, sml_blocks = result
+            if stanza_nlp:
+                text = filter_blocks_dates(session, text, stanza_nlp, is_num2words_compat)
+            return filter_blocks_words(session, text, sml_blocks, is_num2words_compat)
+        return None
+    except Exception as e:
+        error = f'filter_blocks() error: {e}'
+        DependencyError(error)
+        return None
 
-def filter_blocks(session_id:str, idx:int, doc:EpubHtml, stanza_nlp:Pipeline, is_num2words_compat:bool, zf:zipfile.ZipFile=None, zip_names:set=None, zip_basenames:dict=None)->str|None:
+def filter_blocks_markup(session:Any, idx:int, doc_name:str, doc_body:bytes|str, epub_reader:EpubReader|None=None)->tuple[str, list[str]]|str|None:
 
     def _tuple_row(node:Any, last_text_char:str|None=None)->Generator[tuple[str, Any], None, None]|None:
         try:
@@ -914,6 +1498,153 @@ def filter_blocks(session_id:str, idx:int, doc:EpubHtml, stanza_nlp:Pipeline, is
             DependencyError(error)
             return None
 
+    try:
+        lang = session['language']
+        heading_tags = [f'h{i}' for i in range(1, 5)]
+        break_tags = ['br', 'p', 'span']
+        pause_tags = ['div']
+        proc_tags = heading_tags + break_tags + pause_tags
+        raw_html = doc_body.decode('utf-8') if isinstance(doc_body, bytes) else doc_body
+        soup = BeautifulSoup(raw_html, 'html.parser')
+        body = soup.body
+        if not body:
+            msg = 'No body found. Skip to next doc…'
+            print(msg)
+            return ''
+        # Skip known non-chapter types
+        epub_type = body.get('epub:type', '').lower()
+        if not epub_type:
+            section_tag = soup.find('section')
+            if section_tag:
+                epub_type = section_tag.get('epub:type', '').lower()
+        excluded = {
+            'frontmatter', 'backmatter', 'toc', 'titlepage', 'colophon',
+            'acknowledgments', 'dedication', 'glossary', 'index',
+            'appendix', 'bibliography', 'copyright-page', 'landmark'
+        }
+        if any(part in epub_type for part in excluded):
+            msg = 'No body part. Skip to next doc…'
+            print(msg)
+            return ''
+        # remove scripts/styles
+        for tag in soup(['script', 'style']):
+            tag.decompose()
+        if not body.get_text(strip=True):
+            images = body.find_all('img') + body.find_all('image')
+            if images and epub_reader:
+                msg = f'Doc {idx}: no text but {len(images)} image(s) detected. Running OCR…'
+                print(msg)
+                if session['is_gui_process']:
+                    show_alert({"type": "warning", "msg": msg})
+                ocr_parts = []
+                for img_tag in images:
+                    img_ref = (
+                        img_tag.get('src')
+                        or img_tag.get('href')
+                        or img_tag.get('{http://www.w3.org/1999/xlink}href')
+                        or img_tag.get('xlink:href')
+                    )
+                    if not img_ref:
+                        continue
+                    img_zip_path = epub_reader.resolve(doc_name, img_ref)
+                    if not img_zip_path:
+                        print(f'Could not resolve image in EPUB: {img_ref}')
+                        continue
+                    try:
+                        img_data = epub_reader.read(img_zip_path)
+                        img = Image.open(io.BytesIO(img_data))
+                        img = img.convert('RGB')
+                        xhtml_content = ocr2xhtml_cached(img, lang)
+                        if xhtml_content:
+                            ocr_parts.append(xhtml_content)
+                    except Exception as ocr_err:
+                        print(f'OCR error on {img_zip_path}: {ocr_err}')
+        tuples_list = list(_tuple_row(body))
+        if not tuples_list:
+            msg = 'No body text and no images found. Skip to next doc…'
+            print(msg)
+            return ''
+        msg = f'Parsing xhtml markers…'
+        print(msg)
+        text_list = []
+        handled_tables = set()
+        prev_typ = None
+        for typ, payload in tuples_list:
+            if typ == 'heading':
+                text_list.append(payload.strip())
+            elif typ in ('break', 'pause'):
+                if prev_typ != typ:
+                    text_list.append(sml_token(typ))
+            elif typ == 'table':
+                table = payload
+                if table in handled_tables:
+                    prev_typ = typ
+                    continue
+                handled_tables.add(table)
+                rows = table.find_all('tr')
+                if not rows:
+                    prev_typ = typ
+                    continue
+                headers = [c.get_text(strip=True) for c in rows[0].find_all(['td', 'th'])]
+                for row in rows[1:]:
+                    cells = [c.get_text(strip=True).replace('\xa0', ' ') for c in row.find_all('td')]
+                    if not cells:
+                        continue
+                    if len(cells) == len(headers) and headers:
+                        line = ' — '.join(f'{h}: {c}' for h, c in zip(headers, cells))
+                    else:
+                        line = ' — '.join(cells)
+                    if line:
+                        text_list.append(line.strip())
+            else:
+                text = payload.strip()
+                if text:
+                    text_list.append(text)
+            prev_typ = typ
+        msg = f'Flattening as raw text…'
+        print(msg)
+        max_chars = int(language_mapping[lang]['max_chars'] / 1.5)
+        clean_list = []
+        i = 0
+        while i < len(text_list):
+            current = text_list[i]
+            if current in {v['static'] for v in TTS_SML.values() if "static" in v}:
+                if clean_list:
+                    prev = clean_list[-1]
+                    if prev in {v['static'] for v in TTS_SML.values() if "static" in v}:
+                        i += 1
+                        continue
+                clean_list.append(current)
+                i += 1
+                continue
+            clean_list.append(current)
+            i += 1
+        text = ' '.join(clean_list)
+        if not re.search(r"[^\W_]", text):
+            error = 'No valid text found!'
+            print(error)
+            return None
+        # clean SML tags badly coded
+        res, text = normalize_sml_tags(text)
+        if res is False:
+            print(text)
+            if session['is_gui_process']:
+                show_alert({"type": "warning", "msg": text})
+            return None
+        # remove any [break] between words or cutting words
+        filter_re = get_filter_regexes()
+        text = filter_re['strip_break_spaces'].sub(sml_token('break'), text)
+        text = filter_re['break_between_alnum'].sub(' ', text)
+        # escape all SML tags to not be touched by any text treatment
+        text, sml_blocks = escape_sml(text)
+        return text, sml_blocks
+    except Exception as e:
+        error = f'filter_blocks_markup() error: {e}'
+        DependencyError(error)
+        return None
+
+def filter_blocks_dates(session:Any, text:str, stanza_nlp:Pipeline, is_num2words_compat:bool)->str:
+
     def _num_repl(m):
         s = m.group(0)
         # leave years alone (already handled above)
@@ -923,235 +1654,104 @@ def filter_blocks(session_id:str, idx:int, doc:EpubHtml, stanza_nlp:Pipeline, is
         if is_num2words_compat:
             return num2words(n, lang=(lang_iso1 or 'en'))
         else:
-            return math2words(m, lang, lang_iso1, tts_engine, is_num2words_compat)
+            return math2words(s, lang, lang_iso1, tts_engine, is_num2words_compat)
+
+    lang, lang_iso1, tts_engine = session['language'], session['language_iso1'], session['tts_engine']
+    msg = 'Converting dates and years to words…'
+    print(msg)
+    filter_re = get_filter_regexes()
+    re_ordinal = filter_re['ordinal']
+    re_num = filter_re['num']
+    text = unicodedata.normalize('NFKC', text).replace('\u00A0', ' ')
+    if re_num.search(text) and re_ordinal.search(text):
+        date_spans = get_date_entities(text, stanza_nlp)
+        if date_spans:
+            result = []
+            last_pos = 0
+            for start, end, date_text in date_spans:
+                result.append(text[last_pos:start])
+                # 1) convert 4-digit years (your original behavior)
+                processed = re.sub(
+                    r"\b\d{4}\b",
+                    lambda m: year2words(m.group(), lang, lang_iso1, is_num2words_compat),
+                    date_text
+                )
+                # 2) convert ordinal days like "16th"/"16 th"->"sixteenth"
+                if is_num2words_compat:
+                    processed = re_ordinal.sub(
+                        lambda m: num2words(int(m.group(1)), to='ordinal', lang=(lang_iso1 or 'en')),
+                        processed
+                    )
+                else:
+                    processed = re_ordinal.sub(
+                        lambda m: math2words(m.group(), lang, lang_iso1, tts_engine, is_num2words_compat),
+                        processed
+                    )
+                # 3) convert other numbers (skip 4-digit years)
+                processed = re_num.sub(_num_repl, processed)
+                result.append(processed)
+                last_pos = end
+            result.append(text[last_pos:])
+            text = ' '.join(result)
+        else:
+            if is_num2words_compat:
+                text = re_ordinal.sub(
+                    lambda m: num2words(int(m.group(1)), to='ordinal', lang=(lang_iso1 or 'en')),
+                    text
+                )
+            else:
+                text = re_ordinal.sub(
+                    lambda m: math2words(m.group(0), lang, lang_iso1, tts_engine, is_num2words_compat),
+                    text
+                )
+            text = re.sub(
+                r"\b\d{4}\b",
+                lambda m: year2words(m.group(), lang, lang_iso1, is_num2words_compat),
+                text
+            )
+    return text
 
+def filter_blocks_words(session:Any, text:str, sml_blocks:list[str], is_num2words_compat:bool)->str|None:
     try:
-        msg = f'----------\nParsing doc {idx}'
+        lang, lang_iso1, tts_engine = session['language'], session['language_iso1'], session['tts_engine']
+        msg = 'Convert romans to numbers…'
         print(msg)
-        session = context.get_session(session_id)
-        if session and session.get('id', False):
-            lang, lang_iso1, tts_engine = session['language'], session['language_iso1'], session['tts_engine']
-            heading_tags = [f'h{i}' for i in range(1, 5)]
-            break_tags = ['br', 'p', 'span']
-            pause_tags = ['div']
-            proc_tags = heading_tags + break_tags + pause_tags
-            doc_body = doc.get_body_content()
-            raw_html = doc_body.decode('utf-8') if isinstance(doc_body, bytes) else doc_body
-            soup = BeautifulSoup(raw_html, 'html.parser')
-            body = soup.body
-            if not body:
-                msg = 'No body found. Skip to next doc…'
-                print(msg)
-                return ''
-            # Skip known non-chapter types
-            epub_type = body.get('epub:type', '').lower()
-            if not epub_type:
-                section_tag = soup.find('section')
-                if section_tag:
-                    epub_type = section_tag.get('epub:type', '').lower()
-            excluded = {
-                'frontmatter', 'backmatter', 'toc', 'titlepage', 'colophon',
-                'acknowledgments', 'dedication', 'glossary', 'index',
-                'appendix', 'bibliography', 'copyright-page', 'landmark'
-            }
-            if any(part in epub_type for part in excluded):
-                msg = 'No body part. Skip to next doc…'
-                print(msg)
-                return ''
-            # remove scripts/styles
-            for tag in soup(['script', 'style']):
-                tag.decompose()
-            if not body.get_text(strip=True):
-                images = body.find_all('img') + body.find_all('image')
-                if images and zf:
-                    msg = f'Doc {idx}: no text but {len(images)} image(s) detected. Running OCR…'
-                    print(msg)
-                    if session['is_gui_process']:
-                        show_alert({"type": "warning", "msg": msg})
-                    ocr_parts = []
-                    doc_dir = os.path.dirname(doc.get_name())
-                    for img_tag in images:
-                        img_ref = (
-                            img_tag.get('src')
-                            or img_tag.get('href')
-                            or img_tag.get('{http://www.w3.org/1999/xlink}href')
-                            or img_tag.get('xlink:href')
-                        )
-                        if not img_ref:
-                            continue
-                        img_zip_path = os.path.normpath(os.path.join(doc_dir, img_ref)).replace('\\', '/')
-                        if img_zip_path not in zip_names:
-                            img_zip_path = zip_basenames.get(os.path.basename(img_ref))
-                        if not img_zip_path:
-                            print(f'Could not resolve image in EPUB: {img_ref}')
-                            continue
-                        try:
-                            img_data = zf.read(img_zip_path)
-                            img = Image.open(io.BytesIO(img_data))
-                            img = img.convert('RGB')
-                            xhtml_content = ocr2xhtml(img, lang)
-                            if xhtml_content:
-                                ocr_parts.append(xhtml_content)
-                        except Exception as ocr_err:
-                            print(f'OCR error on {img_zip_path}: {ocr_err}')
-            tuples_list = list(_tuple_row(body))
-            if not tuples_list:
-                msg = 'No body text and no images found. Skip to next doc…'
-                print(msg)
-                return ''
-            msg = f'Parsing xhtml markers…'
-            print(msg)
-            text_list = []
-            handled_tables = set()
-            prev_typ = None
-            for typ, payload in tuples_list:
-                if typ == 'heading':
-                    text_list.append(payload.strip())
-                elif typ in ('break', 'pause'):
-                    if prev_typ != typ:
-                        text_list.append(sml_token(typ))
-                elif typ == 'table':
-                    table = payload
-                    if table in handled_tables:
-                        prev_typ = typ
-                        continue
-                    handled_tables.add(table)
-                    rows = table.find_all('tr')
-                    if not rows:
-                        prev_typ = typ
-                        continue
-                    headers = [c.get_text(strip=True) for c in rows[0].find_all(['td', 'th'])]
-                    for row in rows[1:]:
-                        cells = [c.get_text(strip=True).replace('\xa0', ' ') for c in row.find_all('td')]
-                        if not cells:
-                            continue
-                        if len(cells) == len(headers) and headers:
-                            line = ' — '.join(f'{h}: {c}' for h, c in zip(headers, cells))
-                        else:
-                            line = ' — '.join(cells)
-                        if line:
-                            text_list.append(line.strip())
-                else:
-                    text = payload.strip()
-                    if text:
-                        text_list.append(text)
-                prev_typ = typ
-            msg = f'Flattening as raw text…'
-            print(msg)
-            max_chars = int(language_mapping[lang]['max_chars'] / 1.5)
-            clean_list = []
-            i = 0
-            while i < len(text_list):
-                current = text_list[i]
-                if current in {v['static'] for v in TTS_SML.values() if "static" in v}:
-                    if clean_list:
-                        prev = clean_list[-1]
-                        if prev in {v['static'] for v in TTS_SML.values() if "static" in v}:
-                            i += 1
-                            continue
-                    clean_list.append(current)
-                    i += 1
-                    continue
-                clean_list.append(current)
-                i += 1
-            text = ' '.join(clean_list)
-            if not re.search(r"[^\W_]", text):
-                error = 'No valid text found!'
-                print(error)
-                return None
-            # clean SML tags badly coded
-            res, text = normalize_sml_tags(text)
-            if res is False:
-                print(text)
-                if session['is_gui_process']:
-                    show_alert({"type": "warning", "msg": text})
-                return None
-            # remove any [break] between words or cutting words
-            break_token = re.escape(sml_token('break'))
-            strip_break_spaces_re = re.compile(rf'\s*{break_token}\s*')
-            break_between_alnum_re = re.compile(rf'(?<=[\w]){break_token}(?=[\w])', flags=re.UNICODE)
-            text = strip_break_spaces_re.sub(sml_token('break'), text)
-            text = break_between_alnum_re.sub(' ', text)
-            # escape all SML tags to not be touched by any text treatment
-            text, sml_blocks = escape_sml(text)
-            if stanza_nlp:
-                msg = 'Converting dates and years to words…'
-                print(msg)
-                re_ordinal = re.compile(
-                    r'(?<!\w)(0?[1-9]|[12][0-9]|3[01])(?:\s|\u00A0)*(?:st|nd|rd|th)(?!\w)',
-                    re.IGNORECASE
-                )
-                re_num = re.compile(r'(?<!\w)[-+]?\d+(?:\.\d+)?(?!\w)')
-                text = unicodedata.normalize('NFKC', text).replace('\u00A0', ' ')
-                if re_num.search(text) and re_ordinal.search(text):
-                    date_spans = get_date_entities(text, stanza_nlp)
-                    if date_spans:
-                        result = []
-                        last_pos = 0
-                        for start, end, date_text in date_spans:
-                            result.append(text[last_pos:start])
-                            # 1) convert 4-digit years (your original behavior)
-                            processed = re.sub(
-                                r"\b\d{4}\b",
-                                lambda m: year2words(m.group(), lang, lang_iso1, is_num2words_compat),
-                                date_text
-                            )
-                            # 2) convert ordinal days like "16th"/"16 th"->"sixteenth"
-                            if is_num2words_compat:
-                                processed = re_ordinal.sub(
-                                    lambda m: num2words(int(m.group(1)), to='ordinal', lang=(lang_iso1 or 'en')),
-                                    processed
-                                )
-                            else:
-                                processed = re_ordinal.sub(
-                                    lambda m: math2words(m.group(), lang, lang_iso1, tts_engine, is_num2words_compat),
-                                    processed
-                                )
-                            # 3) convert other numbers (skip 4-digit years)
-                            processed = re_num.sub(_num_repl, processed)
-                            result.append(processed)
-                            last_pos = end
-                        result.append(text[last_pos:])
-                        text = ' '.join(result)
-                    else:
-                        if is_num2words_compat:
-                            text = re_ordinal.sub(
-                                lambda m: num2words(int(m.group(1)), to='ordinal', lang=(lang_iso1 or 'en')),
-                                text
-                            )
-                        else:
-                            text = re_ordinal.sub(
-                                lambda m: math2words(int(m.group(1)), lang, lang_iso1, tts_engine, is_num2words_compat),
-                                text
-                            )
-                        text = re.sub(
-                            r"\b\d{4}\b",
-                            lambda m: year2words(m.group(), lang, lang_iso1, is_num2words_compat),
-                            text
-                        )
-            msg = 'Convert romans to numbers…'
-            print(msg)
-            text = roman2number(text)
-            msg = 'Convert time to words…'
-            print(msg)
-            text = clock2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
-            msg = 'Convert numbers, maths signs to words…'
-            print(msg)
-            text = math2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
-            msg = 'Normalize text…'
-            print(msg)
-            text = normalize_text(text, lang, lang_iso1, tts_engine)
-            text = restore_sml(text, sml_blocks)
-            return text
-        return None
+        text = roman2number(text)
+        msg = 'Convert time to words…'
+        print(msg)
+        text = clock2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
+        msg = 'Convert numbers, maths signs to words…'
+        print(msg)
+        text = math2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
+        msg = 'Normalize text…'
+        print(msg)
+        text = normalize_text(text, lang, lang_iso1, tts_engine)
+        text = restore_sml(text, sml_blocks)
+        return text
     except Exception as e:
-        error = f'filter_blocks() error: {e}'
+        error = f'filter_blocks_words() error: {e}'
         DependencyError(error)
         return None
 
+def get_sentence_regexes()->dict:
+    # compiled once per process, shared by every get_sentences() call
+    if not _sentence_regexes:
+        _sentence_regexes.update({
+            "hard": re.compile(rf"(?:{'|'.join(map(re.escape, punctuation_split_hard_set))})(?=\s|$)"),
+            "soft": re.compile(rf"(?:{'|'.join(map(re.escape, punctuation_split_soft_set))})(?=\s|$)"),
+            "escaped": re.compile(f'[{chr(sml_escape_tag)}-{chr(sys.maxunicode)}]'),
+            "non_word": re.compile(r'[^\w\s]', flags=re.UNICODE),
+            "latin": re.compile(r'[A-Za-z]'),
+            "non_ascii": re.compile(r'[^\x00-\x7F]'),
+            "latin_end": re.compile(r'[A-Za-z0-9]$'),
+            "non_ascii_end": re.compile(r'[^\x00-\x7F]$')
+        })
+    return _sentence_regexes
+
 def get_sentences(text:str, session_id:str)->list|None:
 
     def split_inclusive(text:str, pattern:re.Pattern[str])->list[str]:
+        # pattern only matches the punctuation itself so the scan never backtracks over the text
         result = []
         last_end = 0
         for match in pattern.finditer(text):
@@ -1181,34 +1781,18 @@ def get_sentences(text:str, session_id:str)->list|None:
         return parts
 
     def strip_escaped_sml(s:str)->str:
-        return ''.join(c for c in s if ord(c) < sml_escape_tag)
+        return escaped_re.sub('', s)
 
     def clean_len(s:str)->int:
-        return len(strip_escaped_sml(s))
+        return len(s) - len(escaped_re.findall(s))
 
     def is_latin_only(s:str)->bool:
         s = strip_escaped_sml(s)
-        s = re.sub(r'[^\w\s]', '', s, flags=re.UNICODE)
-        has_latin = bool(re.search(r'[A-Za-z]', s))
-        has_nonlatin = bool(re.search(r'[^\x00-\x7F]', s))
+        s = sentence_re['non_word'].sub('', s)
+        has_latin = bool(sentence_re['latin'].search(s))
+        has_nonlatin = bool(sentence_re['non_ascii'].search(s))
         return has_latin and not has_nonlatin
 
-    def split_at_space_limit(s:str)->list[str]:
-        out = []
-        rest = s.strip()
-        while rest and len(strip_escaped_sml(rest)) > max_chars:
-            cut = rest[:max_chars + 1]
-            idx = cut.rfind(' ')
-            if idx == -1:
-                out.append(rest[:max_chars].strip())
-                rest = rest[max_chars:].strip()
-            else:
-                out.append(rest[:idx].strip())
-                rest = rest[idx + 1:].strip()
-        if rest:
-            out.append(rest.strip())
-        return out
-
     def segment_ideogramms(text:str)->list[str]:
         result = []
         try:
@@ -1237,28 +1821,33 @@ def get_sentences(text:str, session_id:str)->list|None:
             return [text]
 
     def join_ideogramms(idg_list:list[str])->str:
+        buffer = []
+        buffer_len = 0
         try:
-            buffer = ''
             prev_latin = False
             prev_nonlatin = False
             for token in idg_list:
-                cur_starts_latin = bool(re.match(r'[A-Za-z0-9]', token))
-                cur_starts_nonlatin = bool(re.match(r'[^\x00-\x7F]', token))
+                first = token[:1]
+                cur_starts_latin = first.isascii() and first.isalnum()
+                cur_starts_nonlatin = first > '\x7f'
                 if buffer:
                     if (prev_latin and (cur_starts_latin or cur_starts_nonlatin)) or (prev_nonlatin and cur_starts_latin):
-                        buffer += ' '
-                    elif len(buffer) + len(token) > max_chars:
-                        yield buffer
-                        buffer = ''
-                buffer += token
-                prev_latin = bool(re.search(r'[A-Za-z0-9]$', token))
-                prev_nonlatin = bool(re.search(r'[^\x00-\x7F]$', token))
+                        buffer.append(' ')
+                        buffer_len += 1
+                    elif buffer_len + len(token) > max_chars:
+                        yield ''.join(buffer)
+                        buffer = []
+                        buffer_len = 0
+                buffer.append(token)
+                buffer_len += len(token)
+                prev_latin = bool(sentence_re['latin_end'].search(token))
+                prev_nonlatin = bool(sentence_re['non_ascii_end'].search(token))
             if buffer:
-                yield buffer
+                yield ''.join(buffer)
         except Exception as e:
             DependencyError(e)
             if buffer:
-                yield buffer
+                yield ''.join(buffer)
 
     try:
         session = context.get_session(session_id)
@@ -1267,6 +1856,8 @@ def get_sentences(text:str, session_id:str)->list|None:
 
         lang, tts_engine = session['language'], session['tts_engine']
         max_chars = int(language_mapping[lang]['max_chars'] / 2)
+        sentence_re = get_sentence_regexes()
+        escaped_re = sentence_re['escaped']
 
         # escape all SML tags to not be touched by any text treatment
         text, sml_blocks = escape_sml(text)
@@ -1274,30 +1865,19 @@ def get_sentences(text:str, session_id:str)->list|None:
         assert not SML_TAG_PATTERN.search(text)
 
         # PASS 1 — hard punctuation
-        hard_pattern = re.compile(
-            rf"(.*?(?:{'|'.join(map(re.escape, punctuation_split_hard_set))}))(?=\s|$)",
-            re.DOTALL
-        )
-        hard_list = split_inclusive(text, hard_pattern)
+        hard_list = split_inclusive(text, sentence_re['hard'])
         if not hard_list:
             hard_list = [text.strip()]
-        hard_list = [s.strip() for s in hard_list if s.strip()]
+        hard_list = [s for s in hard_list if s]
 
-        # PASS 2 — soft punctuation
-        soft_pattern = re.compile(
-            rf"(.*?(?:{'|'.join(map(re.escape, punctuation_split_soft_set))}))(?=\s|$)",
-            re.DOTALL
-        )
+        # PASS 2 — soft punctuation, rows carry their clean length from here on
         soft_list = []
         i = 0
         n = len(hard_list)
         while i < n:
-            s = hard_list[i].strip()
-            if not s:
-                i += 1
-                continue
+            s = hard_list[i]
             if i + 1 < n:
-                next_s = hard_list[i + 1].strip()
+                next_s = hard_list[i + 1]
                 next_clean = strip_escaped_sml(next_s)
                 if next_clean and sum(c.isalnum() for c in next_clean) < 3:
                     s = f"{s} {next_s}"
@@ -1306,88 +1886,72 @@ def get_sentences(text:str, session_id:str)->list|None:
                     i += 1
             else:
                 i += 1
-            if len(strip_escaped_sml(s)) <= max_chars:
-                soft_list.append(s)
+            s_len = clean_len(s)
+            if s_len <= max_chars:
+                soft_list.append((s, s_len))
                 continue
-            parts = split_inclusive(s, soft_pattern)
-            if parts:
-                valid = False
-                for p in parts:
-                    if len(strip_escaped_sml(p.strip())) <= max_chars:
-                        valid = True
-                        break
-                if valid:
-                    soft_list.extend([p.strip() for p in parts if p.strip()])
-                else:
-                    soft_list.append(s)
+            parts = [(p, clean_len(p)) for p in split_inclusive(s, sentence_re['soft']) if p]
+            if parts and any(p_len <= max_chars for _, p_len in parts):
+                soft_list.extend(parts)
             else:
-                soft_list.append(s)
+                soft_list.append((s, s_len))
 
-        # PASS 3 — space split (last resort)
+        # PASS 3 — space split (last resort), walks offsets instead of re-slicing the rest
         last_list = []
-        for s in soft_list:
-            s = s.strip()
-            if not s:
-                continue
-            rest = s
-            while rest:
-                current_len = len(strip_escaped_sml(rest))   # ← rename variable
-                if current_len <= max_chars:
-                    last_list.append(rest.strip())
+        for s, rest_len in soft_list:
+            pos = 0
+            end = len(s)
+            while pos < end:
+                if rest_len <= max_chars:
+                    last_list.append((s[pos:], rest_len))
                     break
-                cut = rest[:max_chars + 1]
-                idx = cut.rfind(' ')
+                idx = s.rfind(' ', pos, pos + max_chars + 1) - pos
                 if idx > 0:
-                    left = rest[:idx].strip()
-                    right = rest[idx + 1:].strip()
+                    left = s[pos:pos + idx].strip()
+                    right = pos + idx + 1
                 else:
-                    left = rest[:max_chars].strip()
-                    right = rest[max_chars:].strip()
-                if not left or right == rest:
-                    last_list.append(rest.strip())
+                    left = s[pos:pos + max_chars].strip()
+                    right = pos + max_chars
+                while right < end and s[right].isspace():
+                    right += 1
+                if not left or right == pos:
+                    last_list.append((s[pos:], rest_len))
                     break
-                last_list.append(left)
-                rest = right
+                last_list.append((left, clean_len(left)))
+                rest_len -= clean_len(s[pos:right])
+                pos = right
 
         # PASS 4 — merge very short rows
         final_list = []
+        final_lens = []
         merge_max_chars = int((max_chars / 2) / 3)
         i = 0
         n = len(last_list)
         while i < n:
-            cur = last_list[i].strip()
-            if not cur:
-                i += 1
-                continue
-            if i == 0:
+            cur, cur_len = last_list[i]
+            if i == 0 or cur_len > merge_max_chars:
                 final_list.append(cur)
+                final_lens.append(cur_len)
                 i += 1
                 continue
-            cur_len = clean_len(cur)
-            if cur_len <= merge_max_chars:
-                j = i + 1
-                while j < n:
-                    nxt = last_list[j].strip()
-                    if not nxt:
-                        j += 1
-                        continue
-                    if cur_len + clean_len(nxt) <= max_chars:
-                        cur = cur.rstrip() + ' ' + nxt.lstrip()
-                        cur_len = clean_len(cur)
-                        j += 1
-                        continue
-                    break
-                if final_list:
-                    prev = final_list[-1]
-                    if clean_len(prev) + cur_len <= max_chars:
-                        final_list[-1] = prev.rstrip() + ' ' + cur.lstrip()
-                        i = j
-                        continue
+            merged = [cur]
+            j = i + 1
+            while j < n:
+                nxt, nxt_len = last_list[j]
+                if cur_len + nxt_len <= max_chars:
+                    merged.append(nxt)
+                    cur_len += 1 + nxt_len
+                    j += 1
+                    continue
+                break
+            cur = ' '.join(merged)
+            if final_list and final_lens[-1] + cur_len <= max_chars:
+                final_list[-1] = f'{final_list[-1]} {cur}'
+                final_lens[-1] += 1 + cur_len
+            else:
                 final_list.append(cur)
-                i = j
-                continue
-            final_list.append(cur)
-            i += 1
+                final_lens.append(cur_len)
+            i = j
 
         if lang in ['zho', 'jpn', 'kor', 'tha', 'lao', 'mya', 'khm']:
             result = []
@@ -1451,66 +2015,369 @@ def get_num2words_compat(lang_iso1:str)->bool:
     except Exception as e:
         return False
 
-def set_formatted_number(text:str, lang:str, lang_iso1:str, is_num2words_compat:bool, max_single_value:int=999_999_999_999_999_999)->str:
-    # match up to 18 digits, optional “,…” groups (allowing spaces or NBSP after comma), optional decimal of up to 12 digits
-    # handle optional range with dash/en dash/em dash between numbers, and allow trailing punctuation
-    number_re = re.compile(
-        r'(?<!\w)'
-        r'(\d{1,18}(?:,\s*\d{1,18})*(?:\.\d{1,12})?)'      # first number
-        r'(?:\s*([-–—])\s*'                                # dash type
-        r'(\d{1,18}(?:,\s*\d{1,18})*(?:\.\d{1,12})?))?'    # optional second number
-        r'([^\w\s]*)',                                     # optional trailing punctuation
-        re.UNICODE
-    )
+class TextNormalizer:
+
+    _roman = {}
+    token_re = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+    word_re = re.compile(r"^\w+$")
+    max_cached_numbers = 65536
+
+    def __init__(self, lang:str, lang_iso1:str, tts_engine:str)->None:
+        self.lang = lang
+        self.lang_iso1 = lang_iso1
+        self.tts_engine = tts_engine
+        # normalize_text()
+        self.abbreviations = None
+        self.abbreviations_re = None
+        if lang in abbreviations_mapping:
+            mapping = abbreviations_mapping[lang]
+            # first key of the mapping wins on case insensitive duplicates
+            self.abbreviations = {}
+            for k, expansion in mapping.items():
+                self.abbreviations.setdefault(k.lower(), expansion)
+            # Sort keys by descending length so longer ones match first
+            keys = sorted(mapping.keys(), key=len, reverse=True)
+            # Build a regex that only matches whole “words” (tokens) exactly
+            self.abbreviations_re = re.compile(
+                r'(?<!\w)(' + '|'.join(re.escape(k) for k in keys) + r')(?!\w)',
+                flags=re.IGNORECASE
+            )
+        self.acronym_re = re.compile(r'\b(?:[a-zA-Z]\.){1,}[a-zA-Z]?\b\.?')
+        self.multi_newlines_re = re.compile(r'(?:\r\n|\r|\n){2,}')
+        self.newline_re = re.compile(r'\r\n|\r|\n')
+        self.punctuation_switch_re = re.compile(f"[{''.join(map(re.escape, punctuation_switch.keys()))}]")
+        self.chars_remove_table = str.maketrans({ch: ' ' for ch in chars_remove})
+        self.quote_spaces_re = re.compile(r'\s*"\s*')
+        self.quote_glued_re = re.compile(r'(?<=[\p{L}\p{N}])"(?=[\p{L}\p{N}]|$)')
+        self.spaces_re = re.compile(r'\s+')
+        self.ok_re = re.compile(r'\bok\b', flags=re.IGNORECASE)
+        self.punctuation_hard_re = re.compile(rf"(\s*({'|'.join(map(re.escape, punctuation_split_hard_set))})\s*)+")
+        self.punctuation_soft_re = re.compile(rf"(\s*({'|'.join(map(re.escape, punctuation_split_soft_set))})\s*)+")
+        self.letter_digit_re = re.compile(r'(?<=[\p{L}])(?=\d)|(?<=\d)(?=[\p{L}])')
+        specialchars = specialchars_mapping.get(lang, specialchars_mapping.get(default_language_code, specialchars_mapping['eng']))
+        self.specialchars_table = {ord(char): f" {word} " for char, word in specialchars.items()}
+        # math2words()
+        self.digit_paren_re = re.compile(r'(\d)\)')
+        # Matches any digits + optional space/NBSP + st/nd/rd/th, not glued into words.
+        self.math_ordinal_re = re.compile(r'(?<!\w)(\d+)(?:\s|\u00A0)*(?:st|nd|rd|th)(?!\w)')
+        ambiguous_symbols = {"-", "/", "*", "x"}
+        self.phoneme_map = language_math_phonemes.get(lang, language_math_phonemes.get(default_language_code, language_math_phonemes['eng']))
+        phonemes_list = language_math_phonemes.get(lang, language_math_phonemes[default_language_code])
+        replacements = {k: v for k, v in phonemes_list.items() if not k.isdigit() and k not in [',', '.']}
+        self.normal_replacements = {k: v for k, v in replacements.items() if k not in ambiguous_symbols}
+        self.ambiguous_replacements = {k: v for k, v in replacements.items() if k in ambiguous_symbols}
+        self.symbols_re = None
+        if self.normal_replacements:
+            self.symbols_re = re.compile(r'(' + '|'.join(map(re.escape, self.normal_replacements.keys())) + r')')
+        self.ambiguous_re = re.compile(
+            r'(?<!\S)'                   # no non-space before
+            r'(\d+)\s*([-/*x])\s*(\d+)'  # num SYMBOL num
+            r'(?!\S)'                    # no non-space after
+            r'|'                         # or
+            r'(?<!\S)([-/*x])\s*(\d+)(?!\S)'  # SYMBOL num
+        )
+        # set_formatted_number()
+        # match up to 18 digits, optional “,…” groups (allowing spaces or NBSP after comma), optional decimal of up to 12 digits
+        # handle optional range with dash/en dash/em dash between numbers, and allow trailing punctuation
+        self.number_re = re.compile(
+            r'(?<!\w)'
+            r'(\d{1,18}(?:,\s*\d{1,18})*(?:\.\d{1,12})?)'      # first number
+            r'(?:\s*([-–—])\s*'                                # dash type
+            r'(\d{1,18}(?:,\s*\d{1,18})*(?:\.\d{1,12})?))?'    # optional second number
+            r'([^\w\s]*)',                                     # optional trailing punctuation
+            re.UNICODE
+        )
+        # clock2words()
+        self.time_re = re.compile(r'\b([01]?\d|2[0-3]):([0-5]\d)(?::([0-5]\d))?\b')
+        self.language_clock = language_clock.get(lang)
+        self.n2w_cache = {}
+        self.number_cache = {}
+
+    @classmethod
+    def _roman_patterns(cls)->dict:
+        if not cls._roman:
+            chapter_words = sorted(
+                {w for words in chapter_word_mapping.values() for w in words},
+                key=len,
+                reverse=True
+            )
+            cls._roman.update({
+                "valid": re.compile(
+                    r'^(?=.)M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$',
+                    re.IGNORECASE
+                ),
+                "chapter_words": re.compile(
+                    rf'\b({"|".join(map(re.escape, chapter_words))})\s+([IVXLCDM]+)\b',
+                    re.IGNORECASE | re.UNICODE
+                ),
+                "heading": re.compile(r'^(?:\s*)([IVXLCDM]+)([.-])(\s+)', flags=re.MULTILINE),
+                "standalone": re.compile(r'^(?:\s*)([IVXLCDM]+)([.-])(?:\s*)$', flags=re.MULTILINE),
+                "word": re.compile(r'(?<!\S)([IVXLCDM]{2,})(?!\S)')
+            })
+        return cls._roman
+
+    def normalize_text(self, text:str)->str:
+
+        def replace(match:re.Match)->str:
+            token = match.group(1)
+            return self.abbreviations.get(token.lower(), token)
+
+        if self.abbreviations_re is not None:
+            text = self.abbreviations_re.sub(replace, text)
+        # uppercase acronyms like a., c.i.a., f.d.a., m.c., etc…
+        text = self.acronym_re.sub(lambda m: m.group().replace('.', '').upper(), text)
+        # romanize foreign words
+        if language_mapping[self.lang]['script'] == 'latin':
+            text = foreign2latin(text, self.lang)
+        # Replace multiple newlines ("\n\n", "\r\r", "\n\r", etc.) with a [pause] 1.4sec
+        text = self.multi_newlines_re.sub(f" {sml_token('pause')} ", text)
+        # Replace single newlines ("\n" or "\r") with spaces
+        text = self.newline_re.sub(' ', text)
+        # Replace punctuations causing hallucinations
+        text = self.punctuation_switch_re.sub(lambda match: punctuation_switch.get(match.group(), match.group()), text)
+        # remove unwanted chars
+        text = text.translate(self.chars_remove_table)
+        # replace double quotes by a comma if no punctuation precedes it
+        text = self.quote_spaces_re.sub('"', text)
+        text = self.quote_glued_re.sub(', ', text)
+        text = text.replace('"', '')
+        # Replace multiple and spaces with single space
+        text = self.spaces_re.sub(' ', text)
+        # Replace ok by 'Owkey'
+        text = self.ok_re.sub('Okay', text)
+        # Reduce multiple consecutive punctuations hard
+        text = self.punctuation_hard_re.sub(r'\2 ', text).strip()
+        # Reduce multiple consecutive punctuations soft
+        text = self.punctuation_soft_re.sub(r'\2 ', text).strip()
+        # Pattern 1: Add a space between UTF-8 characters and numbers
+        text = self.letter_digit_re.sub(' ', text)
+        # Replace special chars with words
+        text = text.translate(self.specialchars_table)
+        text = ' '.join(text.split())
+        return text
+
+    def set_formatted_number(self, text:str, is_num2words_compat:bool, max_single_value:int=999_999_999_999_999_999)->str:
+
+        def normalize_commas(num_str:str)->str:
+            # ormalize number string to standard comma format: 1,234,567
+            tok = num_str.replace('\u00A0', '').replace(' ', '')
+            if '.' in tok:
+                integer_part, decimal_part = tok.split('.', 1)
+                integer_part = integer_part.replace(',', '')
+                integer_part = "{:,}".format(int(integer_part))
+                return f'{integer_part}.{decimal_part}'
+            else:
+                integer_part = tok.replace(',', '')
+                return "{:,}".format(int(integer_part))
+
+        def clean_single_num(num_str:str)->str:
+            tok = unicodedata.normalize('NFKC', num_str)
+            if tok.lower() in ('inf', 'infinity', 'nan'):
+                return tok
+            clean = tok.replace(',', '').replace('\u00A0', '').replace(' ', '')
+            try:
+                num = float(clean) if '.' in clean else int(clean)
+            except (ValueError, OverflowError):
+                return tok
+            if not math.isfinite(num) or abs(num) > max_single_value:
+                return tok
+
+            # Normalize commas before final output
+            tok = normalize_commas(tok)
+
+            key = (clean, is_num2words_compat)
+            word = self.number_cache.get(key)
+            if word is None:
+                if is_num2words_compat:
+                    word = num2words(num, lang=self.lang_iso1.replace('zh', 'zh_CN'))
+                else:
+                    word = ' '.join(self.phoneme_map.get(ch, ch) for ch in str(num))
+                if len(self.number_cache) >= self.max_cached_numbers:
+                    self.number_cache.clear()
+                self.number_cache[key] = word
+            return word
 
-    def normalize_commas(num_str:str)->str:
-        # ormalize number string to standard comma format: 1,234,567
-        tok = num_str.replace('\u00A0', '').replace(' ', '')
-        if '.' in tok:
-            integer_part, decimal_part = tok.split('.', 1)
-            integer_part = integer_part.replace(',', '')
-            integer_part = "{:,}".format(int(integer_part))
-            return f'{integer_part}.{decimal_part}'
-        else:
-            integer_part = tok.replace(',', '')
-            return "{:,}".format(int(integer_part))
-
-    def clean_single_num(num_str:str)->str:
-        tok = unicodedata.normalize('NFKC', num_str)
-        if tok.lower() in ('inf', 'infinity', 'nan'):
-            return tok
-        clean = tok.replace(',', '').replace('\u00A0', '').replace(' ', '')
-        try:
-            num = float(clean) if '.' in clean else int(clean)
-        except (ValueError, OverflowError):
-            return tok
-        if not math.isfinite(num) or abs(num) > max_single_value:
-            return tok
+        def clean_match(match:re.Match)->str:
+            first_num = clean_single_num(match.group(1))
+            dash_char = match.group(2) or ''
+            second_num = clean_single_num(match.group(3)) if match.group(3) else ''
+            trailing = match.group(4) or ''
+            if second_num:
+                return f'{first_num}{dash_char}{second_num}{trailing}'
+            else:
+                return f'{first_num}{trailing}'
 
-        # Normalize commas before final output
-        tok = normalize_commas(tok)
+        return self.number_re.sub(clean_match, text)
 
-        if is_num2words_compat:
-            new_lang_iso1 = lang_iso1.replace('zh', 'zh_CN')
-            return num2words(num, lang=new_lang_iso1)
-        else:
-            phoneme_map = language_math_phonemes.get(
-                lang,
-                language_math_phonemes.get(default_language_code, language_math_phonemes['eng'])
-            )
-            return ' '.join(phoneme_map.get(ch, ch) for ch in str(num))
-
-    def clean_match(match:re.Match)->str:
-        first_num = clean_single_num(match.group(1))
-        dash_char = match.group(2) or ''
-        second_num = clean_single_num(match.group(3)) if match.group(3) else ''
-        trailing = match.group(4) or ''
-        if second_num:
-            return f'{first_num}{dash_char}{second_num}{trailing}'
-        else:
-            return f'{first_num}{trailing}'
+    def clock2words(self, text:str, is_num2words_compat:bool)->str:
 
-    return number_re.sub(clean_match, text)
+        def n2w(n:int)->str:
+            key = (n, is_num2words_compat)
+            if key in self.n2w_cache:
+                return self.n2w_cache[key]
+            if is_num2words_compat:
+                word = num2words(n, lang=self.lang_iso1)
+            else:
+                word = self.math2words(str(n), is_num2words_compat)
+            if not isinstance(word, str):
+                word = str(word)
+            self.n2w_cache[key] = word
+            return word
+
+        def repl_num(m:re.Match)->str:
+            # Reject enumeration patterns like "(1.2)"
+            start, end = m.start(), m.end()
+            if (
+                start > 0 and end < len(text)
+                and text[start - 1] == '('
+                and text[end] == ')'
+            ):
+                return m.group(0)
+            # Parse hh[:mm[:ss]]
+            try:
+                h = int(m.group(1))
+                mnt = int(m.group(2))
+                sec = m.group(3)
+                sec = int(sec) if sec is not None else None
+            except Exception:
+                return m.group(0)
+            # basic validation; if out of range, keep original
+            if not (0 <= h <= 23 and 0 <= mnt <= 59 and (sec is None or 0 <= sec <= 59)):
+                return m.group(0)
+            # If no language clock rules, just say numbers plainly
+            if not lc:
+                parts = [n2w(h)]
+                if mnt != 0:
+                    parts.append(n2w(mnt))
+                if sec is not None and sec > 0:
+                    parts.append(n2w(sec))
+                return ' '.join(parts)
+            next_hour = (h + 1) % 24
+            special_hours = lc.get('special_hours', {})
+            if mnt == 0 and (sec is None or sec == 0):
+                if h in special_hours:
+                    phrase = special_hours[h]
+                else:
+                    phrase = lc['oclock'].format(hour=n2w(h))
+            elif mnt == 15:
+                phrase = lc['quarter_past'].format(hour=n2w(h))
+            elif mnt == 30:
+                if self.lang == 'deu':
+                    phrase = lc['half_past'].format(next_hour=n2w(next_hour))
+                else:
+                    phrase = lc['half_past'].format(hour=n2w(h))
+            elif mnt == 45:
+                phrase = lc['quarter_to'].format(next_hour=n2w(next_hour))
+            elif mnt < 30:
+                phrase = lc['past'].format(hour=n2w(h), minute=n2w(mnt)) if mnt != 0 else lc['oclock'].format(hour=n2w(h))
+            else:
+                minute_to_hour = 60 - mnt
+                phrase = lc['to'].format(
+                    next_hour=n2w(next_hour),
+                    minute=n2w(minute_to_hour),
+                    minute_to_hour=n2w(minute_to_hour)
+                )
+            if sec is not None and sec > 0:
+                second_phrase = lc['second'].format(second=n2w(sec))
+                phrase = lc['full'].format(phrase=phrase, second_phrase=second_phrase)
+            return phrase
+
+        lc = self.language_clock
+        return self.time_re.sub(repl_num, text)
+
+    def math2words(self, text:str, is_num2words_compat:bool)->str:
+
+        def repl_ambiguous(match:re.Match)->str:
+            # handles "num SYMBOL num" and "SYMBOL num"
+            if match.group(2) and match.group(2) in self.ambiguous_replacements:
+                return f'{match.group(1)} {self.ambiguous_replacements[match.group(2)]} {match.group(3)}'
+            if match.group(3) and match.group(3) in self.ambiguous_replacements:
+                return f'{self.ambiguous_replacements[match.group(3)]} {match.group(4)}'
+            return match.group(0)
+
+        def _ordinal_to_words(m:re.Match)->str:
+            n = int(m.group(1))
+            if is_num2words_compat:
+                try:
+                    return num2words(n, to='ordinal', lang=(self.lang_iso1 or 'en'))
+                except Exception:
+                    pass
+            # If num2words isn't available/compatible, keep original token as-is.
+            return m.group(0)
+
+        text = self.digit_paren_re.sub(r'\1 : ', text)
+        text = self.math_ordinal_re.sub(_ordinal_to_words, text)
+        # Replace unambiguous symbols everywhere
+        if self.symbols_re is not None:
+            text = self.symbols_re.sub(lambda m: f' {self.normal_replacements[m.group(1)]} ', text)
+        # Replace ambiguous symbols only in valid equation contexts
+        if self.ambiguous_replacements:
+            text = self.ambiguous_re.sub(repl_ambiguous, text)
+        text = self.set_formatted_number(text, is_num2words_compat)
+        return text
+
+    @classmethod
+    def roman2number(cls, text:str)->str:
+
+        def is_valid_roman(s: str)->bool:
+            return bool(patterns['valid'].fullmatch(s))
+
+        def to_int(s: str)->str:
+            s = s.upper()
+            i = 0
+            result = 0
+            while i < len(s):
+                for roman, value in roman_numbers_tuples:
+                    if s[i:i + len(roman)] == roman:
+                        result += value
+                        i += len(roman)
+                        break
+                else:
+                    return s
+            return str(result)
+
+        def repl_heading(m: re.Match)->str:
+            roman = m.group(1)
+            if not is_valid_roman(roman):
+                return m.group(0)
+            return f"{to_int(roman)}{m.group(2)}{m.group(3)}"
+
+        def repl_standalone(m: re.Match)->str:
+            roman = m.group(1)
+            if not is_valid_roman(roman):
+                return m.group(0)
+            return f"{to_int(roman)}{m.group(2)}"
+
+        def repl_word(m: re.Match)->str:
+            roman = m.group(1)
+            if not is_valid_roman(roman):
+                return m.group(0)
+            return to_int(roman)
+
+        def repl_chapter_single(m: re.Match)->str:
+            word = m.group(1)
+            roman = m.group(2)
+            if not is_valid_roman(roman):
+                return m.group(0)
+            return f"{word} {to_int(roman)}"
+
+        patterns = cls._roman_patterns()
+        text = patterns['heading'].sub(repl_heading, text)
+        text = patterns['standalone'].sub(repl_standalone, text)
+        text = patterns['chapter_words'].sub(repl_chapter_single, text)
+        text = patterns['word'].sub(repl_word, text)
+        return text
+
+def get_text_normalizer(lang:str, lang_iso1:str, tts_engine:str)->TextNormalizer:
+    key = (lang, lang_iso1, tts_engine)
+    normalizer = _text_normalizers.get(key)
+    if normalizer is None:
+        normalizer = TextNormalizer(lang, lang_iso1, tts_engine)
+        _text_normalizers[key] = normalizer
+    return normalizer
+
+def set_formatted_number(text:str, lang:str, lang_iso1:str, is_num2words_compat:bool, max_single_value:int=999_999_999_999_999_999)->str:
+    return get_text_normalizer(lang, lang_iso1, None).set_formatted_number(text, is_num2words_compat, max_single_value)
 
 def year2words(year_str:str, lang:str, lang_iso1:str, is_num2words_compat:bool)->str|bool:
     try:
@@ -1534,210 +2401,14 @@ def year2words(year_str:str, lang:str, lang_iso1:str, is_num2words_compat:bool)-
         return False
 
 def clock2words(text:str, lang:str, lang_iso1:str, tts_engine:str, is_num2words_compat:bool)->str:
-
-    def n2w(n:int)->str:
-        key = (n, lang, is_num2words_compat)
-        if key in _n2w_cache:
-            return _n2w_cache[key]
-        if is_num2words_compat:
-            word = num2words(n, lang=lang_iso1)
-        else:
-            word = math2words(n, lang, lang_iso1, tts_engine, is_num2words_compat)
-        if not isinstance(word, str):
-            word = str(word)
-        _n2w_cache[key] = word
-        return word
-
-    def repl_num(m:re.Match)->str:
-        # Reject enumeration patterns like "(1.2)"
-        start, end = m.start(), m.end()
-        if (
-            start > 0 and end < len(text)
-            and text[start - 1] == '('
-            and text[end] == ')'
-        ):
-            return m.group(0)
-        # Parse hh[:mm[:ss]]
-        try:
-            h = int(m.group(1))
-            mnt = int(m.group(2))
-            sec = m.group(3)
-            sec = int(sec) if sec is not None else None
-        except Exception:
-            return m.group(0)
-        # basic validation; if out of range, keep original
-        if not (0 <= h <= 23 and 0 <= mnt <= 59 and (sec is None or 0 <= sec <= 59)):
-            return m.group(0)
-        # If no language clock rules, just say numbers plainly
-        if not lc:
-            parts = [n2w(h)]
-            if mnt != 0:
-                parts.append(n2w(mnt))
-            if sec is not None and sec > 0:
-                parts.append(n2w(sec))
-            return ' '.join(parts)
-        next_hour = (h + 1) % 24
-        special_hours = lc.get('special_hours', {})
-        if mnt == 0 and (sec is None or sec == 0):
-            if h in special_hours:
-                phrase = special_hours[h]
-            else:
-                phrase = lc['oclock'].format(hour=n2w(h))
-        elif mnt == 15:
-            phrase = lc['quarter_past'].format(hour=n2w(h))
-        elif mnt == 30:
-            if lang == 'deu':
-                phrase = lc['half_past'].format(next_hour=n2w(next_hour))
-            else:
-                phrase = lc['half_past'].format(hour=n2w(h))
-        elif mnt == 45:
-            phrase = lc['quarter_to'].format(next_hour=n2w(next_hour))
-        elif mnt < 30:
-            phrase = lc['past'].format(hour=n2w(h), minute=n2w(mnt)) if mnt != 0 else lc['oclock'].format(hour=n2w(h))
-        else:
-            minute_to_hour = 60 - mnt
-            phrase = lc['to'].format(
-                next_hour=n2w(next_hour),
-                minute=n2w(minute_to_hour),
-                minute_to_hour=n2w(minute_to_hour)
-            )
-        if sec is not None and sec > 0:
-            second_phrase = lc['second'].format(second=n2w(sec))
-            phrase = lc['full'].format(phrase=phrase, second_phrase=second_phrase)
-        return phrase
-
-    time_rx = re.compile(
-        r'\b([01]?\d|2[0-3]):([0-5]\d)(?::([0-5]\d))?\b'
-    )
-    lc = language_clock.get(lang) if 'language_clock' in globals() else None
-    _n2w_cache = {}
-    return time_rx.sub(repl_num, text)
+    return get_text_normalizer(lang, lang_iso1, tts_engine).clock2words(text, is_num2words_compat)
 
 def math2words(text:str, lang:str, lang_iso1:str, tts_engine:str, is_num2words_compat:bool)->str:
+    return get_text_normalizer(lang, lang_iso1, tts_engine).math2words(text, is_num2words_compat)
 
-    def repl_ambiguous(match:re.Match)->str:
-        # handles "num SYMBOL num" and "SYMBOL num"
-        if match.group(2) and match.group(2) in ambiguous_replacements:
-            return f'{match.group(1)} {ambiguous_replacements[match.group(2)]} {match.group(3)}'
-        if match.group(3) and match.group(3) in ambiguous_replacements:
-            return f'{ambiguous_replacements[match.group(3)]} {match.group(4)}'
-        return match.group(0)
-
-    def _ordinal_to_words(m:re.Match)->str:
-        n = int(m.group(1))
-        if is_num2words_compat:
-            try:
-                from num2words import num2words
-                return num2words(n, to='ordinal', lang=(lang_iso1 or 'en'))
-            except Exception:
-                pass
-        # If num2words isn't available/compatible, keep original token as-is.
-        return m.group(0)
-
-    # Matches any digits + optional space/NBSP + st/nd/rd/th, not glued into words.
-    re_ordinal = re.compile(r'(?<!\w)(\d+)(?:\s|\u00A0)*(?:st|nd|rd|th)(?!\w)')
-    text = re.sub(r'(\d)\)', r'\1 : ', text)
-    text = re_ordinal.sub(_ordinal_to_words, text)
-    # Symbol phonemes
-    ambiguous_symbols = {"-", "/", "*", "x"}
-    phonemes_list = language_math_phonemes.get(lang, language_math_phonemes[default_language_code])
-    replacements = {k: v for k, v in phonemes_list.items() if not k.isdigit() and k not in [',', '.']}
-    normal_replacements  = {k: v for k, v in replacements.items() if k not in ambiguous_symbols}
-    ambiguous_replacements = {k: v for k, v in replacements.items() if k in ambiguous_symbols}
-    # Replace unambiguous symbols everywhere
-    if normal_replacements:
-        sym_pat = r'(' + '|'.join(map(re.escape, normal_replacements.keys())) + r')'
-        text = re.sub(sym_pat, lambda m: f' {normal_replacements[m.group(1)]} ', text)
-    # Replace ambiguous symbols only in valid equation contexts
-    if ambiguous_replacements:
-        ambiguous_pattern = (
-            r'(?<!\S)'                   # no non-space before
-            r'(\d+)\s*([-/*x])\s*(\d+)'  # num SYMBOL num
-            r'(?!\S)'                    # no non-space after
-            r'|'                         # or
-            r'(?<!\S)([-/*x])\s*(\d+)(?!\S)'  # SYMBOL num
-        )
-        text = re.sub(ambiguous_pattern, repl_ambiguous, text)
-    text = set_formatted_number(text, lang, lang_iso1, is_num2words_compat)
-    return text
-
-def roman2number(text: str)->str:
-
-    def is_valid_roman(s: str)->bool:
-        return bool(valid_roman.fullmatch(s))
-
-    def to_int(s: str)->str:
-        s = s.upper()
-        i = 0
-        result = 0
-        while i < len(s):
-            for roman, value in roman_numbers_tuples:
-                if s[i:i + len(roman)] == roman:
-                    result += value
-                    i += len(roman)
-                    break
-            else:
-                return s
-        return str(result)
-
-    def repl_heading(m: re.Match)->str:
-        roman = m.group(1)
-        if not is_valid_roman(roman):
-            return m.group(0)
-        return f"{to_int(roman)}{m.group(2)}{m.group(3)}"
-
-    def repl_standalone(m: re.Match)->str:
-        roman = m.group(1)
-        if not is_valid_roman(roman):
-            return m.group(0)
-        return f"{to_int(roman)}{m.group(2)}"
-
-    def repl_word(m: re.Match)->str:
-        roman = m.group(1)
-        if not is_valid_roman(roman):
-            return m.group(0)
-        return to_int(roman)
-
-    def repl_chapter_single(m: re.Match)->str:
-        word = m.group(1)
-        roman = m.group(2)
-        if not is_valid_roman(roman):
-            return m.group(0)
-        return f"{word} {to_int(roman)}"
+def roman2number(text:str)->str:
+    return TextNormalizer.roman2number(text)
 
-    valid_roman = re.compile(
-        r'^(?=.)M{0,3}(CM|CD|D?C{0,3})(XC|XL|L?X{0,3})(IX|IV|V?I{0,3})$',
-        re.IGNORECASE
-    )
-    chapter_words = sorted(
-        {w for words in chapter_word_mapping.values() for w in words},
-        key=len,
-        reverse=True
-    )
-    chapter_words_re = re.compile(
-        rf'\b({"|".join(map(re.escape, chapter_words))})\s+([IVXLCDM]+)\b',
-        re.IGNORECASE | re.UNICODE
-    )
-    text = re.sub(
-        r'^(?:\s*)([IVXLCDM]+)([.-])(\s+)',
-        repl_heading,
-        text,
-        flags=re.MULTILINE
-    )
-    text = re.sub(
-        r'^(?:\s*)([IVXLCDM]+)([.-])(?:\s*)$',
-        repl_standalone,
-        text,
-        flags=re.MULTILINE
-    )
-    text = chapter_words_re.sub(repl_chapter_single, text)
-    text = re.sub(
-        r'(?<!\S)([IVXLCDM]{2,})(?!\S)',
-        repl_word,
-        text
-    )
-    return text
-    
 def is_latin(s:str)->bool:
     return all((u'a' <= ch.lower() <= 'z') or ch.isdigit() or not ch.isalpha() for ch in s)
 
@@ -1793,24 +2464,22 @@ def foreign2latin(text:str, base_lang:str)->str:
         key: str = f'__TTS_MARKER_{i}__'
         protected[key] = m.group(0)
         text = text.replace(m.group(0), key)
-    tokens: list[str] = re.findall(r"\w+|[^\w\s]", text, re.UNICODE)
+    tokens: list[str] = TextNormalizer.token_re.findall(text)
     buf: list[str] = []
+    is_word: list[bool] = []
     for t in tokens:
-        if t in protected:
+        word = TextNormalizer.word_re.match(t) is not None
+        if t in protected or not word:
             buf.append(t)
-        elif re.match(r"^\w+$", t):
-            buf.append(romanize(t))
         else:
-            buf.append(t)
-    out: str = ''
+            buf.append(romanize(t))
+        is_word.append(word and TextNormalizer.word_re.match(buf[-1]) is not None)
+    parts: list[str] = []
     for i, t in enumerate(buf):
-        if i == 0:
-            out += t
-        else:
-            if re.match(r"^\w+$", buf[i - 1]) and re.match(r"^\w+$", t):
-                out += ' ' + t
-            else:
-                out += t
+        if i > 0 and is_word[i - 1] and is_word[i]:
+            parts.append(' ')
+        parts.append(t)
+    out: str = ''.join(parts)
     for k, v in protected.items():
         out = out.replace(k, v)
     return out
@@ -1878,133 +2547,132 @@ def sml_token(tag:str, value:str|None=None, close:bool=False)->str:
     return f"[{tag}]"
 
 def normalize_text(text:str, lang:str, lang_iso1:str, tts_engine:str)->str:
+    return get_text_normalizer(lang, lang_iso1, tts_engine).normalize_text(text)
 
-    def replace(match:re.Match)->str:
-        token = match.group(1)
-        for k, expansion in mapping.items():
-            if token.lower() == k.lower():
-                return expansion
-        return token  # fallback
-            
-    # Remove emojis
-    emoji_pattern = re.compile(f"[{''.join(emojis_list)}]+", flags=re.UNICODE)
-    emoji_pattern.sub('', text)
-    if lang in abbreviations_mapping:
-        mapping = abbreviations_mapping[lang]
-        # Sort keys by descending length so longer ones match first
-        keys = sorted(mapping.keys(), key=len, reverse=True)
-        # Build a regex that only matches whole “words” (tokens) exactly
-        pattern = re.compile(
-            r'(?<!\w)(' + '|'.join(re.escape(k) for k in keys) + r')(?!\w)',
-            flags=re.IGNORECASE
-        )
-        text = pattern.sub(replace, text)
-    # This regex matches sequences like a., c.i.a., f.d.a., m.c., etc…
-    pattern = re.compile(r'\b(?:[a-zA-Z]\.){1,}[a-zA-Z]?\b\.?')
-    # uppercase acronyms
-    text = re.sub(r'\b(?:[a-zA-Z]\.){1,}[a-zA-Z]?\b\.?', lambda m: m.group().replace('.', '').upper(), text)
-    # romanize foreign words
-    if language_mapping[lang]['script'] == 'latin':
-        text = foreign2latin(text, lang)
-    # Replace multiple newlines ("\n\n", "\r\r", "\n\r", etc.) with a [pause] 1.4sec
-    pattern = r'(?:\r\n|\r|\n){2,}'
-    text = re.sub(pattern, f" {sml_token('pause')} ", text)
-    # Replace single newlines ("\n" or "\r") with spaces
-    text = re.sub(r'\r\n|\r|\n', ' ', text)
-    # Replace punctuations causing hallucinations
-    pattern = f"[{''.join(map(re.escape, punctuation_switch.keys()))}]"
-    text = re.sub(pattern, lambda match: punctuation_switch.get(match.group(), match.group()), text)
-    # remove unwanted chars
-    chars_remove_table = str.maketrans({ch: ' ' for ch in chars_remove})
-    text = text.translate(chars_remove_table)
-    # replace double quotes by a comma if no punctuation precedes it
-    text = re.sub(r'\s*"\s*', '"', text)
-    text = re.sub(r'(?<=[\p{L}\p{N}])"(?=[\p{L}\p{N}]|$)', ', ', text)
-    text = re.sub(r'"', '', text)
-    # Replace multiple and spaces with single space
-    text = re.sub(r'\s+', ' ', text)
-    # Replace ok by 'Owkey'
-    text = re.sub(r'\bok\b', 'Okay', text, flags=re.IGNORECASE)
-    # Escape special characters in the punctuation list for regex
-    pattern = '|'.join(map(re.escape, punctuation_split_hard_set))
-    # Reduce multiple consecutive punctuations hard
-    text = re.sub(rf'(\s*({pattern})\s*)+', r'\2 ', text).strip()
-    # Escape special characters in the punctuation list for regex
-    pattern = '|'.join(map(re.escape, punctuation_split_soft_set))
-    # Reduce multiple consecutive punctuations soft
-    text = re.sub(rf'(\s*({pattern})\s*)+', r'\2 ', text).strip()
-    # Pattern 1: Add a space between UTF-8 characters and numbers
-    text = re.sub(r'(?<=[\p{L}])(?=\d)|(?<=\d)(?=[\p{L}])', ' ', text)
-    # Replace special chars with words
-    specialchars = specialchars_mapping.get(lang, specialchars_mapping.get(default_language_code, specialchars_mapping['eng']))
-    specialchars_table = {ord(char): f" {word} " for char, word in specialchars.items()}
-    text = text.translate(specialchars_table)
-    text = ' '.join(text.split())
-    return text
-
-def convert_chapters2audio(session_id:str)->bool:
-    session = context.get_session(session_id)
+def convert_chapters2audio(session_id:str, chapters_stream:Generator[list[str], None, None]|None=None)->bool:
+    session = context.get_local_session(session_id)
     if session and session.get('id', False):
+        tts_manager = None
+        sentence_cache = None
+        chapters = None
+        final_sentences = []
         try:
-            tts_manager = TTSManager(session)
-            resume_chapter = 0
-            missing_chapters = []
-            final_sentences = []
-            chapter_re = re.compile(r'^(\d+)\.' + re.escape(default_audio_proc_format) + r'$')
-            existing_chapters = [f for f in os.listdir(session['chapters_dir']) if chapter_re.match(f)]
-            existing_numbers = sorted(int(chapter_re.match(f).group(1)) for f in existing_chapters)
+            # the audio manifest is the resume journal: a sentence is done once its line is there with the same text
+            manifest = AudioManifest(os.path.join(session['process_dir'], audio_manifest_file)).load()
+            stream = None
+            if session['output_stream']:
+                stream = ChapterStream(os.path.join(session['process_dir'], chapter_stream_dir)).load()
+                stream.finished = False
             if session['cancellation_requested']:
                 msg = 'Cancel requested'
                 print(msg)
                 return False
-            if existing_numbers:
-                expected = set(range(0, max(existing_numbers) + 1))
-                missing_chapters = sorted(expected - set(existing_numbers))
-                if not missing_chapters:
-                    missing_chapters = [max(existing_numbers) + 1]
-                resume_chapter = existing_numbers[-1]
-            resume_sentence = 0
-            missing_sentences = []
-            sentence_re = re.compile(r'^(\d+)\.' + re.escape(default_audio_proc_format) + r'$')
-            existing_sentences = [f for f in os.listdir(session['sentences_dir']) if sentence_re.match(f)]
-            existing_numbers = sorted(int(sentence_re.match(f).group(1)) for f in existing_sentences)
-            if existing_numbers:
-                expected = set(range(0, max(existing_numbers) + 1))
-                missing_sentences = sorted(expected - set(existing_numbers))
-                if not missing_sentences:
-                    missing_sentences = [max(existing_numbers) + 1]
-                resume_sentence = existing_numbers[-1]
-            total_chapters = len(session['chapters'])
-            if total_chapters == 0:
-                error = 'No chapterrs found!'
-                print(error)
+            legacy_sentences = 0
+            if not manifest.sentences:
+                # sentences converted before the journal existed are kept, except the last one which may be cut short
+                sentence_re = re.compile(r'^(\d+)\.' + re.escape(default_audio_proc_format) + r'$')
+                legacy_numbers = [int(m.group(1)) for m in map(sentence_re.match, os.listdir(session['sentences_dir'])) if m]
+                legacy_sentences = max(legacy_numbers) if legacy_numbers else 0
+
+            def is_sentence_done(idx:int, sentence:str)->bool:
+                sentence_file = os.path.join(session['sentences_dir'], f'{idx}.{default_audio_proc_format}')
+                if manifest.has_sentence(idx, sentence):
+                    return os.path.exists(sentence_file)
+                if idx < legacy_sentences and os.path.exists(sentence_file):
+                    return manifest.add_sentence_file(idx, sentence_file, sentence)
                 return False
-            total_iterations = sum(len(session['chapters'][x]) for x in range(total_chapters))
-            total_sentences = sum(sum(1 for row in chapter) for chapter in session['chapters'])
-            if total_sentences == 0:
-                error = 'No sentences found!'
-                print(error)
+
+            total_iterations = None
+            streamed_chapters = []
+            if chapters_stream is None:
+                if not session['chapters_file'] or not os.path.exists(session['chapters_file']):
+                    error = 'No chapterrs found!'
+                    print(error)
+                    return False
+                chapters = SentenceStore(session['chapters_file'])
+                total_chapters = len(chapters)
+                if total_chapters == 0:
+                    error = 'No chapterrs found!'
+                    print(error)
+                    return False
+                total_iterations = chapters.sentence_count
+                total_sentences = total_iterations
+                if total_sentences == 0:
+                    error = 'No sentences found!'
+                    print(error)
+                    return False
+                msg = f"--------------------------------------------------\nA total of {total_chapters} {'block' if total_chapters <= 1 else 'blocks'} and {total_sentences} {'sentence' if total_sentences <= 1 else 'sentences'}.\n--------------------------------------------------"
+                print(msg)
+                chapters_stream = iter(chapters)
+            else:
+                msg = 'Converting blocks while the ebook is still being parsed…'
+                print(msg)
+            batch_size = max(int(session.get(f"{session['tts_engine']}_batch_size") or 1), 1)
+            skip_sentences = set()
+            cache_keys = {}
+            if audio_cache_max_gb > 0:
+                sentence_cache = FileCache(os.path.join(cache_dir, 'sentences'), int(audio_cache_max_gb * 1024 ** 3), default_audio_proc_format)
+                cache_base = get_sentence_cache_base(session)
+
+            def restore_cached(idx:int, sentence:str)->bool:
+                if sentence_cache is None:
+                    return False
+                key = FileCache.make_key(cache_base, sentence)
+                sentence_file = os.path.join(session['sentences_dir'], f'{idx}.{default_audio_proc_format}')
+                if sentence_cache.fetch(key, sentence_file):
+                    # the manifest line is replayed from the cache, the file is only decoded for entries stored without it
+                    meta = sentence_cache.fetch_meta(key)
+                    if meta is not None:
+                        manifest.add_sentence(idx, meta['sample_count'], meta['samplerate'], sentence, meta['loudness'])
+                    else:
+                        manifest.add_sentence_file(idx, sentence_file, sentence)
+                    return True
+                cache_keys[idx] = key
                 return False
-            msg = f"--------------------------------------------------\nA total of {total_chapters} {'block' if total_chapters <= 1 else 'blocks'} and {total_sentences} {'sentence' if total_sentences <= 1 else 'sentences'}.\n--------------------------------------------------"
-            print(msg)
+
+            def store_cached(idx:int)->None:
+                key = cache_keys.pop(idx)
+                if not sentence_cache.store(key, os.path.join(session['sentences_dir'], f'{idx}.{default_audio_proc_format}')):
+                    return
+                entry = manifest.sentences.get(idx)
+                if entry is not None:
+                    loudness = manifest.loudness.get(idx)
+                    sentence_cache.store_meta(key, {"sample_count": entry[0], "samplerate": entry[1], "loudness": list(loudness) if loudness is not None else None})
+
+            if session['ebook'] and total_iterations is not None and int(session.get('workers') or 1) > 1:
+                pending_todo = []
+                for idx, sentence in get_pending_sentences(chapters, is_sentence_done):
+                    if restore_cached(idx, sentence):
+                        skip_sentences.add(idx)
+                    else:
+                        pending_todo.append((idx, sentence))
+                sharded_sentences = convert_sentences_sharded(session_id, pending_todo, batch_size)
+                if sharded_sentences is None:
+                    return False
+                skip_sentences |= sharded_sentences
+                # pick up what the workers appended to the manifest
+                manifest.load()
+                if sentence_cache is not None:
+                    for idx in sharded_sentences:
+                        store_cached(idx)
+            tts_manager = TTSManager(session)
+            tts_manager.start_audio_writer()
             if session['ebook']:
                 ebook_name = Path(session['ebook']).name
+                pending_sentences = []
                 with tqdm(total=total_iterations, desc='0.00%', bar_format='{desc}: {n_fmt}/{total_fmt} ', unit='step', initial=0) as t:
                     idx_target = 0
-                    for c in range(0, total_chapters):
+                    resumed = False
+                    for c, sentences in enumerate(chapters_stream):
                         if session['cancellation_requested']:
                             msg = 'Cancel requested'
                             print(msg)
                             return False
                         chapter_idx = c
-                        sentences = session['chapters'][c]
+                        if total_iterations is None:
+                            # blocks coming from the parser are kept to write the sentence store at the end
+                            streamed_chapters.append(sentences)
                         start = idx_target
-                        if c in missing_chapters:
-                            msg = f'********* Recovering missing block {c} *********'
-                            print(msg)
-                        elif resume_chapter == c and c > 0:
-                            msg = f'********* Resuming from block {resume_chapter} *********'
-                            print(msg)
                         msg = f'Block {chapter_idx} containing {len(sentences)} sentences…'
                         print(msg)
                         for idx, sentence in enumerate(sentences):
@@ -2017,45 +2685,155 @@ def convert_chapters2audio(session_id:str)->bool:
                                 is_sml = bool(SML_TAG_PATTERN.fullmatch(sentence))
                                 if (not is_sml) or (idx == len(sentences) - 1):
                                     final_sentences.append(sentence)
-                                if idx_target in missing_sentences or idx_target >= resume_sentence:
-                                    if idx_target in missing_sentences:
-                                        msg = f'********* Recovering missing sentence {idx_target} *********'
+                                if idx_target not in skip_sentences and not is_sentence_done(idx_target, sentence):
+                                    if idx_target > 0 and not resumed:
+                                        msg = f'********* Resuming from sentence {idx_target} ********'
                                         print(msg)
-                                    elif resume_sentence == idx_target and resume_sentence > 0:
-                                        msg = f'********* Resuming from sentence {resume_sentence} ********'
-                                        print(msg)
-                                    success = tts_manager.convert_sentence2audio(idx_target, sentence) if sentence else True
-                                    if not success:
-                                        return False
+                                    resumed = True
+                                    if sentence and not restore_cached(idx_target, sentence):
+                                        pending_sentences.append((idx_target, sentence))
+                                    if len(pending_sentences) >= batch_size:
+                                        success = tts_manager.convert_sentences2audio(pending_sentences)
+                                        pending_sentences = []
+                                        if not success:
+                                            return False
                                 idx_target += 1
-                            total_progress = (t.n + 1) / total_iterations
-                            if session['is_gui_process']:
-                                progress_bar(progress=total_progress, desc=f'{ebook_name} - {sentence}')
-                            percent = total_progress * 100
-                            t.set_description(f"{percent:.2f}%")
+                            if total_iterations is not None:
+                                total_progress = (t.n + 1) / total_iterations
+                                if session['is_gui_process']:
+                                    progress_bar(progress=total_progress, desc=f'{ebook_name} - {sentence}')
+                                percent = total_progress * 100
+                                t.set_description(f"{percent:.2f}%")
+                            elif session['is_gui_process']:
+                                progress_bar(progress=None, desc=f'{ebook_name} - {sentence}')
                             msg = f' : {sentence}'
                             print(msg)
                             t.update(1)
+                        if pending_sentences:
+                            success = tts_manager.convert_sentences2audio(pending_sentences)
+                            pending_sentences = []
+                            if not success:
+                                return False
+                        if not tts_manager.flush_audio_writes():
+                            return False
                         end = idx_target - 1
                         msg = f'End of Block {chapter_idx}'
                         print(msg)
-                        if chapter_idx in missing_chapters or idx_target >= resume_sentence:
-                            msg = f'Combining block {chapter_idx} to audio, sentence {start} to {end}'
+                        # the engine writers append to the manifest on their own, read their lines and flush them to disk
+                        manifest.load()
+                        manifest.sync()
+                        if sentence_cache is not None:
+                            # after the manifest load, so the cache keeps the sample count and loudness of each sentence
+                            for idx in range(start, idx_target):
+                                if idx in cache_keys:
+                                    store_cached(idx)
+                        if manifest.chapters.get(chapter_idx) != (start, end):
+                            # the final export reads the block sentences directly, only its boundaries are kept
+                            if end < start:
+                                error = f'Block {chapter_idx} has no audio sentence'
+                                print(error)
+                                return False
+                            msg = f'Block {chapter_idx} audio spans sentences {start} to {end}'
                             print(msg)
-                            chapter_audio_file = os.path.join(session['chapters_dir'], f'{chapter_idx}.{default_audio_proc_format}')
-                            combine_result = combine_audio_sentences(session_id, chapter_audio_file, int(start), int(end))
-                            if not combine_result:
-                                msg = 'combine_audio_sentences() failed!'
-                                print(msg)
+                            manifest.add_chapter(chapter_idx, start, end)
+                        if stream is not None and chapter_idx in manifest.chapters:
+                            if not encode_chapter_segment(session_id, stream, manifest, chapter_idx, sentences[0] if sentences else ''):
                                 return False
+                if total_iterations is None:
+                    if not streamed_chapters:
+                        error = 'No sentences found!'
+                        print(error)
+                        return False
+                    store = SentenceStore.write(os.path.join(session['process_dir'], sentence_store_file), streamed_chapters)
+                    store.close()
+                    session['chapters_file'] = store.store_file
+            if stream is not None:
+                stream.finish()
             return tts_manager.create_sentences2vtt(final_sentences)
         except Exception as e:
             DependencyError(e)
             error = f'convert_chapters2audio() error: {e}'
             print(error)
             return False
+        finally:
+            if sentence_cache is not None:
+                stats = sentence_cache.get_stats()
+                msg = f"Sentence cache: {stats['hits']} hits, {stats['misses']} misses"
+                print(msg)
+            if chapters is not None:
+                chapters.close()
+            elif chapters_stream is not None:
+                # stops the parser thread of stream_chapters() if the conversion ended early
+                chapters_stream.close()
+            stats = session.get_stats()
+            total_sentences = max(len(final_sentences), 1)
+            msg = f"Session reads: {stats['local_reads']} local, {stats['proxy_calls']} proxy round-trips ({stats['proxy_calls'] / total_sentences:.3f} per sentence)"
+            print(msg)
+            if tts_manager is not None:
+                tts_manager.stop_audio_writer()
+                tts_manager.release_devices()
+                metrics = tts_manager.get_metrics()
+                msg = f"Model device transfers: {metrics['device_transfers']}, memory cleanups: {metrics['memory_cleanups']} ({metrics['memory_cleanup_time']:.2f}s)"
+                print(msg)
+
+def get_pending_sentences(chapters:Any, is_done:Callable[[int, str], bool])->list[tuple[int, str]]:
+    # same numbering and resume rules as the convert_chapters2audio() loop
+    todo = []
+    idx_target = 0
+    for sentences in chapters:
+        for sentence in sentences:
+            sentence = sentence.strip()
+            if any(c.isalnum() for c in sentence):
+                if not is_done(idx_target, sentence):
+                    todo.append((idx_target, sentence))
+                idx_target += 1
+    return todo
+
+def get_sentence_cache_base(session:Any)->str:
+    engine = session['tts_engine']
+    params = sorted((k, session[k]) for k in session.keys() if k.startswith(f'{engine}_') and k != f'{engine}_batch_size')
+    custom_model = None
+    if session['custom_model'] is not None:
+        # same checkpoint digest as the XTTS latents, the model name alone does not tell a retrained upload apart
+        checkpoint_path = os.path.join(session['custom_model_dir'], engine, session['custom_model'], default_engine_settings[engine]['files'][1])
+        custom_model = FileCache.file_digest(checkpoint_path) or session['custom_model']
+    return FileCache.make_key(
+        engine,
+        session['fine_tuned'],
+        custom_model,
+        FileCache.file_digest(session['voice']) if session['voice'] else None,
+        session['language'],
+        params,
+        default_audio_proc_format
+    )
 
-def combine_audio_sentences(session_id:str, file:str, start:int, end:int)->bool:
+def convert_sentences_sharded(session_id:str, todo:list[tuple[int, str]], batch_size:int)->set[int]|None:
+    session = context.get_session(session_id)
+    if not session or not session.get('id', False):
+        return None
+    if session['device'] != devices['CPU']['proc']:
+        msg = f"Multiple workers are only supported on {devices['CPU']['proc']}, converting with one worker."
+        print(msg)
+        return set()
+    if not todo:
+        return set()
+    snapshot = get_session_snapshot(session)
+    total = len(todo)
+    converted = [0]
+
+    def on_progress(count:int)->None:
+        converted[0] += count
+        if session['is_gui_process']:
+            progress_bar(progress=converted[0] / total, desc=f'Workers {converted[0]}/{total}')
+        msg = f'Workers: {converted[0]}/{total} sentences converted'
+        print(msg)
+
+    workers = TTSWorkers(snapshot, int(session['workers']), shard_size=max(batch_size, 8))
+    if not workers.run(todo, context.get_cancellation_event(session_id).is_set, on_progress):
+        return None
+    return {idx for idx, _ in todo}
+
+def combine_audio_sentences(session_id:str, file:str, start:int, end:int, manifest:AudioManifest|None=None, codec_args:list[str]|None=None)->bool:
     try:
         session = context.get_session(session_id)
         if not session or not session.get('id', False):
@@ -2091,7 +2869,10 @@ def combine_audio_sentences(session_id:str, file:str, start:int, end:int)->bool:
                     print(msg)
                     return False
                 f.write(f"file '{path.replace(os.sep, '/')}'\n")
-        result = assemble_audio_chunks(concat_list, file, session['is_gui_process'])
+        if manifest is None:
+            manifest = AudioManifest(os.path.join(session['process_dir'], audio_manifest_file))
+        manifest.load()
+        result = assemble_audio_chunks(concat_list, file, session['is_gui_process'], manifest.get_range_duration(start, end), codec_args)
         if not result:
             error = 'combine_audio_sentences() FFmpeg concat failed.'
             print(error)
@@ -2103,9 +2884,74 @@ def combine_audio_sentences(session_id:str, file:str, start:int, end:int)->bool:
         DependencyError(e)
         return False
 
+def encode_chapter_segment(session_id:str, stream:ChapterStream, manifest:AudioManifest, chapter:int, title:str)->bool:
+    # each block is encoded once, for the web UI player now and for the final aac based formats later
+    session = context.get_session(session_id)
+    if not session or not session.get('id', False):
+        error = 'Session expired!'
+        print(error)
+        return False
+    start, end = manifest.chapters[chapter]
+    channels = session['output_channel']
+    digest = manifest.get_range_digest(start, end)
+    if stream.get_segment(chapter, start, end, channels, digest) is not None:
+        return True
+    stats = manifest.get_range_loudness(start, end)
+    measured = get_integrated_loudness(stats) if stats is not None else None
+    if measured is not None:
+        audio_filter = f'volume={min(-16.0 - measured[0], -1.5 - measured[1]):.2f}dB,afftdn=nf=-70'
+    else:
+        audio_filter = 'loudnorm=I=-16:LRA=11:TP=-1.5:linear=true,afftdn=nf=-70'
+    codec_args = [
+        '-af', audio_filter,
+        '-c:a', 'aac', '-b:a', '192k', '-ar', '44100',
+        '-ac', '2' if channels == 'stereo' else '1',
+        '-f', 'adts'
+    ]
+    os.makedirs(stream.stream_dir, exist_ok=True)
+    if not combine_audio_sentences(session_id, stream.segment_path(chapter), start, end, manifest, codec_args):
+        return False
+    # the concatenated segments keep their aac priming and frame padding, so chapter marks use the encoded length
+    duration = get_adts_duration(stream.segment_path(chapter))
+    if duration is None:
+        return False
+    return stream.add_segment(chapter, start, end, channels, digest, duration, sanitize_meta_chapter_title(title))
+
+def shift_vtt_cues(vtt_path:str, shifts:list[tuple[int, int, float]])->bool:
+    # cue n is sentence n, each (first sentence, last sentence, seconds) range moves its cues
+    timestamp_re = re.compile(r'^(\d+):(\d{2}):(\d{2}(?:\.\d+)?) --> (\d+):(\d{2}):(\d{2}(?:\.\d+)?)$')
+
+    def shifted(h:str, m:str, sec:str, shift:float)->str:
+        seconds = max(int(h) * 3600 + int(m) * 60 + float(sec) + shift, 0.0)
+        mins, secs = divmod(seconds, 60)
+        hours, mins = divmod(mins, 60)
+        return f'{int(hours):02}:{int(mins):02}:{secs:06.3f}'
+
+    try:
+        with open(vtt_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        cue = 0
+        for n, line in enumerate(lines):
+            m = timestamp_re.match(line)
+            if not m:
+                continue
+            shift = next((seconds for first, last, seconds in shifts if first <= cue <= last), 0.0)
+            if shift:
+                lines[n] = f'{shifted(*m.group(1, 2, 3), shift)} --> {shifted(*m.group(4, 5, 6), shift)}'
+            cue += 1
+        tmp_path = f'{vtt_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        os.replace(tmp_path, vtt_path)
+        return True
+    except OSError as e:
+        error = f'shift_vtt_cues() error: {e}'
+        print(error)
+        return False
+
 def combine_audio_chapters(session_id:str)->list[str]|None:
 
-    def generate_ffmpeg_metadata(part_chapters:list[tuple[str,str]], output_metadata_path:str, default_audio_proc_format:str)->str|bool:
+    def generate_ffmpeg_metadata(part_chapters:list[tuple[str,float]], output_metadata_path:str)->str|bool:
         try:
             out_fmt = session['output_format']
             is_mp4_like = out_fmt in ['mp4', 'm4a', 'm4b', 'mov']
@@ -2147,13 +2993,12 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
                     if asin:
                         ffmpeg_metadata += f"{tag('asin')}={asin}\n"
             start_time = 0
-            for filename, chapter_title in part_chapters:
+            for chapter_title, duration in part_chapters:
                 if session['cancellation_requested']:
                     msg = 'Cancel requested'
                     print(msg)
                     return False
-                filepath = os.path.join(session['chapters_dir'], filename)
-                duration_ms = len(AudioSegment.from_file(filepath, format=default_audio_proc_format))
+                duration_ms = round(duration * 1000)
                 clean_title = re.sub(r'(^#)|[=\\]|(-$)', lambda m: '\\' + (m.group(1) or m.group(0)), sanitize_meta_chapter_title(chapter_title))
                 ffmpeg_metadata += '[CHAPTER]\nTIMEBASE=1/1000\n'
                 ffmpeg_metadata += f'START={start_time}\nEND={start_time + duration_ms}\n'
@@ -2163,14 +3008,16 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
                 f.write(ffmpeg_metadata)
             return output_metadata_path
         except Exception as e:
-            error = f'generate_ffmpeg_metadata() Error: Failed to process {txt_file} → {out_file}: {e}'
+            error = f'generate_ffmpeg_metadata() Error: Failed to write {output_metadata_path}: {e}'
             print(error)
             return False
 
-    def export_audio(combined_audio:str, metadata_file:str, final_file:str)->bool:
+    def export_audio(concat_list:str, probe_file:str, metadata_file:str, final_file:str, total_duration:float, gain:float|None, on_part_progress:Callable[[float], None]|None=None)->bool:
         
         def on_progress(p:float)->None:
-            if is_gui_process:
+            if on_part_progress is not None:
+                on_part_progress(p)
+            elif is_gui_process:
                 progress_bar(p / 100.0, desc='Export')
         
         try:
@@ -2182,13 +3029,15 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
             ffprobe_cmd = [
                 shutil.which('ffprobe'), '-v', 'error', '-threads', '0', '-select_streams', 'a:0',
                 '-show_entries', 'stream=codec_name,sample_rate,sample_fmt',
-                '-of', 'default=nokey=1:noprint_wrappers=1', combined_audio
+                '-of', 'default=nokey=1:noprint_wrappers=1', probe_file
             ]
             probe = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
             codec_info = probe.stdout.strip().splitlines()
             input_codec = codec_info[0] if len(codec_info) > 0 else None
             input_rate = codec_info[1] if len(codec_info) > 1 else None
-            cmd = [shutil.which('ffmpeg'), '-hide_banner', '-nostats', '-hwaccel', 'auto', '-thread_queue_size', '1024', '-i', combined_audio]
+            # single decode of the sentence files into the final encoder
+            audio_input = ['-thread_queue_size', '1024', '-safe', '0', '-f', 'concat', '-i', concat_list]
+            cmd = [shutil.which('ffmpeg'), '-hide_banner', '-nostats', '-hwaccel', 'auto', *audio_input]
             target_codec, target_rate = None, None
             if session['output_format'] == 'wav':
                 target_codec = 'pcm_s16le'
@@ -2227,23 +3076,29 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
                 cmd += ['-ac', '1']
             if input_codec == target_codec and input_rate == target_rate:
                 cmd = [
-                    shutil.which('ffmpeg'), '-hide_banner', '-nostats', '-hwaccel', 'auto', '-thread_queue_size', '1024', '-i', combined_audio,
+                    shutil.which('ffmpeg'), '-hide_banner', '-nostats', '-hwaccel', 'auto', *audio_input,
                     '-threads', '0', '-f', 'ffmetadata', '-i', metadata_file,
                     '-map', '0:a', '-map_metadata', '1', '-c', 'copy',
                     '-progress', 'pipe:2',
                     '-y', final_file
                 ]
             else:
+                if gain is not None:
+                    # the measured sentence loudness gives the gain, denoise stays one pass over the stream
+                    audio_filter = f'volume={gain:.2f}dB,afftdn=nf=-70'
+                else:
+                    # blocks without loudness stats, e.g. combined before the manifest existed
+                    audio_filter = 'loudnorm=I=-16:LRA=11:TP=-1.5:linear=true,afftdn=nf=-70'
                 cmd += [
                     '-filter_threads', '0',
                     '-filter_complex_threads', '0',
-                    '-af', 'loudnorm=I=-16:LRA=11:TP=-1.5:linear=true,afftdn=nf=-70',
+                    '-af', audio_filter,
                     '-threads', '0',
                     '-progress', 'pipe:2',
                     '-y', final_file
                 ]
             is_gui_process = session['is_gui_process']
-            proc_pipe = SubprocessPipe(cmd, is_gui_process=is_gui_process, total_duration=get_audio_duration(combined_audio), msg='Export', on_progress=on_progress)
+            proc_pipe = SubprocessPipe(cmd, is_gui_process=is_gui_process, total_duration=total_duration, msg='Export', on_progress=on_progress, print_progress=on_part_progress is None)
             if proc_pipe.result:
                 if os.path.exists(final_file) and os.path.getsize(final_file) > 0:
                     if session['output_format'] in ['mp3', 'm4a', 'm4b', 'mp4']:
@@ -2272,7 +3127,9 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
                     final_vtt = f"{Path(final_file).stem}.vtt"
                     proc_vtt_path = os.path.join(session['process_dir'], final_vtt)
                     final_vtt_path = os.path.join(session['audiobooks_dir'], final_vtt)
-                    shutil.move(proc_vtt_path, final_vtt_path)
+                    # split parts share the book subtitles, moved once all parts are exported
+                    if os.path.exists(proc_vtt_path):
+                        shutil.move(proc_vtt_path, final_vtt_path)
                     return True
                 else:
                     error = f"{Path(final_file).name} is corrupted or does not exist"
@@ -2285,131 +3142,215 @@ def combine_audio_chapters(session_id:str)->list[str]|None:
     try:
         session = context.get_session(session_id)
         if session and session.get('id', False):
-            chapter_files = [f for f in os.listdir(session['chapters_dir']) if f.endswith(f'.{default_audio_proc_format}')]
-            chapter_files = sorted(chapter_files, key=lambda x: int(re.search(r'\d+', x).group()))
-            chapter_titles = [c[0] for c in session['chapters']]
             is_gui_process = session['is_gui_process']
-            if len(chapter_files) == 0:
+            # blocks are read straight from their sentences, boundaries and durations come from the audio manifest
+            manifest = AudioManifest(os.path.join(session['process_dir'], audio_manifest_file)).load()
+            chapter_re = re.compile(r'^(\d+)\.' + re.escape(default_audio_proc_format) + r'$')
+            legacy_files = {int(chapter_re.match(f).group(1)): f for f in os.listdir(session['chapters_dir']) if chapter_re.match(f)}
+            chapter_numbers = sorted(set(manifest.chapters) | set(legacy_files))
+            if len(chapter_numbers) == 0:
                 print('No block files exists!')
                 return None
-            chunks_size = 892
-            total_duration = 0.0
+            chapter_titles = []
+            if session['chapters_file'] and os.path.exists(session['chapters_file']):
+                with SentenceStore(session['chapters_file']) as chapters:
+                    chapter_titles = [chapters.first_sentence(c) for c in range(len(chapters))]
+            chapter_sources = []
             durations = []
-            for i in range(0, len(chapter_files), chunks_size):
-                filepaths = [
-                    os.path.join(session['chapters_dir'], f)
-                    for f in chapter_files[i:i + chunks_size]
-                ]
-                durations_dict = get_audiolist_duration(filepaths)
-                for path in filepaths:
-                    dur = durations_dict.get(path, 0.0)
-                    durations.append(dur)
-                    total_duration += dur
-            assert len(durations) == len(chapter_files)
+            loudness_stats = []
+            segments = []
+            segment_durations = []
+            stream = None
+            if session['output_stream'] and session['output_format'] in ['m4a', 'm4b', 'mp4', 'mov', 'aac']:
+                # the blocks already encoded for the web UI player are copied instead of encoded again
+                stream = ChapterStream(os.path.join(session['process_dir'], chapter_stream_dir)).load()
+            for c in chapter_numbers:
+                files = None
+                duration = None
+                stats = None
+                if c in manifest.chapters:
+                    start, end = manifest.chapters[c]
+                    files = [os.path.join(session['sentences_dir'], f'{i}.{default_audio_proc_format}') for i in range(start, end + 1)]
+                    if files and all(os.path.exists(f) for f in files):
+                        duration = manifest.get_range_duration(start, end)
+                        stats = manifest.get_range_loudness(start, end)
+                    else:
+                        files = None
+                if files is None:
+                    # block combined before the manifest existed
+                    if c not in legacy_files:
+                        error = f'Missing sentence files for block {c}'
+                        print(error)
+                        return None
+                    files = [os.path.join(session['chapters_dir'], legacy_files[c])]
+                if duration is None:
+                    duration = sum(get_audiolist_duration(files).values())
+                chapter_sources.append(files)
+                durations.append(duration)
+                loudness_stats.append(stats)
+                segment = None
+                if stream is not None and c in manifest.chapters:
+                    start, end = manifest.chapters[c]
+                    segment = stream.get_segment(c, start, end, session['output_channel'], manifest.get_range_digest(start, end))
+                segments.append(segment)
+                segment_durations.append(stream.segments[c]['duration'] if segment is not None else None)
+            total_duration = sum(durations)
             exported_files = []
             concat_dir = session['process_dir']
+            needs_split = False
             if session['output_split']:
-                part_files = []
                 part_chapter_indices = []
-                cur_part = []
                 cur_indices = []
                 cur_duration = 0
                 max_part_duration = int(session['output_split_hours']) * 3600
                 needs_split = total_duration > (int(session['output_split_hours']) * 2) * 3600
-                for idx, (file, dur) in enumerate(zip(chapter_files, durations)):
+                for idx, dur in enumerate(durations):
                     if session['cancellation_requested']:
                         msg = 'Cancel requested'
                         print(msg)
                         return None
-                    if cur_part and (cur_duration + dur > max_part_duration):
-                        part_files.append(cur_part)
+                    if cur_indices and (cur_duration + dur > max_part_duration):
                         part_chapter_indices.append(cur_indices)
-                        cur_part = []
                         cur_indices = []
                         cur_duration = 0
-                    cur_part.append(file)
                     cur_indices.append(idx)
                     cur_duration += dur
-                if cur_part:
-                    part_files.append(cur_part)
+                if cur_indices:
                     part_chapter_indices.append(cur_indices)
-                for part_idx, (part_file_list, indices) in enumerate(zip(part_files, part_chapter_indices)):
-                    concat_list = os.path.join(concat_dir, f'concat_list_chapters_{part_idx+1:02d}.txt')
-                    with open(concat_list, 'w') as f:
-                        for file in part_file_list:
-                            if session['cancellation_requested']:
-                                msg = 'Cancel requested'
-                                print(msg)
-                                return None
-                            path = Path(session['chapters_dir']) / file
-                            f.write(f"file '{path.as_posix()}'\n")
-                    merged_audio = Path(session['process_dir']) / f"{get_sanitized(session['metadata']['title'])}_part{part_idx+1}.{default_audio_proc_format}"
-                    result = assemble_audio_chunks(concat_list, merged_audio, is_gui_process)
-                    if not result:
-                        error = f'assemble_audio_chunks() Final merge failed for part {part_idx+1}.'
-                        print(error)
-                        return None
-                    metadata_file = Path(session['process_dir']) / f'metadata_part{part_idx+1}.txt'
-                    part_chapters = [(chapter_files[i], chapter_titles[i]) for i in indices]
-                    generate_ffmpeg_metadata(part_chapters, str(metadata_file), default_audio_proc_format)
-                    final_file = Path(session['audiobooks_dir']) / (f"{session['final_name'].rsplit('.', 1)[0]}_part{part_idx+1}.{session['output_format']}" if needs_split else session['final_name'])
-                    if export_audio(str(merged_audio), str(metadata_file), str(final_file)):
-                        exported_files.append(str(final_file))
             else:
-                concat_list = os.path.join(concat_dir, f'concat_list_chapters_1.txt')
-                merged_audio = Path(session['process_dir']) / f"{get_sanitized(session['metadata']['title'])}.{default_audio_proc_format}"
+                part_chapter_indices = [list(range(len(chapter_numbers)))]
+            part_jobs = []
+            used_durations = list(durations)
+            used_segments = [False] * len(chapter_numbers)
+            for part_idx, indices in enumerate(part_chapter_indices):
+                part_sources = [chapter_sources[i] for i in indices]
+                part_durations = [durations[i] for i in indices]
+                from_segments = all(segments[i] is not None for i in indices)
+                if from_segments:
+                    part_sources = [[segments[i]] for i in indices]
+                    part_durations = [segment_durations[i] for i in indices]
+                    for i in indices:
+                        used_durations[i] = segment_durations[i]
+                        used_segments[i] = True
+                part_duration = sum(part_durations)
+                concat_list = os.path.join(concat_dir, f'concat_list_chapters_{part_idx+1:02d}.txt')
                 with open(concat_list, 'w') as f:
-                    for file in chapter_files:
+                    for sources in part_sources:
                         if session['cancellation_requested']:
                             msg = 'Cancel requested'
                             print(msg)
                             return None
-                        path = os.path.join(session['chapters_dir'], file).replace("\\", "/")
-                        f.write(f"file '{path}'\n")
-                result = assemble_audio_chunks(concat_list, merged_audio, is_gui_process)
-                if not result:
-                    print(f'assemble_audio_chunks() Final merge failed for {merged_audio}.')
+                        for path in sources:
+                            f.write(f"file '{Path(path).as_posix()}'\n")
+                metadata_file = os.path.join(session['process_dir'], f'metadata_part{part_idx+1}.txt')
+                part_chapters = [
+                    (chapter_titles[chapter_numbers[i]] if chapter_numbers[i] < len(chapter_titles) else '', part_durations[n])
+                    for n, i in enumerate(indices)
+                ]
+                if not generate_ffmpeg_metadata(part_chapters, metadata_file):
+                    return None
+                if needs_split:
+                    final_file = os.path.join(session['audiobooks_dir'], f"{session['final_name'].rsplit('.', 1)[0]}_part{part_idx+1}.{session['output_format']}")
+                else:
+                    final_file = os.path.join(session['audiobooks_dir'], session['final_name'])
+                gain = None
+                if not from_segments and all(loudness_stats[i] is not None for i in indices):
+                    measured = get_integrated_loudness([s for i in indices for s in loudness_stats[i]])
+                    if measured is not None:
+                        loudness, peak = measured
+                        # -16 LUFS integrated, never pushing the true peak over -1.5 dBTP
+                        gain = min(-16.0 - loudness, -1.5 - peak)
+                part_jobs.append((concat_list, part_sources[0][0], metadata_file, final_file, part_duration, gain))
+            if any(used_segments):
+                # the subtitles were timed on the sentence samples, the copied segments add the aac priming and padding of each block
+                shifts = []
+                delay = 0.0
+                for i, c in enumerate(chapter_numbers):
+                    if c in manifest.chapters:
+                        shifts.append((*manifest.chapters[c], delay + (aac_priming_samples / 44100 if used_segments[i] else 0.0)))
+                    delay += used_durations[i] - durations[i]
+                proc_vtt_path = os.path.join(session['process_dir'], f"{Path(session['final_name']).stem}.vtt")
+                if os.path.exists(proc_vtt_path) and not shift_vtt_cues(proc_vtt_path, shifts):
                     return None
-                metadata_file = os.path.join(session['process_dir'], 'metadata.txt')
-                chapters_zip = list(zip(chapter_files, chapter_titles))
-                generate_ffmpeg_metadata(chapters_zip, metadata_file, default_audio_proc_format)
-                final_file = os.path.join(session['audiobooks_dir'], session['final_name'])
-                if export_audio(merged_audio, metadata_file, final_file):
-                    exported_files.append(final_file)
+            export_workers = min(max(int(session.get('export_workers') or default_export_workers), 1), len(part_jobs))
+            if export_workers == 1:
+                for job in part_jobs:
+                    if export_audio(*job):
+                        exported_files.append(job[3])
+            else:
+                # every part reports its own percentage, shown as one figure weighted by part duration
+                part_percents = [0.0] * len(part_jobs)
+                progress_lock = threading.Lock()
+
+                def on_part_progress(part_idx:int, p:float)->None:
+                    with progress_lock:
+                        part_percents[part_idx] = p
+
+                def get_export_progress()->float:
+                    with progress_lock:
+                        done = sum(part_percents[i] * part_jobs[i][4] for i in range(len(part_jobs)))
+                    return min(done / total_duration, 100.0) if total_duration > 0 else 0.0
+
+                msg = f'Exporting {len(part_jobs)} parts with {export_workers} workers…'
+                print(msg)
+                results = [False] * len(part_jobs)
+                with ThreadPoolExecutor(max_workers=export_workers) as executor:
+                    futures = {
+                        executor.submit(export_audio, *job, partial(on_part_progress, part_idx)): part_idx
+                        for part_idx, job in enumerate(part_jobs)
+                    }
+                    pending = set(futures)
+                    while pending:
+                        done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            results[futures[future]] = future.result()
+                        percent = get_export_progress()
+                        if is_gui_process:
+                            progress_bar(percent / 100.0, desc='Export')
+                        sys.stdout.write(f"\rExport - {percent:.1f}%")
+                        sys.stdout.flush()
+                sys.stdout.write('\n')
+                exported_files = [job[3] for job, result in zip(part_jobs, results) if result]
+            if needs_split:
+                final_vtt = f"{Path(session['final_name']).stem}.vtt"
+                proc_vtt_path = os.path.join(session['process_dir'], final_vtt)
+                if exported_files and os.path.exists(proc_vtt_path):
+                    shutil.move(proc_vtt_path, os.path.join(session['audiobooks_dir'], final_vtt))
             return exported_files if exported_files else None
         return None
     except Exception as e:
         DependencyError(e)
         return None
 
-def assemble_audio_chunks(txt_file:str, out_file:str, is_gui_process:bool)->bool:
+def assemble_audio_chunks(txt_file:str, out_file:str, is_gui_process:bool, total_duration:float|None=None, codec_args:list[str]|None=None)->bool:
 
     def on_progress(p:float)->None:
         if is_gui_process:
             progress_bar(p / 100.0, desc='Assemble')
 
     try:
-        total_duration = 0.0
-        filepaths = []
-        try:
-            with open(txt_file, 'r') as f:
-                for line in f:
-                    if line.strip().startswith('file'):
-                        file_path = (
-                            line.strip()
-                            .split('file ')[1]
-                            .strip()
-                            .strip("'")
-                            .strip('"')
-                        )
-                        if os.path.exists(file_path):
-                            filepaths.append(file_path)
-            durations = get_audiolist_duration(filepaths)
-            total_duration = sum(durations.values())
-        except Exception as e:
-            error = f'assemble_audio_chunks() open file {txt_file} Error: {e}'
-            print(error)
-            return False
+        # the duration is only probed from the files when the caller does not know it
+        if total_duration is None:
+            filepaths = []
+            try:
+                with open(txt_file, 'r') as f:
+                    for line in f:
+                        if line.strip().startswith('file'):
+                            file_path = (
+                                line.strip()
+                                .split('file ')[1]
+                                .strip()
+                                .strip("'")
+                                .strip('"')
+                            )
+                            if os.path.exists(file_path):
+                                filepaths.append(file_path)
+                durations = get_audiolist_duration(filepaths)
+                total_duration = sum(durations.values())
+            except Exception as e:
+                error = f'assemble_audio_chunks() open file {txt_file} Error: {e}'
+                print(error)
+                return False
         ffmpeg = shutil.which('ffmpeg')
         if not ffmpeg:
             error = 'ffmpeg not found'
@@ -2422,7 +3363,7 @@ def assemble_audio_chunks(txt_file:str, out_file:str, is_gui_process:bool)->bool
             '-safe', '0',
             '-f', 'concat',
             '-i', txt_file,
-            '-c:a', default_audio_proc_format,
+            *(codec_args if codec_args is not None else ['-c:a', default_audio_proc_format]),
             '-map_metadata', '-1',
             '-threads', '0',
             '-progress', 'pipe:2',
@@ -2620,12 +3561,16 @@ def convert_ebook(args:dict)->tuple:
             session['xtts_top_p'] = float(args['xtts_top_p'])
             session['xtts_speed'] = float(args['xtts_speed'])
             session['xtts_enable_text_splitting'] = bool(args['xtts_enable_text_splitting'])
+            session['xtts_batch_size'] = int(args['xtts_batch_size']) if args.get('xtts_batch_size') is not None else default_engine_settings[TTS_ENGINES['XTTSv2']]['batch_size']
             session['bark_text_temp'] =  float(args['bark_text_temp'])
             session['bark_waveform_temp'] =  float(args['bark_waveform_temp'])
             session['output_format'] = str(args['output_format'])
             session['output_channel'] = str(args['output_channel'])
             session['output_split'] = bool(args['output_split'])
             session['output_split_hours'] = args['output_split_hours']if args['output_split_hours'] is not None else default_output_split_hours
+            session['output_stream'] = bool(args['output_stream']) if args.get('output_stream') is not None else default_output_stream
+            session['workers'] = max(int(args['workers']), 1) if args.get('workers') is not None else default_workers
+            session['export_workers'] = max(int(args['export_workers']), 1) if args.get('export_workers') is not None else default_export_workers
             session['model_cache'] = f"{session['tts_engine']}-{session['fine_tuned']}"
             session['session_dir'] = os.path.join(tmp_dir, f'proc-{session_id}')
             ebook_name = get_sanitized(Path(session['ebook']).stem)
@@ -2763,62 +3708,68 @@ def convert_ebook(args:dict)->tuple:
                                     if os.path.exists(json_blocks_edit_file):
                                         session['blocks_edit'] = load_json_blocks(json_blocks_edit_file)
                                     missing_json = False
-                                epubBook = epub.read_epub(session['epub_path'], {'ignore_ncx': True})
+                                epubBook = EpubReader.open(session['epub_path'])
                                 if epubBook:
-                                    metadata = dict(session['metadata'])
-                                    for key, value in metadata.items():
-                                        data = epubBook.get_metadata('DC', key)
-                                        if data:
-                                            for value, attributes in data:
-                                                metadata[key] = value
-                                    metadata['language'] = session['language']
-                                    metadata['title'] = metadata['title'] = metadata['title'] or Path(session['ebook']).stem.replace('_',' ')
-                                    metadata['creator'] =  False if not metadata['creator'] or metadata['creator'] == 'Unknown' else metadata['creator']
-                                    session['metadata'] = metadata                  
-                                    try:
-                                        if len(session['metadata']['language']) == 2:
-                                            lang_dict = Lang(session['language'])
-                                            if lang_dict:
-                                                session['metadata']['language'] = lang_dict.pt3
-                                    except Exception as e:
-                                        pass                         
-                                    if session['metadata']['language'] != session['language']:
-                                        error = f"WARNING!!! language selected {session['language']} differs from the EPUB file language {session['metadata']['language']}"
-                                        print(error)
-                                        if session['is_gui_process']:
-                                            show_alert({"type": "warning", "msg": error})
-                                    is_lang_in_tts_engine = (
-                                        session.get('tts_engine') in default_engine_settings and
-                                        session.get('language') in default_engine_settings[session['tts_engine']].get('languages', {})
-                                    )
-                                    if is_lang_in_tts_engine:
-                                        session['cover'] = get_cover(epubBook, session_id)
-                                        if session.get('cover', False):
-                                            if missing_json:
-                                                session['blocks_edit'] = []
-                                                raw_blocks = get_blocks(session_id, epubBook)
-                                                if raw_blocks:
-                                                    session['blocks_orig'] = [{"expand": False, "keep": True, "text": t} for t in raw_blocks]
-                                                if session.get('blocks_orig', []):
-                                                    save_json_blocks(session_id, json_blocks_orig_file, 'blocks_orig')
-                                            if not session.get('blocks_edit', []):
-                                                session['blocks_edit'] = copy.deepcopy(session['blocks_orig'])
-                                                save_json_blocks(session_id, json_blocks_edit_file, 'blocks_edit')
-                                            if session.get('blocks_orig', []) and session.get('blocks_edit', []):
-                                                if session['blocks_preview']:
-                                                    session['status'] = status_tags['BLOCKS']
-                                                    return session['status'], True
+                                    with epubBook:
+                                        metadata = dict(session['metadata'])
+                                        for key, value in metadata.items():
+                                            data = epubBook.get_metadata('DC', key)
+                                            if data:
+                                                for value, attributes in data:
+                                                    metadata[key] = value
+                                        metadata['language'] = session['language']
+                                        metadata['title'] = metadata['title'] = metadata['title'] or Path(session['ebook']).stem.replace('_',' ')
+                                        metadata['creator'] =  False if not metadata['creator'] or metadata['creator'] == 'Unknown' else metadata['creator']
+                                        session['metadata'] = metadata                  
+                                        try:
+                                            if len(session['metadata']['language']) == 2:
+                                                lang_dict = Lang(session['language'])
+                                                if lang_dict:
+                                                    session['metadata']['language'] = lang_dict.pt3
+                                        except Exception as e:
+                                            pass                         
+                                        if session['metadata']['language'] != session['language']:
+                                            error = f"WARNING!!! language selected {session['language']} differs from the EPUB file language {session['metadata']['language']}"
+                                            print(error)
+                                            if session['is_gui_process']:
+                                                show_alert({"type": "warning", "msg": error})
+                                        is_lang_in_tts_engine = (
+                                            session.get('tts_engine') in default_engine_settings and
+                                            session.get('language') in default_engine_settings[session['tts_engine']].get('languages', {})
+                                        )
+                                        if is_lang_in_tts_engine:
+                                            session['cover'] = get_cover(epubBook, session_id)
+                                            if session.get('cover', False):
+                                                if missing_json:
+                                                    session['blocks_edit'] = []
+                                                    if not session['blocks_preview'] and int(session.get('workers') or 1) <= 1:
+                                                        # no blocks review: start the audio conversion while the ebook is still parsed
+                                                        chapters_stream = stream_chapters(session_id, epubBook, json_blocks_orig_file, json_blocks_edit_file)
+                                                        progress_status, passed = finalize_audiobook(session_id, chapters_stream)
+                                                        return progress_status, passed
+                                                    raw_blocks = get_blocks(session_id, epubBook)
+                                                    if raw_blocks:
+                                                        session['blocks_orig'] = [{"expand": False, "keep": True, "text": t} for t in raw_blocks]
+                                                    if session.get('blocks_orig', []):
+                                                        save_json_blocks(session_id, json_blocks_orig_file, 'blocks_orig')
+                                                if not session.get('blocks_edit', []):
+                                                    session['blocks_edit'] = copy.deepcopy(session['blocks_orig'])
+                                                    save_json_blocks(session_id, json_blocks_edit_file, 'blocks_edit')
+                                                if session.get('blocks_orig', []) and session.get('blocks_edit', []):
+                                                    if session['blocks_preview']:
+                                                        session['status'] = status_tags['BLOCKS']
+                                                        return session['status'], True
+                                                    else:
+                                                        progress_status, passed = finalize_audiobook(session_id)
+                                                    return progress_status, passed
                                                 else:
-                                                    progress_status, passed = finalize_audiobook(session_id)
-                                                return progress_status, passed
+                                                    error = f"get_blocks() or save_json_blocks() failed! {session['blocks_orig']}"
                                             else:
-                                                error = f"get_blocks() or save_json_blocks() failed! {session['blocks_orig']}"
+                                                error = 'get_cover() failed!'
                                         else:
-                                            error = 'get_cover() failed!'
-                                    else:
-                                         error = f"language {session['language']} not supported by {session['tts_engine']}!"
+                                             error = f"language {session['language']} not supported by {session['tts_engine']}!"
                                 else:
-                                    error = 'epubBook.read_epub failed!'
+                                    error = 'EpubReader.open() failed!'
                         else:
                             error = f"Your device has not enough memory ({total_vram_gb}GB) to run {session['tts_engine']} engine ({device_vram_required}GB)"
                     else:
@@ -2832,7 +3783,7 @@ def convert_ebook(args:dict)->tuple:
         print(f'convert_ebook() Exception: {e}')
         return e, False
 
-def finalize_audiobook(session_id:str)->tuple:
+def finalize_audiobook(session_id:str, chapters_stream:Generator[list[str], None, None]|None=None)->tuple:
     session = context.get_session(session_id)
     if session and session.get('id', False):
         if session['cancellation_requested']:
@@ -2846,28 +3797,31 @@ def finalize_audiobook(session_id:str)->tuple:
         if session['status'] not in [status_tags['BLOCKS'], status_tags['CONVERTING']]:
             error = 'No blocks have been selected for the conversion!'
             return error, False
-        if session.get('blocks_edit', []):
-            json_blocks_edit_file = os.path.join(session['process_dir'], f"__edit_{session['filename_noext']}.json")
-            save_json_blocks(session_id, json_blocks_edit_file, 'blocks_edit')
-            chapters = []
-            msg = f'Get sentences…'
-            print(msg)
-            for block in session['blocks_edit']:
-                if session['cancellation_requested']:
-                    error = 'Conversion cancelled'
-                    return error, False
-                if not block['keep']:
-                    continue
-                text = block['text']
-                if text:
-                    sentences_list = get_sentences(text, session_id)
-                    if sentences_list is None:
-                        error = 'No sentences found!'
+        if chapters_stream is not None or session.get('blocks_edit', []):
+            if chapters_stream is None:
+                json_blocks_edit_file = os.path.join(session['process_dir'], f"__edit_{session['filename_noext']}.json")
+                save_json_blocks(session_id, json_blocks_edit_file, 'blocks_edit')
+                chapters = []
+                msg = f'Get sentences…'
+                print(msg)
+                for block in session['blocks_edit']:
+                    if session['cancellation_requested']:
+                        error = 'Conversion cancelled'
                         return error, False
-                    if sentences_list:
-                        chapters.append(sentences_list)
-            session['chapters'] = chapters
-            if convert_chapters2audio(session_id):
+                    if not block['keep']:
+                        continue
+                    text = block['text']
+                    if text:
+                        sentences_list = get_sentences(text, session_id)
+                        if sentences_list is None:
+                            error = 'No sentences found!'
+                            return error, False
+                        if sentences_list:
+                            chapters.append(sentences_list)
+                store = SentenceStore.write(os.path.join(session['process_dir'], sentence_store_file), chapters)
+                store.close()
+                session['chapters_file'] = store.store_file
+            if convert_chapters2audio(session_id, chapters_stream):
                 msg = 'Conversion successful. Combining sentences and chapters…'
                 show_alert({"type": "info", "msg": msg})
                 exported_files = combine_audio_chapters(session_id)               
@@ -2909,7 +3863,7 @@ def on_unload(req:gr.Request)->None:
         if session_id:
             session = context.get_session(session_id)
             if session['status'] == status_tags['CONVERTING']:
-                session['cancellation_requested'] = True
+                context.set_cancellation(session_id, True)
                 session['status'] = status_tags['DISCONNECTED']
                 session['socket_hash'] = socket_hash
             else:
@@ -2929,7 +3883,7 @@ def reset_ebook_session(session_id:str)->None:
         "cover": None,
         "blocks_orig": [],
         "blocks_edit": [],
-        "chapters": [],
+        "chapters_file": None,
         "duration": 0,
         "playback_time": 0,
         "playback_volume": 0,
@@ -588,6 +588,7 @@ def build_interface(args:dict)->gr.Blocks:
                                         gr_output_channel_list = gr.Dropdown(label='Channel', elem_id='gr_output_channel_list', choices=['mono', 'stereo'], type='value', value=default_output_channel, interactive=True, scale=1)
                                         with gr.Group(elem_id='gr_group_output_split'):
                                             gr_output_split = gr.Checkbox(label='Split File', elem_id='gr_output_split', value=default_output_split, interactive=True)
+                                            gr_output_stream = gr.Checkbox(label='Listen While Converting', elem_id='gr_output_stream', value=default_output_stream, interactive=True)
                                             gr_row_output_split_hours = gr.Row(elem_id='gr_row_output_split_hours', visible=False)
                                             with gr_row_output_split_hours:
                                                 gr_output_split_hours_markdown = gr.Markdown(elem_id='gr_output_split_hours_markdown',elem_classes=['gr-markdown-output-split-hours'], value='Hours<br/>/ Part')
@@ -701,6 +702,7 @@ def build_interface(args:dict)->gr.Blocks:
                 with gr.Group(elem_id='gr_group_progress', elem_classes=['gr-group-sides-padded']):
                     gr_progress_markdown = gr.Markdown(elem_id='gr_progress_markdown', elem_classes=['gr-markdown'], value='Status')
                     gr_progress = gr.Textbox(elem_id='gr_progress', label='', interactive=False, visible=True)
+                    gr_audiobook_stream = gr.Audio(elem_id='gr_audiobook_stream', label='', type='filepath', streaming=True, autoplay=False, interactive=False, show_download_button=False, show_share_button=False, container=False, visible=False)
 
                 with gr.Group(elem_id='gr_group_audiobook_list', elem_classes=['gr-group-sides-padded'], visible=True) as gr_group_audiobook_list:
                     gr_audiobook_markdown = gr.Markdown(elem_id='gr_audiobook_markdown', elem_classes=['gr-markdown'], value='Audiobook')
@@ -783,7 +785,7 @@ def build_interface(args:dict)->gr.Blocks:
             gr_override_confirm_btn = gr.Button(elem_id='gr_override_confirm_btn', elem_classes=['hide-elem'], value='🡆', variant='primary', visible=True, scale=0, size='sm', min_width=0)
             
             gr_restore_session = gr.JSON(elem_id='gr_restore_session', visible='hidden')
-            gr_session_update = gr.State({'hash': None})
+            gr_session_update = gr.State({'version': 0})
             gr_save_session = gr.JSON(elem_id='gr_save_session', visible='hidden')
             
             gr_override_event = gr.Number(value=0, visible=False, precision=0)
@@ -929,7 +931,7 @@ def build_interface(args:dict)->gr.Blocks:
                     if session and session.get('id', False):
                         socket_hash = str(req.session_hash)
                         if not session.get(socket_hash):
-                            outputs = tuple([gr.update() for _ in range(16)])
+                            outputs = tuple([gr.update() for _ in range(17)])
                             return outputs
                         ebook_data = None
                         file_count = session['ebook_mode']
@@ -971,13 +973,14 @@ def build_interface(args:dict)->gr.Blocks:
                             gr.update(value=bool(session['output_split'])),
                             gr.update(value=session['output_split_hours']),
                             gr.update(visible=visible_gr_row_split_hours),
+                            gr.update(value=bool(session['output_stream'])),
                             update_gr_audiobook_list(session_id),
                             gr.update(visible=visible_gr_group_custom_model)
                         )
                 except Exception as e:
                     error = f'restore_interface(): {e}'
                     alert_exception(error, session_id)
-                outputs = tuple([gr.update() for _ in range(16)])
+                outputs = tuple([gr.update() for _ in range(17)])
                 return outputs
 
             def restore_audiobook_player(audiobook:str|None)->tuple:
@@ -1080,7 +1083,7 @@ def build_interface(args:dict)->gr.Blocks:
                         session['ebook_list'] = None
                         if data is None:
                             if session.get('status', None) == status_tags['CONVERTING']:
-                                session['cancellation_requested'] = True
+                                context.set_cancellation(session_id, True)
                                 msg = 'Cancellation requested, please wait...'
                                 yield gr.update(value=show_gr_modal('wait', msg), visible=True)
                                 return
@@ -1092,7 +1095,7 @@ def build_interface(args:dict)->gr.Blocks:
                             session['ebook_list'] = ebook_list
                         else:
                             session['ebook'] = data
-                        session['cancellation_requested'] = False
+                        context.set_cancellation(session_id, False)
                 except Exception as e:
                     error = f'change_gr_ebook_file(): {e}'
                     alert_exception(error, session_id)
@@ -1565,6 +1568,43 @@ def build_interface(args:dict)->gr.Blocks:
                     session['output_split'] = val
                 return gr.update(visible=val)
 
+            def show_gr_audiobook_stream(session_id:str)->dict:
+                session = context.get_session(session_id)
+                if session and session.get('id', False):
+                    return gr.update(visible=bool(session['output_stream']), value=None)
+                return gr.update(visible=False, value=None)
+
+            def stream_gr_audiobook(session_id:str)->Generator[str, None, None]:
+                # plays the blocks while they are converted, the generator ends with the conversion
+                try:
+                    session = context.get_session(session_id)
+                    if not session or not session.get('id', False) or not session['output_stream']:
+                        return
+                    stream = None
+                    sent = 0
+                    waited = 0
+                    while True:
+                        converting = session['status'] == status_tags['CONVERTING']
+                        if session['process_dir'] and (converting or stream is not None):
+                            stream_dir = os.path.join(session['process_dir'], chapter_stream_dir)
+                            if stream is None or stream.stream_dir != stream_dir:
+                                stream = ChapterStream(stream_dir)
+                                sent = 0
+                            ready = stream.load().get_ready_segments()
+                            for _, segment in ready[sent:]:
+                                yield segment
+                            sent = max(sent, len(ready))
+                        if not converting:
+                            waited += 1
+                            # the conversion may not have started yet
+                            if stream is not None or waited > 60:
+                                return
+                        time.sleep(1)
+                except Exception as e:
+                    error = f'stream_gr_audiobook(): {e}'
+                    print(error)
+                return
+
             def change_gr_playback_time(time:float, session_id:str)->None:
                 session = context.get_session(session_id)
                 if session and session.get('id', False):
@@ -1612,7 +1652,7 @@ def build_interface(args:dict)->gr.Blocks:
             def start_conversion(
                     session_id:str, device:str, ebook_file:str, blocks_preview:bool, tts_engine:str, language:str, voice:str, custom_model:str, fine_tuned:str, output_format:str, output_channel:str, xtts_temperature:float, 
                     xtts_length_penalty:int, xtts_num_beams:int, xtts_repetition_penalty:float, xtts_top_k:int, xtts_top_p:float, xtts_speed:float, xtts_enable_text_splitting:bool, bark_text_temp:float, bark_waveform_temp:float,
-                    output_split:bool, output_split_hours:str
+                    output_split:bool, output_split_hours:str, output_stream:bool
                 )->tuple:
                 try:
                     session = context.get_session(session_id)
@@ -1640,10 +1680,12 @@ def build_interface(args:dict)->gr.Blocks:
                             "xtts_top_p": float(xtts_top_p),
                             "xtts_speed": float(xtts_speed),
                             "xtts_enable_text_splitting": bool(xtts_enable_text_splitting),
+                            "xtts_batch_size": int(session['xtts_batch_size']),
                             "bark_text_temp": float(bark_text_temp),
                             "bark_waveform_temp": float(bark_waveform_temp),
                             "output_split": bool(output_split),
                             "output_split_hours": output_split_hours,
+                            "output_stream": bool(output_stream),
                         }
                         error = None
                         if args['ebook'] is None and args['ebook_list'] is None:
@@ -1857,7 +1899,7 @@ def build_interface(args:dict)->gr.Blocks:
                     else:
                         active_sessions.add(req.session_hash)
                         session[req.session_hash] = req.session_hash
-                        session['cancellation_requested'] = False
+                        context.set_cancellation(session['id'], False)
                     if isinstance(session.get('ebook'), str):
                         if not os.path.exists(session['ebook']):
                             session['ebook'] = None
@@ -1900,11 +1942,12 @@ def build_interface(args:dict)->gr.Blocks:
                     msg += 'Your browser needs cookies enabled to resume the conversions.'
                     if not os.path.exists(session['audiobooks_dir']):
                         os.makedirs(session['audiobooks_dir'], exist_ok=True)
-                    previous_hash = state['hash']
-                    new_hash = hash_proxy_dict(MappingProxyType(session))
-                    state['hash'] = new_hash
+                    state['version'] = session.get_version()
+                    session_dict = dict(session.items())
+                    session_dict['_version'] = state['version']
+                    session_dict['_full'] = True
                     show_alert({"type": "info", "msg": msg})
-                    return gr.update(value=json.dumps(session, cls=JSONDictProxyEncoder)), gr.update(value=state), gr.update(value=session['id']), gr.update()
+                    return gr.update(value=json.dumps(session_dict, cls=JSONDictProxyEncoder)), gr.update(value=state), gr.update(value=session['id']), gr.update()
                 except Exception as e:
                     error = f'change_gr_restore_session(): {e}'
                     alert_exception(error, None)
@@ -1916,45 +1959,30 @@ def build_interface(args:dict)->gr.Blocks:
                     if not session or (session and not session.get('id', False)):
                         yield gr.update(), gr.update(), gr.update()
                         return
-                    previous_hash = state.get("hash")
+                    audiobook_list = gr.update()
                     if session.get('status', None) == status_tags['CONVERTING']:
-                        try:
-                            if session.get('ticker') != len(audiobook_options):
-                                session['ticker'] = len(audiobook_options)
-                                new_hash = hash_proxy_dict(MappingProxyType(session))
-                                state['hash'] = new_hash
-                                session_filtered = {k: v for k, v in session.items() if k not in save_session_keys_except}
-                                session_dict = json.dumps(session_filtered, cls=JSONDictProxyEncoder)
-                                yield (
-                                    gr.update(value=session_dict),
-                                    gr.update(value=state),
-                                    update_gr_audiobook_list(session_id),
-                                )
-                            else:
-                                yield gr.update(), gr.update(), gr.update()
-                        except NameError:
-                            new_hash = hash_proxy_dict(MappingProxyType(session))
-                            state['hash'] = new_hash
-                            session_filtered = {k: v for k, v in session.items() if k not in save_session_keys_except}
-                            session_dict = json.dumps(session_filtered, cls=JSONDictProxyEncoder)
-                            yield (
-                                gr.update(value=session_dict),
-                                gr.update(value=state),
-                                gr.update(),
-                            )
-                    else:
-                        new_hash = hash_proxy_dict(MappingProxyType(session))
-                        if previous_hash == new_hash:
+                        # while converting the session is only saved when a new audiobook shows up
+                        if session.get('ticker') == len(audiobook_options):
                             yield gr.update(), gr.update(), gr.update()
-                        else:
-                            state['hash'] = new_hash
-                            session_filtered = {k: v for k, v in session.items() if k not in save_session_keys_except}
-                            session_dict = json.dumps(session_filtered, cls=JSONDictProxyEncoder)
-                            yield (
-                                gr.update(value=session_dict),
-                                gr.update(value=state),
-                                gr.update(),
-                            )
+                            return
+                        session['ticker'] = len(audiobook_options)
+                        audiobook_list = update_gr_audiobook_list(session_id)
+                    version, changed, deleted = session.get_changes(state.get('version', 0))
+                    if version == state.get('version', 0):
+                        yield gr.update(), gr.update(), audiobook_list
+                        return
+                    state['version'] = version
+                    changed = {k: v for k, v in changed.items() if k not in save_session_keys_except}
+                    if not changed and not deleted:
+                        yield gr.update(), gr.update(value=state), audiobook_list
+                        return
+                    changed['_version'] = version
+                    changed['_deleted'] = deleted
+                    yield (
+                        gr.update(value=json.dumps(changed, cls=JSONDictProxyEncoder)),
+                        gr.update(value=state),
+                        audiobook_list,
+                    )
                 except Exception as e:
                     error = f'update_gr_save_session(): {e}!'
                     alert_exception(error, session_id)
@@ -1966,7 +1994,7 @@ def build_interface(args:dict)->gr.Blocks:
                 gr_session, gr_device, gr_ebook_file, gr_blocks_preview, gr_tts_engine_list, gr_language, gr_voice_list,
                 gr_custom_model_list, gr_fine_tuned_list, gr_output_format_list, gr_output_channel_list,
                 gr_xtts_temperature, gr_xtts_length_penalty, gr_xtts_num_beams, gr_xtts_repetition_penalty, gr_xtts_top_k, gr_xtts_top_p, gr_xtts_speed, gr_xtts_enable_text_splitting,
-                gr_bark_text_temp, gr_bark_waveform_temp, gr_output_split, gr_output_split_hours
+                gr_bark_text_temp, gr_bark_waveform_temp, gr_output_split, gr_output_split_hours, gr_output_stream
             ]
             outputs_enable_components = [
                 gr_ebook_mode, gr_blocks_preview, gr_language, gr_voice_file, gr_voice_list,
@@ -1987,7 +2015,7 @@ def build_interface(args:dict)->gr.Blocks:
             outputs_restore_interface = [
                 gr_ebook_file, gr_ebook_mode, gr_blocks_preview, gr_device, gr_language, gr_voice_list,
                 gr_tts_engine_list, gr_custom_model_list, gr_fine_tuned_list, gr_output_format_list, gr_output_channel_list,
-                gr_output_split, gr_output_split_hours, gr_row_output_split_hours, gr_audiobook_list, gr_group_custom_model
+                gr_output_split, gr_output_split_hours, gr_row_output_split_hours, gr_output_stream, gr_audiobook_list, gr_group_custom_model
             ]
             outputs_refresh_interface = [
                 gr_modal, gr_group_main, gr_tab_xtts_params, gr_tab_bark_params, gr_convert_btn,
@@ -2129,6 +2157,11 @@ def build_interface(args:dict)->gr.Blocks:
                 inputs=[gr_output_split_hours, gr_session],
                 outputs=None
             )
+            gr_output_stream.select(
+                fn=lambda val, session_id: change_param('output_stream', bool(val), session_id),
+                inputs=[gr_output_stream, gr_session],
+                outputs=None
+            )
             gr_progress.change(
                 fn=None,
                 inputs=[gr_progress],
@@ -2317,6 +2350,15 @@ def build_interface(args:dict)->gr.Blocks:
                 inputs=None,
                 outputs=[gr_modal]
             )
+            gr_override_event.change(
+                fn=show_gr_audiobook_stream,
+                inputs=[gr_session],
+                outputs=[gr_audiobook_stream]
+            ).then(
+                fn=stream_gr_audiobook,
+                inputs=[gr_session],
+                outputs=[gr_audiobook_stream]
+            )
             gr_override_event.change(
                 fn=lambda event: gr.update(interactive=False),
                 inputs=[gr_override_event],
@@ -2378,6 +2420,11 @@ def build_interface(args:dict)->gr.Blocks:
                 inputs=[gr_session, gr_blocks_data, gr_blocks_event],
                 outputs=[gr_group_main, gr_group_blocks, gr_blocks_event]
             )
+            gr_blocks_event.change(
+                fn=stream_gr_audiobook,
+                inputs=[gr_session],
+                outputs=[gr_audiobook_stream]
+            )
             gr_blocks_event.change(
                 fn=finalize_audiobook,
                 inputs=[gr_session],
@@ -2398,10 +2445,22 @@ def build_interface(args:dict)->gr.Blocks:
                     (data)=>{
                         try{
                             if(data){
-                                localStorage.clear();
-                                data.playback_time = Number(window.session_storage.playback_time);
-                                data.playback_volume = parseFloat(window.session_storage.playback_volume);
-                                localStorage.setItem("data", JSON.stringify(data));
+                                // only the keys changed since the previous save are sent, unless _full is set
+                                const stored = data._full ? {} : JSON.parse(localStorage.getItem("data") || "{}");
+                                for(const key of (data._deleted || [])){
+                                    delete stored[key];
+                                }
+                                for(const [key, value] of Object.entries(data)){
+                                    if(!["_full", "_version", "_deleted"].includes(key)){
+                                        stored[key] = value;
+                                    }
+                                }
+                                if(data._full){
+                                    localStorage.clear();
+                                }
+                                stored.playback_time = Number(window.session_storage.playback_time);
+                                stored.playback_volume = parseFloat(window.session_storage.playback_volume);
+                                localStorage.setItem("data", JSON.stringify(stored));
                             }
                         }catch(e){
                             console.warn("gr_save_session.change error: "+e);
@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lib.core as core
+
+default_ebooks_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ebooks', 'tests')
+
+def ingest(session_id, ebook, native):
+    # ebook to parsed spine: convert2epub() then every document read back from the EpubReader
+    session = core.context.get_session(session_id)
+    session['ebook'] = ebook
+    native_formats = core.native_ebook_formats
+    core.native_ebook_formats = native_formats if native else []
+    try:
+        start = time.perf_counter()
+        if not core.convert2epub(session_id):
+            return None
+        with core.EpubReader(session['epub_path']) as epub_reader:
+            size = sum(len(doc.get_content()) for doc in epub_reader.get_documents())
+        return time.perf_counter() - start, size
+    finally:
+        core.native_ebook_formats = native_formats
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the ebook ingestion with the native reader and with calibre.')
+    parser.add_argument('--ebooks_dir', type=str, default=default_ebooks_dir, help='Folder of the ebooks to ingest.')
+    parser.add_argument('--language', type=str, default='eng', help='Language written in the metadata of the native epub.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per ebook, the best one is kept.')
+    args = parser.parse_args()
+
+    session_id = 'benchmark_ebook_ingestion'
+    core.context = core.SessionContext()
+    core.context.set_session(session_id)
+    session = core.context.get_session(session_id)
+    session['language'] = args.language
+    ebooks = sorted(
+        os.path.join(args.ebooks_dir, f) for f in os.listdir(args.ebooks_dir)
+        if os.path.splitext(f)[1].lower() in core.native_ebook_formats
+    )
+    if not ebooks:
+        print(f'No {", ".join(core.native_ebook_formats)} file in {args.ebooks_dir}')
+        sys.exit(1)
+    with_calibre = shutil.which('ebook-convert') is not None
+    if not with_calibre:
+        print('ebook-convert not found, timing the native reader only')
+    totals = {"native": 0.0, "calibre": 0.0}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        session['process_dir'] = tmp_dir
+        session['epub_path'] = os.path.join(tmp_dir, '__benchmark.epub')
+        for ebook in ebooks:
+            # the txt preprocessing of the calibre path rewrites its input, so each run gets a fresh copy
+            src = os.path.join(tmp_dir, os.path.basename(ebook))
+            line = f'{os.path.basename(ebook):>32}:'
+            for mode in (('native', 'calibre') if with_calibre else ('native',)):
+                best = None
+                for _ in range(args.repeat):
+                    shutil.copyfile(ebook, src)
+                    result = ingest(session_id, src, mode == 'native')
+                    if result is not None and (best is None or result[0] < best[0]):
+                        best = result
+                if best is None:
+                    line += f'  {mode} failed'
+                    continue
+                totals[mode] += best[0]
+                line += f'  {mode} {best[0]:8.3f}s ({best[1]} bytes)'
+            print(line)
+    msg = f"{len(ebooks)} ebooks  native {totals['native']:.3f}s"
+    if with_calibre:
+        msg += f"  calibre {totals['calibre']:.3f}s  saved {totals['calibre'] - totals['native']:.3f}s"
+    print(msg)
+
+if __name__ == '__main__':
+    main()
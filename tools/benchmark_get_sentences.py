@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lib.core as core
+
+default_corpus = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'get_sentences_corpus.json')
+
+paragraphs = {
+    "prose": "It was the best of times, it was the worst of times. Was it the age of wisdom? It was! ",
+    "legal": "Section 1, subsection 2; clause a, b, c and the party of the first part ",
+    "no punctuation": "a sentence that goes on and on without any punctuation at all ",
+    "cjk no punctuation": "中文字符没有标点符号的段落"
+}
+
+def set_language(session_id, lang):
+    session = core.context.get_session(session_id)
+    session['language'] = lang
+
+def check_corpus(session_id, corpus_file):
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    failed = 0
+    for i, case in enumerate(corpus):
+        set_language(session_id, case['language'])
+        sentences = core.get_sentences(case['text'], session_id)
+        if sentences != case['sentences']:
+            failed += 1
+            print(f'case {i} ({case["language"]}) differs: {case["text"][:60]!r}')
+    print(f'corpus: {len(corpus) - failed}/{len(corpus)} cases identical')
+    return failed == 0
+
+def record_corpus(session_id, corpus_file):
+    with open(corpus_file, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    for case in corpus:
+        set_language(session_id, case['language'])
+        case['sentences'] = core.get_sentences(case['text'], session_id)
+    with open(corpus_file, 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=1)
+    print(f'corpus: recorded {len(corpus)} cases')
+
+def run_benchmark(session_id, size_mb, lang):
+    set_language(session_id, lang)
+    target = int(size_mb * 1024 * 1024)
+    for label, source in paragraphs.items():
+        unit = len(source.encode('utf-8'))
+        text = source * (target // unit + 1)
+        text = text[:len(text) * target // len(text.encode('utf-8'))]
+        start = time.perf_counter()
+        sentences = core.get_sentences(text, session_id)
+        elapsed = time.perf_counter() - start
+        size = len(text.encode('utf-8')) / (1024 * 1024)
+        count = len(sentences) if sentences is not None else 0
+        print(f'{label:>20}: {elapsed:8.3f}s per {size:.2f} MB block  {size / elapsed:8.3f} MB/s  ({count} sentences)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Check get_sentences() against the regression corpus and time it on large paragraphs.')
+    parser.add_argument('--corpus', type=str, default=default_corpus, help='Regression corpus, a JSON list of {language, text, sentences}.')
+    parser.add_argument('--record', action='store_true', help='Rewrite the expected sentences of the corpus with the current output.')
+    parser.add_argument('--size_mb', type=float, default=1.0, help='Size of each benchmark paragraph, in MB.')
+    parser.add_argument('--language', type=str, default='eng', help='Language used for the benchmark paragraphs.')
+    args = parser.parse_args()
+
+    session_id = 'benchmark_get_sentences'
+    core.context = core.SessionContext()
+    core.context.set_session(session_id)
+    if args.record:
+        record_corpus(session_id, args.corpus)
+        return
+    success = check_corpus(session_id, args.corpus)
+    run_benchmark(session_id, args.size_mb, args.language)
+    sys.exit(0 if success else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import os
+import ast
+import sys
+import time
+import argparse
+import subprocess
+
+from iso639 import Lang
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import lib.core as core
+
+sample_text = (
+    "Chapter XIV. Mr. Smith met Dr. Jones at 10:30 on the 3rd of May, 1984.\n"
+    "He paid $1,234.56 - 12 * 4 = 36 before 23:45:10, about 45% of it!!! Ok?\n\n"
+    "II. The U.S.A. and the F.D.A. said \"yes\" to Henry VIII; 7 / 8 of them agreed.\n"
+)
+
+chain = ('roman2number', 'clock2words', 'math2words', 'normalize_text')
+
+def get_baseline_rev():
+    # the tree just before the cached normalizers were introduced
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    result = subprocess.run(
+        ['git', 'log', '-S', 'class TextNormalizer', '--format=%H', '--reverse', '--', 'lib/core.py'],
+        cwd=root, capture_output=True, text=True, check=True
+    )
+    return f'{result.stdout.split()[0]}^'
+
+def load_baseline(rev):
+    # the chain functions of lib/core.py at rev, with the helpers they call, run against today's
+    # module globals (language tables, imports) so only the normalization code differs
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    source = subprocess.run(['git', 'show', f'{rev}:lib/core.py'], cwd=root, capture_output=True, text=True, check=True).stdout
+    funcs = {node.name: node for node in ast.parse(source).body if isinstance(node, ast.FunctionDef)}
+    needed = set()
+    pending = list(chain)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        needed.add(name)
+        pending += [n.id for n in ast.walk(funcs[name]) if isinstance(n, ast.Name) and n.id in funcs and n.id not in needed]
+    namespace = dict(vars(core))
+    exec(compile(ast.Module(body=[funcs[name] for name in sorted(needed)], type_ignores=[]), f'{rev}:lib/core.py', 'exec'), namespace)
+    return tuple(namespace[name] for name in chain)
+
+def run_pass(funcs, chunks, lang, lang_iso1, tts_engine, is_num2words_compat):
+    roman2number, clock2words, math2words, normalize_text = funcs
+    start = time.perf_counter()
+    outputs = []
+    for chunk in chunks:
+        text = roman2number(chunk)
+        text = clock2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
+        text = math2words(text, lang, lang_iso1, tts_engine, is_num2words_compat)
+        outputs.append(normalize_text(text, lang, lang_iso1, tts_engine))
+    return time.perf_counter() - start, outputs
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure text normalization throughput of the baseline functions and of the cached normalizers.')
+    parser.add_argument('--input', type=str, help='UTF-8 text file to normalize. A built-in sample is used if omitted.')
+    parser.add_argument('--language', type=str, default='eng', help='ISO-639-3 language code.')
+    parser.add_argument('--size_mb', type=float, default=1.0, help='Amount of text to process per pass, in MB.')
+    parser.add_argument('--block_size', type=int, default=2048, help='Characters per block, as filter_blocks() sees them.')
+    parser.add_argument('--tts_engine', type=str, default='xtts')
+    parser.add_argument('--baseline_rev', type=str, default=None, help='Git revision of the baseline lib/core.py, the parent of the commit adding TextNormalizer if omitted.')
+    args = parser.parse_args()
+
+    lang = args.language
+    lang_iso1 = Lang(lang).pt1
+    is_num2words_compat = core.get_num2words_compat(lang_iso1)
+    if args.input:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            source = f.read()
+    else:
+        source = sample_text
+    target = int(args.size_mb * 1024 * 1024)
+    text = (source * (target // max(len(source.encode('utf-8')), 1) + 1))[:target]
+    chunks = [text[i:i + args.block_size] for i in range(0, len(text), args.block_size)]
+    size_mb = len(text.encode('utf-8')) / (1024 * 1024)
+
+    baseline_rev = args.baseline_rev or get_baseline_rev()
+    passes = (
+        (f'baseline {baseline_rev[:12]}', load_baseline(baseline_rev)),
+        ('cached normalizer', tuple(getattr(core, name) for name in chain))
+    )
+    results = {}
+    outputs = {}
+    for label, funcs in passes:
+        try:
+            # warm up imports and num2words tables so both passes start equal
+            run_pass(funcs, chunks[:4], lang, lang_iso1, args.tts_engine, is_num2words_compat)
+            results[label], outputs[label] = run_pass(funcs, chunks, lang, lang_iso1, args.tts_engine, is_num2words_compat)
+        except Exception as e:
+            print(f'{label:>18}: failed: {type(e).__name__}: {e}')
+            continue
+        print(f'{label:>18}: {results[label]:8.3f}s  {size_mb / results[label]:8.3f} MB/s  ({len(chunks)} blocks of {args.block_size} chars)')
+    if len(results) == len(passes):
+        baseline_label, cached_label = (label for label, _ in passes)
+        print(f'{"speedup":>18}: {results[baseline_label] / results[cached_label]:8.2f}x')
+        differing = sum(a != b for a, b in zip(outputs[baseline_label], outputs[cached_label]))
+        print(f'{"output":>18}: {"identical" if not differing else f"{differing} of {len(chunks)} blocks differ"}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+import os
+import re
+import sys
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from lib.conf import tts_dir, voices_dir
+from lib.conf_models import TTS_ENGINES, default_engine_settings
+from lib.classes.tts_engines.xtts import inference_batch, get_batch_chunks
+
+default_voice = os.path.join(voices_dir, 'eng', 'adult', 'male', 'KumarDahl.wav')
+
+default_text = (
+    'It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of foolishness. '
+    'There were a king with a large jaw and a queen with a plain face, on the throne of England. '
+    'It was the year of Our Lord one thousand seven hundred and seventy-five. '
+    'Spiritual revelations were conceded to England at that favoured period, as at this. '
+    'France, less favoured on the whole as to matters spiritual than her sister of the shield and trident, rolled with exceeding smoothness down hill. '
+    'Under the guidance of her Christian pastors, she entertained herself, besides, with such humane achievements as sentencing a youth to have his hands cut off. '
+    'It is likely enough that, rooted in the woods of France and Norway, there were growing trees, when that sufferer was put to death. '
+    'In England, there was scarcely an amount of order and protection to justify much national boasting. '
+    'Daring burglaries by armed men, and highway robberies, took place in the capital itself every night. '
+    'The mail was waylaid by seven robbers. '
+    'All these things, and a thousand like them, came to pass in and close upon the dear old year one thousand seven hundred and seventy-five.'
+)
+
+def load_engine(device):
+    from huggingface_hub import hf_hub_download
+    from TTS.tts.configs.xtts_config import XttsConfig
+    from TTS.tts.models.xtts import Xtts
+    settings = default_engine_settings[TTS_ENGINES['XTTSv2']]
+    sub = 'tts_models/multilingual/multi-dataset/xtts_v2/'
+    config_path, checkpoint_path, vocab_path = [
+        hf_hub_download(repo_id=settings['repo'], filename=f'{sub}{f}', cache_dir=tts_dir) for f in settings['files'][:3]
+    ]
+    config = XttsConfig()
+    config.load_json(config_path)
+    engine = Xtts.init_from_config(config)
+    engine.load_checkpoint(config, checkpoint_path=checkpoint_path, vocab_path=vocab_path, eval=True)
+    return engine.to(device)
+
+def get_params(greedy):
+    settings = default_engine_settings[TTS_ENGINES['XTTSv2']]
+    params = {k: settings[k] for k in ('temperature', 'length_penalty', 'num_beams', 'repetition_penalty', 'top_k', 'top_p', 'speed')}
+    if greedy:
+        # a single candidate per step: the padded batch must not change the codes at all
+        params['top_k'] = 1
+    return params
+
+def run(engine, tokens, latents, params, seed):
+    import torch
+    torch.manual_seed(seed)
+    with torch.no_grad():
+        return [wav.shape[-1] for wav in inference_batch(engine, tokens, *latents, params)]
+
+def report_chunks(lengths, batch_size):
+    # core flushes every batch_size sentences, each window is chunked as convert_batch() does
+    chunk_sizes = []
+    padded = 0
+    for start in range(0, len(lengths), batch_size):
+        window = lengths[start:start + batch_size]
+        for chunk in get_batch_chunks(window, batch_size):
+            chunk_sizes.append(len(chunk))
+            padded += sum(max(window[i] for i in chunk) - window[i] for i in chunk)
+    print(f'chunks: {len(lengths)} parts in {len(chunk_sizes)} GPT passes, average chunk size {statistics.mean(chunk_sizes):.2f} of {batch_size}, padding {padded / max(sum(lengths), 1):.1%} of the text tokens')
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that padded XTTSv2 batches give the same audio lengths as one part at a time, and report the chunk sizes.')
+    parser.add_argument('--text_file', type=str, default=None, help='Text split into sentences for the checks, a built-in sample otherwise.')
+    parser.add_argument('--language', type=str, default='en', help='XTTS language code.')
+    parser.add_argument('--voice', type=str, default=default_voice, help='Reference voice file.')
+    parser.add_argument('--batch_size', type=int, default=4, help='Batch size compared with batch size 1.')
+    parser.add_argument('--seeds', type=int, default=8, help='Seeds used for the sampled runs.')
+    parser.add_argument('--device', type=str, default='cpu', help='Torch device.')
+    parser.add_argument('--chunks_only', action='store_true', help='Only report the chunk sizes, no inference.')
+    args = parser.parse_args()
+
+    text = default_text
+    if args.text_file:
+        with open(args.text_file, 'r', encoding='utf-8') as f:
+            text = f.read()
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?;:])\s+', text) if any(c.isalnum() for c in s)]
+
+    engine = load_engine(args.device)
+    import torch
+    tokens = [torch.IntTensor(engine.tokenizer.encode(s.lower(), lang=args.language)) for s in sentences]
+    report_chunks([t.shape[-1] for t in tokens], args.batch_size)
+    if args.chunks_only:
+        sys.exit(0)
+
+    # the first batch_size sentences, of different token lengths, make the padded batch
+    tokens = tokens[:args.batch_size]
+    print(f'checked parts: {[t.shape[-1] for t in tokens]} tokens')
+    latents = engine.get_conditioning_latents(audio_path=[args.voice], librosa_trim_db=30, load_sr=24000, sound_norm_refs=True)
+    success = True
+
+    torch.manual_seed(0)
+    with torch.no_grad():
+        reference = len(engine.inference(sentences[0], args.language, *latents, **get_params(True))['wav'])
+    singles = [run(engine, [t], latents, get_params(True), 0)[0] for t in tokens]
+    matches = reference == singles[0]
+    print(f'greedy: Xtts.inference {reference} samples, batch 1 {singles[0]} -> {"identical" if matches else "DIFFERENT"}')
+    success &= matches
+    batched = run(engine, tokens, latents, get_params(True), 0)
+    identical = singles == batched
+    print(f'greedy: batch 1 {singles}, padded batch {batched} -> {"identical" if identical else "DIFFERENT"}')
+    success &= identical
+
+    batch_runs = [run(engine, tokens, latents, get_params(False), seed) for seed in range(args.seeds)]
+    for i in range(len(tokens)):
+        single = [run(engine, [tokens[i]], latents, get_params(False), seed)[0] for seed in range(args.seeds)]
+        batch = [lengths[i] for lengths in batch_runs]
+        mean_single, mean_batch = statistics.mean(single), statistics.mean(batch)
+        spread = max(statistics.stdev(single), statistics.stdev(batch), 1.0)
+        # sampled runs differ one by one, their lengths must follow the same distribution
+        close = abs(mean_single - mean_batch) <= 2 * spread / (args.seeds ** 0.5) * 2 ** 0.5
+        print(f'sampled part {i}: batch 1 mean {mean_single:.0f} (sd {statistics.stdev(single):.0f}), padded batch mean {mean_batch:.0f} (sd {statistics.stdev(batch):.0f}) -> {"same distribution" if close else "DIFFERENT"}')
+        success &= close
+    sys.exit(0 if success else 1)
+
+if __name__ == '__main__':
+    main()